@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Literal
 import os
 
 
@@ -23,6 +23,7 @@ class Settings(BaseSettings):
     # Elasticsearch Configuration
     ELASTICSEARCH_URL: str = ""
     ELASTICSEARCH_API_KEY: str = ""
+    # The alias setup_elastic.py maintains over versioned indices, so reindexes swap in without downtime
     ELASTICSEARCH_INDEX: str = ""
     ELASTICSEARCH_SEARCH_APPLICATION: str = ""
     ELASTICSEARCH_USE_SEARCH_APPLICATION: bool = False
@@ -31,13 +32,127 @@ class Settings(BaseSettings):
     ELASTICSEARCH_SEMANTIC_ENABLED: bool = False
     ELASTICSEARCH_SEMANTIC_MODEL: str = ""
     ELASTICSEARCH_SEMANTIC_FIELD_PREFIX: str = "semantic_"
+    # Must match SEMANTIC_FIELD_MODE used by python/setup_elastic.py: per-field semantic_* fields
+    # (client or copy_to) or one combined <prefix>text field
+    ELASTICSEARCH_SEMANTIC_FIELD_MODE: Literal["client", "copy_to", "combined"] = "client"
     ELASTICSEARCH_HYBRID_SEARCH_WEIGHT: float = 0.7
     
+    # Passage Retrieval (nested passages returned as inner hits for LLM context)
+    ELASTICSEARCH_PASSAGES_ENABLED: bool = True
+    ELASTICSEARCH_PASSAGES_PER_HIT: int = 3
+    
+    # Dense Vector Search (client-side embeddings in a quantised dense_vector field; see python/embedders.py)
+    ELASTICSEARCH_VECTOR_ENABLED: bool = False
+    ELASTICSEARCH_VECTOR_FIELD: str = "content_vector"
+    ELASTICSEARCH_VECTOR_NUM_CANDIDATES: int = 100  # HNSW candidates per shard; higher = better recall, slower
+    EMBEDDER: str = "hashing"  # hashing, openai or module:ClassName; must match the ingest embedder
+    EMBEDDER_DIMS: int = 384
+    EMBEDDER_MODEL: str = "text-embedding-3-small"
+    EMBEDDER_ENDPOINT: str = "https://api.openai.com/v1/embeddings"
+    EMBEDDER_API_KEY: str = ""  # defaults to OPENAI_API_KEY
+    EMBEDDER_HASHING_SEED: str = "0"
+    EMBEDDER_CACHE_SIZE: int = 1000
+    EMBEDDER_CACHE_TTL_SECONDS: float = 3600.0
+    
+    # Near-Duplicate Collapse (one result per dup_cluster assigned at ingest; see python/dedup.py)
+    ELASTICSEARCH_COLLAPSE_DUPLICATES: bool = False
+    
+    # Scoring Boosts (rank_feature on ratings.rank, distance_feature on timestamp; 0 disables)
+    ELASTICSEARCH_RATING_BOOST: float = 1.0
+    ELASTICSEARCH_FRESHNESS_BOOST: float = 1.0
+    ELASTICSEARCH_FRESHNESS_PIVOT: str = "30d"
+    
+    # Saved-Search Alerting (percolator; index names default to <index>_saved_searches / <index>_search_alerts)
+    ELASTICSEARCH_PERCOLATOR_ENABLED: bool = True
+    ELASTICSEARCH_PERCOLATOR_INDEX: str = ""
+    ELASTICSEARCH_ALERTS_INDEX: str = ""
+    
+    # Document Cache (documents referenced by id in LLM requests)
+    ELASTICSEARCH_DOCUMENT_CACHE_SIZE: int = 2000
+    ELASTICSEARCH_DOCUMENT_CACHE_TTL_SECONDS: int = 300
+    
     # OpenAI Configuration
     OPENAI_API_KEY: str = ""
     OPENAI_ENDPOINT: str = "https://api.openai.com/v1/chat/completions"
     OPENAI_MODEL: str = "gpt-3.5-turbo"
     
+    # LLM Model Routing (empty tier models fall back to OPENAI_MODEL)
+    OPENAI_FAST_MODEL: str = ""
+    OPENAI_STRONG_MODEL: str = ""
+    OPENAI_LARGE_PROMPT_TOKENS: int = 3000
+    OPENAI_FALLBACK_ENDPOINTS: str = ""  # comma-separated "url|api_key" entries
+    OPENAI_ROUTE_STATS_WINDOW: int = 100
+    OPENAI_ROUTE_MAX_ERROR_RATE: float = 0.5
+    OPENAI_ROUTE_COOLDOWN_SECONDS: float = 60.0
+    
+    # LLM Request Scheduling (provider rate limits, refined from response headers)
+    OPENAI_REQUESTS_PER_MINUTE: int = 500
+    OPENAI_TOKENS_PER_MINUTE: int = 200000
+    OPENAI_MAX_CONCURRENCY: int = 8
+    OPENAI_MAX_RETRIES: int = 3
+    OPENAI_RETRY_BACKOFF_SECONDS: float = 1.0
+    OPENAI_RETRY_BACKOFF_MAX_SECONDS: float = 30.0
+    
+    # Summary Caching & Speculative Prefetch
+    LLM_SUMMARY_CACHE_SIZE: int = 500
+    LLM_SUMMARY_CACHE_TTL_SECONDS: int = 600
+    LLM_SUMMARY_PREFETCH_ENABLED: bool = False
+    LLM_SUMMARY_PREFETCH_TOP_N: int = 20
+    LLM_SUMMARY_PREFETCH_CONCURRENCY: int = 2
+    
+    # Summary Deadline (0 disables; slower LLM calls fall back to an extractive summary)
+    LLM_SUMMARY_DEADLINE_SECONDS: float = 8.0
+    LLM_EXTRACTIVE_SUMMARY_SENTENCES: int = 3
+    LLM_EXTRACTIVE_CONFIDENCE: float = 0.4
+    
+    # Background LLM Jobs
+    LLM_JOBS_DB_PATH: str = "jobs.db"
+    LLM_JOBS_CONCURRENCY: int = 2
+    LLM_JOBS_DEDUP_TTL_SECONDS: int = 3600
+    
+    # Ratings (events written behind a bulk buffer, ratings.* updated by rollup;
+    # empty events index = <index>_rating_events)
+    RATINGS_EVENTS_INDEX: str = ""
+    RATINGS_FLUSH_SIZE: int = 500
+    RATINGS_FLUSH_INTERVAL_SECONDS: float = 2.0
+    RATINGS_MAX_PENDING: int = 10000
+    RATINGS_ROLLUP_INTERVAL_SECONDS: float = 30.0
+    
+    # Rating Analytics (in-memory rollups refreshed from new rating events only;
+    # events ingested within the settle window are picked up by the next refresh)
+    RATING_ANALYTICS_ENABLED: bool = True
+    RATING_ANALYTICS_REFRESH_SECONDS: float = 30.0
+    RATING_ANALYTICS_SETTLE_SECONDS: float = 5.0
+    
+    # Search Analytics (search/click/LLM events queued in-process and written with _bulk;
+    # sample rates are 0-1, and past ANALYTICS_MAX_PENDING the oldest events are dropped;
+    # empty index = <index>_analytics)
+    ANALYTICS_ENABLED: bool = True
+    ANALYTICS_INDEX: str = ""
+    ANALYTICS_SEARCH_SAMPLE_RATE: float = 1.0
+    ANALYTICS_CLICK_SAMPLE_RATE: float = 1.0
+    ANALYTICS_LLM_SAMPLE_RATE: float = 1.0
+    ANALYTICS_FLUSH_SIZE: int = 500
+    ANALYTICS_FLUSH_INTERVAL_SECONDS: float = 5.0
+    ANALYTICS_MAX_PENDING: int = 10000
+    
+    # Cache Warming (top analytics queries, topped up from the comma-separated
+    # WARMER_QUERIES, are replayed at startup and whenever the index changes)
+    WARMER_ENABLED: bool = True
+    WARMER_QUERIES: str = "payment,security,API"
+    WARMER_TOP_N: int = 50
+    WARMER_LOOKBACK_DAYS: int = 7
+    WARMER_CONCURRENCY: int = 2
+    WARMER_POLL_SECONDS: float = 60.0
+    
+    # Saved-Search Digests (due searches run as one _msearch batch)
+    DIGESTS_DB_PATH: str = "digests.db"
+    DIGEST_SCHEDULER_ENABLED: bool = True
+    DIGEST_POLL_SECONDS: float = 60.0
+    DIGEST_BATCH_SIZE: int = 100
+    DIGEST_LLM_CONCURRENCY: int = 4
+    DIGEST_MAX_RESULTS: int = 10
+    
     # Authentication Configuration
     API_SECRET_KEY: str = "development-secret-key"
     ALGORITHM: str = "HS256"
@@ -5,13 +5,34 @@ from contextlib import asynccontextmanager
 import uvicorn
 
 from config import settings
-from routers import search, llm, health, auth
+from routers import search, llm, health, auth, jobs, digests, ratings, analytics
 from middleware.auth import get_current_user
+from services.elasticsearch_service import ElasticsearchService
+from services.job_service import job_service
+from services.digest_service import digest_service
+from services.ratings_service import ratings_service
+from services.rating_analytics_service import rating_analytics_service
+from services.analytics_service import analytics_service
+from services.cache_warmer import cache_warmer
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await ElasticsearchService().verify_index()
+    await analytics_service.start()
+    await job_service.start()
+    await digest_service.start()
+    await ratings_service.start()
+    await rating_analytics_service.start()
+    # Runs in the background; /health/ready reports progress
+    await cache_warmer.start()
     yield
+    await cache_warmer.stop()
+    await rating_analytics_service.stop()
+    await ratings_service.stop()
+    await digest_service.stop()
+    await job_service.stop()
+    await analytics_service.stop()
 
 app = FastAPI(
     title="Enterprise Search API",
@@ -32,6 +53,10 @@ app.include_router(health.router, prefix="/api/v1", tags=["health"])
 app.include_router(auth.router, prefix="/api/v1", tags=["auth"])
 app.include_router(search.router, prefix="/api/v1", tags=["search"])
 app.include_router(llm.router, prefix="/api/v1", tags=["llm"])
+app.include_router(jobs.router, prefix="/api/v1", tags=["jobs"])
+app.include_router(digests.router, prefix="/api/v1", tags=["digests"])
+app.include_router(ratings.router, prefix="/api/v1", tags=["ratings"])
+app.include_router(analytics.router, prefix="/api/v1", tags=["analytics"])
 
 @app.get("/")
 async def root():
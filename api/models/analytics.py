@@ -0,0 +1,27 @@
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+
+RatingDimension = Literal["document", "source", "query", "day"]
+
+
+class RatingAggregate(BaseModel):
+    key: str
+    positive_count: int = 0
+    negative_count: int = 0
+    total_ratings: int = 0
+    score: float = 0.0
+
+
+class RatingAnalytics(BaseModel):
+    dimension: RatingDimension
+    rows: List[RatingAggregate]
+    totals: RatingAggregate
+    watermark: Optional[str] = None  # Events ingested up to this time are included
+    refreshed_at: Optional[str] = None
+
+
+class ClickEvent(BaseModel):
+    document_id: str
+    search_id: Optional[str] = None  # From the SearchResponse the click came from
+    query: Optional[str] = None
+    position: Optional[int] = Field(None, ge=0)
@@ -0,0 +1,44 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from models.search import SearchFilter, SearchResult
+
+
+class SavedSearchRequest(BaseModel):
+    name: str
+    query: str
+    filters: Optional[SearchFilter] = SearchFilter()
+    interval_hours: int = Field(24, ge=1)  # How often a digest is generated
+    max_results: Optional[int] = None  # Defaults to DIGEST_MAX_RESULTS
+
+
+class SavedSearch(BaseModel):
+    id: str
+    name: str
+    query: str
+    filters: SearchFilter
+    interval_hours: int
+    max_results: int
+    created_at: str
+    last_run_at: Optional[str] = None
+    next_run_at: str
+
+
+class SearchAlert(BaseModel):
+    saved_search_id: str
+    saved_search_name: Optional[str] = None
+    document_id: str
+    document_title: str = ""
+    matched_at: str
+    notified: bool = False
+
+
+class Digest(BaseModel):
+    id: str
+    saved_search_id: str
+    saved_search_name: str
+    created_at: str
+    window_start: str
+    window_end: str
+    total: int
+    results: List[SearchResult]
+    summary: Optional[str] = None  # None when nothing new matched
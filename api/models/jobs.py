@@ -0,0 +1,28 @@
+from pydantic import BaseModel
+from typing import Optional, Dict, Any
+from enum import Enum
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class JobRequest(BaseModel):
+    kind: str = "comprehensive_summary"
+    payload: Dict[str, Any]  # Body of the equivalent synchronous endpoint
+
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: JobStatus
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    deduplicated: bool = False
@@ -6,11 +6,13 @@ from .user import User
 
 class SummaryRequest(BaseModel):
     query: str
-    search_results: List[SearchResult]
+    search_results: List[SearchResult] = []
+    document_ids: Optional[List[str]] = []  # Resolved server-side instead of posting full results
 
 
 class ComprehensiveSummaryRequest(BaseModel):
-    selected_documents: List[SearchResult]
+    selected_documents: List[SearchResult] = []
+    document_ids: Optional[List[str]] = []
 
 
 class ChatMessage(BaseModel):
@@ -22,6 +24,7 @@ class ChatMessage(BaseModel):
 class ChatRequest(BaseModel):
     message: str
     search_context: Optional[List[Dict[str, Any]]] = []  # More flexible - accepts any dict
+    document_ids: Optional[List[str]] = []
     conversation_history: Optional[List[ChatMessage]] = []
 
 
@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+
+
+class RatingRequest(BaseModel):
+    document_id: str
+    rating: int = Field(..., ge=-1, le=1)  # 1 = thumbs up, 0 = clear, -1 = thumbs down
+    query: Optional[str] = None
+
+
+class RatingResponse(BaseModel):
+    event_id: str
+    document_id: str
+    rating: int
+    timestamp: str
+
+
+class DocumentRatings(BaseModel):
+    document_id: str
+    positive_count: int = 0
+    negative_count: int = 0
+    total_ratings: int = 0
+    score: float = 0.0
+    user_rating: Optional[int] = None
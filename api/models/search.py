@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any, Union
 from datetime import datetime
 
@@ -18,6 +18,8 @@ class SearchRequest(BaseModel):
     from_: Optional[int] = 0
     semantic_enabled: Optional[bool] = None
     hybrid_weight: Optional[float] = None
+    # kNN candidates per shard when dense vector search is enabled (default: ELASTICSEARCH_VECTOR_NUM_CANDIDATES)
+    num_candidates: Optional[int] = Field(default=None, ge=1, le=10000)
 
     class Config:
         fields = {"from_": "from"}
@@ -36,6 +38,9 @@ class SearchResult(BaseModel):
     relevance_score: int
     highlights: Dict[str, List[str]]
     content: str
+    passages: List[str] = []  # Best-matching passages from inner hits
+    abstract: str = ""  # Precomputed at ingest (python/enrichment.py)
+    key_facts: List[str] = []
     
     model_config = {"extra": "ignore"}
 
@@ -47,6 +52,7 @@ class SearchResponse(BaseModel):
     took: int
     filters_applied: SearchFilter
     search_mode: str
+    search_id: Optional[str] = None  # Echo back with click events
 
 
 class ElasticsearchConfig(BaseModel):
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends, Query, status
+from typing import Any, Dict, Literal
+from models.analytics import RatingAnalytics, RatingDimension, ClickEvent
+from models.user import User
+from services.rating_analytics_service import rating_analytics_service
+from services.analytics_service import analytics_service
+from middleware.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.get("/analytics/ratings", response_model=RatingAnalytics)
+async def get_rating_analytics(
+    dimension: RatingDimension = "source",
+    limit: int = Query(50, ge=1, le=1000),
+    order_by: Literal["total", "score"] = "total",
+    current_user: User = Depends(get_current_user)
+) -> RatingAnalytics:
+    """
+    Rating totals per document, source, query or day
+    Served from rollups refreshed in the background, so results lag new ratings by up to a refresh interval
+    """
+    return rating_analytics_service.get_analytics(dimension, limit, order_by)
+
+
+@router.post("/analytics/clicks", status_code=status.HTTP_202_ACCEPTED)
+async def record_click(
+    click: ClickEvent,
+    current_user: User = Depends(get_current_user)
+) -> Dict[str, bool]:
+    """
+    Record a click on a search result; pass the search_id returned by /search
+    """
+    return {"recorded": analytics_service.record_click(click, current_user)}
+
+
+@router.get("/analytics/pipeline")
+async def get_pipeline_stats(
+    current_user: User = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Sampling, queue depth and dropped event counts of the analytics pipeline
+    """
+    return analytics_service.get_stats()
@@ -0,0 +1,105 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List
+from models.digests import SavedSearchRequest, SavedSearch, SearchAlert, Digest
+from models.user import User
+from services.digest_service import digest_service
+from middleware.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.post("/saved-searches", response_model=SavedSearch, status_code=status.HTTP_201_CREATED)
+async def create_saved_search(
+    request: SavedSearchRequest,
+    current_user: User = Depends(get_current_user)
+) -> SavedSearch:
+    """
+    Save a search; a digest of new matching documents is generated every interval_hours
+    """
+    return await digest_service.create_saved_search(request, current_user)
+
+
+@router.get("/saved-searches", response_model=List[SavedSearch])
+async def list_saved_searches(
+    current_user: User = Depends(get_current_user)
+) -> List[SavedSearch]:
+    """
+    List the current user's saved searches
+    """
+    return await digest_service.list_saved_searches(current_user)
+
+
+@router.delete("/saved-searches/{saved_search_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_saved_search(
+    saved_search_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Delete a saved search and its digests
+    """
+    if not await digest_service.delete_saved_search(saved_search_id, current_user):
+        raise HTTPException(status_code=404, detail="Saved search not found")
+
+
+@router.post("/saved-searches/{saved_search_id}/run", response_model=SavedSearch, status_code=status.HTTP_202_ACCEPTED)
+async def run_saved_search(
+    saved_search_id: str,
+    current_user: User = Depends(get_current_user)
+) -> SavedSearch:
+    """
+    Queue a saved search for the next scheduler pass instead of waiting for its interval
+    """
+    saved_search = await digest_service.schedule_now(saved_search_id, current_user)
+    if saved_search is None:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    return saved_search
+
+
+@router.get("/saved-searches/{saved_search_id}/digests", response_model=List[Digest])
+async def list_saved_search_digests(
+    saved_search_id: str,
+    limit: int = 20,
+    current_user: User = Depends(get_current_user)
+) -> List[Digest]:
+    """
+    Stored digests for one saved search, newest first
+    """
+    if await digest_service.get_saved_search(saved_search_id, current_user) is None:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    return await digest_service.list_digests(current_user, saved_search_id, limit)
+
+
+@router.get("/saved-searches/{saved_search_id}/alerts", response_model=List[SearchAlert])
+async def list_saved_search_alerts(
+    saved_search_id: str,
+    limit: int = 50,
+    current_user: User = Depends(get_current_user)
+) -> List[SearchAlert]:
+    """
+    New documents matched against one saved search at ingest time
+    """
+    if await digest_service.get_saved_search(saved_search_id, current_user) is None:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    return await digest_service.list_alerts(current_user, saved_search_id, limit)
+
+
+@router.get("/alerts", response_model=List[SearchAlert])
+async def list_alerts(
+    limit: int = 50,
+    current_user: User = Depends(get_current_user)
+) -> List[SearchAlert]:
+    """
+    The current user's most recent saved-search alerts
+    """
+    return await digest_service.list_alerts(current_user, limit=limit)
+
+
+@router.get("/digests", response_model=List[Digest])
+async def list_digests(
+    limit: int = 20,
+    current_user: User = Depends(get_current_user)
+) -> List[Digest]:
+    """
+    The current user's most recent digests across all saved searches
+    """
+    return await digest_service.list_digests(current_user, limit=limit)
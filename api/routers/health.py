@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response, status
 from typing import Dict, Any
 from services.elasticsearch_service import ElasticsearchService
+from services.cache_warmer import cache_warmer
 from models.user import User
 from middleware.auth import get_optional_user
 
@@ -13,6 +14,17 @@ async def health_check() -> Dict[str, str]:
     return {"status": "healthy", "service": "enterprise-search-api"}
 
 
+@router.get("/health/ready")
+async def readiness_check(response: Response) -> Dict[str, Any]:
+    """Readiness check; 503 until the startup cache warm-up has finished"""
+    if not cache_warmer.ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {
+        "status": "ready" if cache_warmer.ready else "warming",
+        "warmup": cache_warmer.get_progress()
+    }
+
+
 @router.get("/health/elasticsearch")
 async def elasticsearch_health(
     current_user: User = Depends(get_optional_user)
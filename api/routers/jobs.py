@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from typing import List
+from models.jobs import JobRequest, JobResponse
+from models.user import User
+from services.job_service import job_service, TERMINAL_STATUSES
+from middleware.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.post("/llm/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_job(
+    request: JobRequest,
+    current_user: User = Depends(get_current_user)
+) -> JobResponse:
+    """
+    Submit a long-running LLM job (e.g. a comprehensive summary)
+    Identical submissions return the existing job instead of creating a new one
+    """
+    try:
+        return await job_service.submit(request.kind, request.payload, current_user)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/llm/jobs", response_model=List[JobResponse])
+async def list_jobs(
+    current_user: User = Depends(get_current_user)
+) -> List[JobResponse]:
+    """
+    List the current user's most recent jobs
+    """
+    return await job_service.list_jobs(current_user)
+
+
+@router.get("/llm/jobs/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: str,
+    stream: bool = False,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Poll a job, or stream its status changes as server-sent events with ?stream=true
+    """
+    job = await job_service.get(job_id, current_user)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if not stream:
+        return job
+
+    async def events():
+        current = job
+        while True:
+            yield f"event: {current.status.value}\ndata: {current.model_dump_json()}\n\n"
+            if current.status in TERMINAL_STATUSES:
+                return
+            previous_status = current.status
+            while current.status == previous_status:
+                # Periodic wake-ups double as keep-alives for proxies
+                await job_service.wait_for_change(job_id, timeout=15)
+                current = await job_service.get(job_id, current_user)
+                if current.status == previous_status:
+                    yield ": keep-alive\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
+@router.delete("/llm/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+) -> JobResponse:
+    """
+    Cancel a queued or running job
+    """
+    job = await job_service.cancel(job_id, current_user)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
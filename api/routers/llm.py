@@ -7,6 +7,11 @@ from models.llm import (
 )
 from models.user import User
 from services.llm_service import LLMService
+from services.llm_scheduler import llm_scheduler
+from services.summary_prefetch import summary_prefetcher
+from services.model_routing import model_router
+from services.job_service import job_service
+from services.digest_service import digest_service
 from middleware.auth import get_current_user
 
 router = APIRouter()
@@ -69,4 +74,29 @@ async def chat(
             response=f"I'm sorry, I'm having trouble accessing the AI system right now. Error: {str(e)}. Please try again later or check the system configuration.",
             context_used=len(request.search_context) > 0,
             sources_referenced=[]
-        )
\ No newline at end of file
+        )
+
+
+@router.get("/llm/scheduler")
+async def get_scheduler_stats(
+    current_user: User = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Report LLM scheduler queue depth, wait times and rate-limit budgets
+    """
+    stats = llm_scheduler.get_stats()
+    stats["summary_prefetch"] = summary_prefetcher.get_stats()
+    stats["jobs"] = job_service.get_stats()
+    stats["digests"] = digest_service.get_stats()
+    return stats
+
+
+
+@router.get("/llm/routes")
+async def get_route_stats(
+    current_user: User = Depends(get_current_user)
+) -> Dict[str, Any]:
+    """
+    Report rolling latency and error statistics per LLM route and endpoint/model target
+    """
+    return model_router.get_stats()
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from models.ratings import RatingRequest, RatingResponse, DocumentRatings
+from models.user import User
+from services.ratings_service import ratings_service
+from middleware.auth import get_current_user
+
+router = APIRouter()
+
+
+@router.post("/ratings", response_model=RatingResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_rating(
+    request: RatingRequest,
+    current_user: User = Depends(get_current_user)
+) -> RatingResponse:
+    """
+    Record a thumbs up/down (or clear it with 0) for a document
+    The event is buffered and written in bulk; the document's ratings summary is updated by a periodic rollup
+    """
+    return ratings_service.submit(request, current_user)
+
+
+@router.get("/ratings/{document_id}", response_model=DocumentRatings)
+async def get_document_ratings(
+    document_id: str,
+    current_user: User = Depends(get_current_user)
+) -> DocumentRatings:
+    """
+    Current rating totals for a document, including the caller's own rating
+    """
+    try:
+        return await ratings_service.get_document_ratings(document_id, current_user)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Ratings lookup failed: {str(e)}")
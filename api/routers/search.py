@@ -3,7 +3,10 @@ from typing import Dict, Any
 from models.search import SearchRequest, SearchResponse
 from models.user import User
 from services.elasticsearch_service import ElasticsearchService
+from services.llm_service import LLMService
+from services.analytics_service import analytics_service
 from middleware.auth import get_current_user
+from config import settings
 
 router = APIRouter()
 
@@ -20,10 +23,18 @@ async def search_documents(
     try:
         elasticsearch_service = ElasticsearchService()
         result = await elasticsearch_service.search(request, current_user)
-        return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
+    # Queued only; written to the analytics index in the background
+    result.search_id = analytics_service.record_search(request, current_user, result)
+
+    if settings.LLM_SUMMARY_PREFETCH_ENABLED:
+        # Runs in the background; the follow-up /llm/summary call joins or reads it
+        LLMService().prefetch_summary(request.query, result.results, current_user)
+
+    return result
+
 
 @router.get("/search/test-connection")
 async def test_search_connection(
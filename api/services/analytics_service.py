@@ -0,0 +1,160 @@
+import random
+import uuid
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from models.analytics import ClickEvent
+from models.search import SearchRequest, SearchResponse
+from models.user import User
+from services.bulk_buffer import BulkBuffer
+from services.elasticsearch_service import ElasticsearchService
+from services.model_routing import RouteTarget
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Result ids kept per search event
+MAX_RESULT_IDS = 20
+
+
+class AnalyticsService:
+    """
+    Non-blocking recording of searches, clicks and LLM calls.
+    Recording only samples the event and appends it to an in-process bounded
+    buffer; a background task writes batches to the analytics index with _bulk.
+    When Elasticsearch falls behind the oldest queued events are dropped, so
+    request latency never depends on analytics writes.
+    """
+
+    def __init__(
+        self,
+        index: str,
+        enabled: bool,
+        sample_rates: Dict[str, float],
+        flush_size: int,
+        flush_interval: float,
+        max_pending: int
+    ):
+        self.index = index
+        self.enabled = enabled
+        self.sample_rates = sample_rates
+        self.buffer = BulkBuffer(
+            "analytics",
+            self._write_events,
+            max_batch=flush_size,
+            flush_interval=flush_interval,
+            max_pending=max_pending
+        )
+        self._stats = {event_type: {"recorded": 0, "sampled_out": 0} for event_type in sample_rates}
+
+    async def start(self) -> None:
+        if self.enabled:
+            self.buffer.start()
+
+    async def stop(self) -> None:
+        if self.enabled:
+            await self.buffer.stop()
+
+    def record_search(self, request: SearchRequest, user: User, response: SearchResponse) -> str:
+        """Record a search; returns the search id clicks should refer back to"""
+        search_id = str(uuid.uuid4())
+        self._record("search", search_id, {
+            "search_id": search_id,
+            **self._user_fields(user),
+            "query": request.query,
+            "filters": request.filters.model_dump(exclude_none=True) if request.filters else {},
+            "total": response.total,
+            "took_ms": response.took,
+            "result_ids": [result.id for result in response.results[:MAX_RESULT_IDS]]
+        })
+        return search_id
+
+    def record_click(self, click: ClickEvent, user: User) -> bool:
+        return self._record("click", click.search_id, {
+            **self._user_fields(user),
+            **click.model_dump(exclude_none=True)
+        })
+
+    def record_llm_call(
+        self,
+        route: str,
+        lane: str,
+        target: RouteTarget,
+        latency_seconds: float,
+        estimated_tokens: int,
+        success: bool
+    ) -> bool:
+        return self._record("llm", None, {
+            "route": route,
+            "lane": lane,
+            "upstream": target.upstream.name,
+            "model": target.model,
+            "latency_ms": round(latency_seconds * 1000, 1),
+            "estimated_tokens": estimated_tokens,
+            "success": success
+        })
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "index": self.index,
+            "sample_rates": self.sample_rates,
+            "events": self._stats,
+            "buffer": self.buffer.get_stats()
+        }
+
+    def _record(self, event_type: str, sample_key: Optional[str], fields: Dict[str, Any]) -> bool:
+        if not self.enabled:
+            return False
+        rate = self.sample_rates[event_type]
+        if not self._sampled(rate, sample_key):
+            self._stats[event_type]["sampled_out"] += 1
+            return False
+
+        self.buffer.add({
+            "event_id": str(uuid.uuid4()),
+            "event_type": event_type,
+            "timestamp": datetime.utcnow().isoformat(),
+            # Lets aggregations scale sampled counts back up
+            "sample_rate": rate,
+            **{key: value for key, value in fields.items() if value is not None}
+        })
+        self._stats[event_type]["recorded"] += 1
+        return True
+
+    def _sampled(self, rate: float, key: Optional[str]) -> bool:
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        if key is None:
+            return random.random() < rate
+        # Hashing the search id keeps a search and its clicks in or out of the sample together
+        return zlib.crc32(key.encode()) / 0xFFFFFFFF < rate
+
+    def _user_fields(self, user: User) -> Dict[str, Any]:
+        return {"user_id": user.id, "user_department": user.department, "user_role": user.role.value}
+
+    async def _write_events(self, events: List[Dict[str, Any]]) -> None:
+        operations = []
+        for event in events:
+            # Explicit ids keep retried batches idempotent
+            operations.append({"index": {"_index": self.index, "_id": event["event_id"]}})
+            operations.append(event)
+        await ElasticsearchService().bulk(operations)
+
+
+analytics_service = AnalyticsService(
+    index=settings.ANALYTICS_INDEX or f"{settings.ELASTICSEARCH_INDEX}_analytics",
+    enabled=settings.ANALYTICS_ENABLED,
+    sample_rates={
+        "search": settings.ANALYTICS_SEARCH_SAMPLE_RATE,
+        "click": settings.ANALYTICS_CLICK_SAMPLE_RATE,
+        "llm": settings.ANALYTICS_LLM_SAMPLE_RATE
+    },
+    flush_size=settings.ANALYTICS_FLUSH_SIZE,
+    flush_interval=settings.ANALYTICS_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.ANALYTICS_MAX_PENDING
+)
@@ -0,0 +1,90 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BulkBuffer:
+    """
+    Write-behind buffer that batches documents for a bulk sink.
+    Items are flushed when max_batch accumulate or every flush_interval seconds,
+    whichever comes first. Failed batches are kept for the next flush, and once
+    max_pending is reached the oldest items are dropped rather than blocking callers.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        sink: Callable[[List[Dict[str, Any]]], Awaitable[None]],
+        max_batch: int,
+        flush_interval: float,
+        max_pending: int
+    ):
+        self.name = name
+        self.sink = sink
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: List[Dict[str, Any]] = []
+        self._flush_lock = asyncio.Lock()
+        self._batch_ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"added": 0, "flushed": 0, "dropped": 0, "failed_flushes": 0}
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Last chance to persist what is buffered
+        await self.flush()
+
+    def add(self, item: Dict[str, Any]) -> None:
+        self._pending.append(item)
+        self._stats["added"] += 1
+        if len(self._pending) > self.max_pending:
+            overflow = len(self._pending) - self.max_pending
+            del self._pending[:overflow]
+            self._stats["dropped"] += overflow
+            logger.warning(f"{self.name} buffer full, dropped {overflow} oldest items")
+        if len(self._pending) >= self.max_batch:
+            self._batch_ready.set()
+
+    async def flush(self) -> int:
+        """Send everything buffered; returns the number of items written"""
+        async with self._flush_lock:
+            written = 0
+            while self._pending:
+                batch = self._pending[:self.max_batch]
+                del self._pending[:len(batch)]
+                try:
+                    await self.sink(batch)
+                except Exception as e:
+                    # Put the batch back in front so ordering is preserved on retry
+                    self._pending[:0] = batch
+                    self._stats["failed_flushes"] += 1
+                    logger.error(f"{self.name} flush of {len(batch)} items failed: {e}")
+                    break
+                written += len(batch)
+                self._stats["flushed"] += len(batch)
+            return written
+
+    def pending_items(self) -> List[Dict[str, Any]]:
+        """Items not yet written, oldest first"""
+        return list(self._pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "pending": len(self._pending)}
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self.flush()
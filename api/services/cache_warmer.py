@@ -0,0 +1,180 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.search import SearchRequest
+from models.user import User, UserRole
+from services.analytics_service import analytics_service
+from services.elasticsearch_service import ElasticsearchService
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Searches as a neutral employee so warming doesn't favour one department
+WARMER_USER = User(
+    id="cache-warmer",
+    name="Cache Warmer",
+    email="cache-warmer@example.com",
+    department="",
+    position="",
+    role=UserRole.EMPLOYEE
+)
+
+
+class CacheWarmer:
+    """
+    Replays the most common searches so the first real users after a deploy
+    or an ingestion run don't pay for cold shard caches, cold inference and an
+    empty document cache. Queries come from the search analytics index, topped
+    up from a configured list. A pass runs at startup and again whenever the
+    index's document count or backing index changes, with bounded concurrency
+    so live traffic keeps priority.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        configured_queries: List[str],
+        top_n: int,
+        lookback_days: int,
+        concurrency: int,
+        poll_seconds: float
+    ):
+        self.enabled = enabled
+        self.configured_queries = configured_queries
+        self.top_n = top_n
+        self.lookback_days = lookback_days
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self._ready = not enabled
+        self._signature: Optional[Tuple] = None
+        self._task: Optional[asyncio.Task] = None
+        self._progress: Dict[str, Any] = {"state": "disabled" if not enabled else "pending"}
+
+    async def start(self) -> None:
+        if self.enabled:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    @property
+    def ready(self) -> bool:
+        """True once the startup pass has finished (successfully or not)"""
+        return self._ready
+
+    def get_progress(self) -> Dict[str, Any]:
+        return {**self._progress, "ready": self._ready}
+
+    async def warm(self, reason: str) -> int:
+        """Replay the top queries once; returns the number that succeeded"""
+        queries, query_source = await self._select_queries()
+        self._progress = {
+            "state": "warming",
+            "reason": reason,
+            "query_source": query_source,
+            "total": len(queries),
+            "completed": 0,
+            "failed": 0,
+            "started_at": datetime.utcnow().isoformat(),
+            "finished_at": None
+        }
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        service = ElasticsearchService()
+
+        async def replay(query: str) -> None:
+            async with semaphore:
+                try:
+                    await service.search(SearchRequest(query=query), WARMER_USER)
+                    self._progress["completed"] += 1
+                except Exception as e:
+                    self._progress["failed"] += 1
+                    logger.debug(f"Warm-up query '{query}' failed: {e}")
+
+        await asyncio.gather(*(replay(query) for query in queries))
+        self._progress["state"] = "warm"
+        self._progress["finished_at"] = datetime.utcnow().isoformat()
+        logger.info(
+            f"Cache warm-up ({reason}) replayed {self._progress['completed']} of {len(queries)} {query_source} queries"
+        )
+        return self._progress["completed"]
+
+    async def _select_queries(self) -> Tuple[List[str], str]:
+        queries: List[str] = []
+        query_source = "configured"
+        if analytics_service.enabled:
+            body = {
+                "size": 0,
+                "query": {
+                    "bool": {
+                        "filter": [
+                            {"term": {"event_type": "search"}},
+                            {"range": {"timestamp": {"gte": f"now-{self.lookback_days}d"}}}
+                        ]
+                    }
+                },
+                "aggs": {"queries": {"terms": {"field": "query.keyword", "size": self.top_n}}}
+            }
+            try:
+                data = await ElasticsearchService().search_raw(analytics_service.index, body)
+                queries = [bucket["key"] for bucket in data["aggregations"]["queries"]["buckets"]]
+                if queries:
+                    query_source = "analytics"
+            except Exception as e:
+                logger.warning(f"Could not read top queries from search analytics, using configured queries: {e}")
+
+        seen = {query.lower() for query in queries}
+        for query in self.configured_queries:
+            if len(queries) >= self.top_n:
+                break
+            if query.lower() not in seen:
+                seen.add(query.lower())
+                queries.append(query)
+        return queries[:self.top_n], query_source
+
+    async def _index_signature(self) -> Optional[Tuple]:
+        """Backing index names, uuids and document counts; changes after ingestion or an alias swap"""
+        try:
+            data = await ElasticsearchService().get_index_stats("docs")
+        except Exception as e:
+            logger.warning(f"Could not read index stats for cache warming: {e}")
+            return None
+        return tuple(sorted(
+            (name, stats.get("uuid"), stats["primaries"]["docs"]["count"])
+            for name, stats in data.get("indices", {}).items()
+        ))
+
+    async def _loop(self) -> None:
+        self._signature = await self._index_signature()
+        try:
+            await self.warm("startup")
+        except Exception as e:
+            logger.error(f"Startup cache warm-up failed: {e}")
+        finally:
+            self._ready = True
+
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            signature = await self._index_signature()
+            if signature is None or signature == self._signature:
+                continue
+            self._signature = signature
+            try:
+                await self.warm("index_changed")
+            except Exception as e:
+                logger.error(f"Cache warm-up after index change failed: {e}")
+
+
+cache_warmer = CacheWarmer(
+    enabled=settings.WARMER_ENABLED,
+    configured_queries=[query.strip() for query in settings.WARMER_QUERIES.split(",") if query.strip()],
+    top_n=settings.WARMER_TOP_N,
+    lookback_days=settings.WARMER_LOOKBACK_DAYS,
+    concurrency=settings.WARMER_CONCURRENCY,
+    poll_seconds=settings.WARMER_POLL_SECONDS
+)
@@ -0,0 +1,320 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from models.digests import SavedSearchRequest, SavedSearch, SearchAlert, Digest
+from models.search import SearchRequest, SearchFilter, SearchResponse
+from models.user import User
+from services.elasticsearch_service import ElasticsearchService
+from services.llm_service import LLMService
+from services.sqlite_store import SQLiteStore
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+DIGESTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS saved_searches (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    user_json TEXT NOT NULL,
+    name TEXT NOT NULL,
+    query TEXT NOT NULL,
+    filters_json TEXT NOT NULL,
+    interval_hours INTEGER NOT NULL,
+    max_results INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    last_run_at TEXT,
+    next_run_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS saved_searches_due ON saved_searches (next_run_at);
+CREATE INDEX IF NOT EXISTS saved_searches_user ON saved_searches (user_id, created_at);
+
+CREATE TABLE IF NOT EXISTS digests (
+    id TEXT PRIMARY KEY,
+    saved_search_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    window_start TEXT NOT NULL,
+    window_end TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    results_json TEXT NOT NULL,
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS digests_saved_search ON digests (saved_search_id, created_at);
+CREATE INDEX IF NOT EXISTS digests_user ON digests (user_id, created_at);
+"""
+
+
+def _now() -> datetime:
+    return datetime.utcnow()
+
+
+class DigestService:
+    """
+    Server-side saved searches with scheduled "what changed" digests.
+    Every poll, all saved searches that are due run as a single _msearch batch
+    limited to documents newer than each search's previous run. Digests are
+    then written by a bounded number of concurrent background-lane LLM calls
+    and stored so reading them is a plain SQLite lookup.
+    Saved searches are also registered in the percolator index so ingestion
+    can record per-document alerts without re-running them.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        enabled: bool,
+        poll_seconds: float,
+        batch_size: int,
+        llm_concurrency: int,
+        max_results: int,
+        percolator_enabled: bool
+    ):
+        self.store = SQLiteStore(db_path, DIGESTS_SCHEMA)
+        self.enabled = enabled
+        self.percolator_enabled = percolator_enabled
+        self.poll_seconds = poll_seconds
+        self.batch_size = batch_size
+        self.llm_concurrency = llm_concurrency
+        self.max_results = max_results
+        self._task: Optional[asyncio.Task] = None
+        self._wake = asyncio.Event()
+        self._stats = {"runs": 0, "searches_run": 0, "digests_generated": 0, "search_failures": 0}
+
+    async def start(self) -> None:
+        await self.store.initialize()
+        if not self.enabled:
+            logger.info("Digest scheduler disabled; saved searches are stored but not run")
+            return
+        self._task = asyncio.create_task(self._loop())
+        logger.info(f"Digest scheduler started, polling every {self.poll_seconds}s")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def create_saved_search(self, request: SavedSearchRequest, user: User) -> SavedSearch:
+        saved_search_id = str(uuid.uuid4())
+        now = _now().isoformat()
+        await self.store.execute(
+            """
+            INSERT INTO saved_searches
+                (id, user_id, user_json, name, query, filters_json, interval_hours, max_results, created_at, next_run_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                saved_search_id, user.id, user.model_dump_json(), request.name, request.query,
+                (request.filters or SearchFilter()).model_dump_json(), request.interval_hours,
+                request.max_results or self.max_results, now, now
+            )
+        )
+        if self.percolator_enabled:
+            try:
+                await ElasticsearchService().register_saved_search(
+                    saved_search_id, request.name,
+                    SearchRequest(query=request.query, filters=request.filters or SearchFilter()), user
+                )
+            except Exception as e:
+                # Digests still work; only ingest-time alerts are missed
+                logger.warning(f"Could not register saved search {saved_search_id} for percolation: {e}")
+
+        # New searches get their first digest on the next scheduler pass
+        self._wake.set()
+        return await self.get_saved_search(saved_search_id, user)
+
+    async def get_saved_search(self, saved_search_id: str, user: User) -> Optional[SavedSearch]:
+        row = await self.store.fetchone(
+            "SELECT * FROM saved_searches WHERE id = ? AND user_id = ?", (saved_search_id, user.id)
+        )
+        return self._to_saved_search(row) if row is not None else None
+
+    async def list_saved_searches(self, user: User) -> List[SavedSearch]:
+        rows = await self.store.fetchall(
+            "SELECT * FROM saved_searches WHERE user_id = ? ORDER BY created_at DESC", (user.id,)
+        )
+        return [self._to_saved_search(row) for row in rows]
+
+    async def delete_saved_search(self, saved_search_id: str, user: User) -> bool:
+        deleted = await self.store.execute(
+            "DELETE FROM saved_searches WHERE id = ? AND user_id = ?", (saved_search_id, user.id)
+        )
+        if deleted:
+            await self.store.execute("DELETE FROM digests WHERE saved_search_id = ?", (saved_search_id,))
+            if self.percolator_enabled:
+                try:
+                    await ElasticsearchService().unregister_saved_search(saved_search_id)
+                except Exception as e:
+                    logger.warning(f"Could not remove saved search {saved_search_id} from the percolator: {e}")
+        return bool(deleted)
+
+    async def list_alerts(self, user: User, saved_search_id: Optional[str] = None, limit: int = 50) -> List[SearchAlert]:
+        """Documents matched against the user's saved searches at ingest time"""
+        alerts = await ElasticsearchService().get_search_alerts(user.id, saved_search_id, limit)
+        return [SearchAlert(**alert) for alert in alerts]
+
+    async def schedule_now(self, saved_search_id: str, user: User) -> Optional[SavedSearch]:
+        """Make a saved search due immediately and wake the scheduler"""
+        updated = await self.store.execute(
+            "UPDATE saved_searches SET next_run_at = ? WHERE id = ? AND user_id = ?",
+            (_now().isoformat(), saved_search_id, user.id)
+        )
+        if not updated:
+            return None
+        self._wake.set()
+        return await self.get_saved_search(saved_search_id, user)
+
+    async def list_digests(self, user: User, saved_search_id: Optional[str] = None, limit: int = 20) -> List[Digest]:
+        if saved_search_id:
+            rows = await self.store.fetchall(
+                """
+                SELECT d.*, s.name AS saved_search_name FROM digests d JOIN saved_searches s ON s.id = d.saved_search_id
+                WHERE d.user_id = ? AND d.saved_search_id = ? ORDER BY d.created_at DESC LIMIT ?
+                """,
+                (user.id, saved_search_id, limit)
+            )
+        else:
+            rows = await self.store.fetchall(
+                """
+                SELECT d.*, s.name AS saved_search_name FROM digests d JOIN saved_searches s ON s.id = d.saved_search_id
+                WHERE d.user_id = ? ORDER BY d.created_at DESC LIMIT ?
+                """,
+                (user.id, limit)
+            )
+        return [self._to_digest(row) for row in rows]
+
+    async def run_due(self) -> int:
+        """Run every saved search that is due; returns the number of digests stored"""
+        now = _now()
+        rows = await self.store.fetchall(
+            "SELECT * FROM saved_searches WHERE next_run_at <= ? ORDER BY next_run_at LIMIT ?",
+            (now.isoformat(), self.batch_size)
+        )
+        if not rows:
+            return 0
+
+        window_end = now.isoformat()
+        searches = []
+        for row in rows:
+            # The first run covers one interval back from now
+            window_start = row["last_run_at"] or (now - timedelta(hours=row["interval_hours"])).isoformat()
+            request = SearchRequest(
+                query=row["query"],
+                filters=SearchFilter(**json.loads(row["filters_json"])),
+                size=row["max_results"]
+            )
+            searches.append((request, User(**json.loads(row["user_json"])), window_start))
+
+        try:
+            responses = await ElasticsearchService().multi_search(searches)
+        except Exception as e:
+            # Leave the searches due so the next poll retries the batch
+            logger.error(f"Digest batch search failed for {len(rows)} saved searches: {e}")
+            self._stats["search_failures"] += len(rows)
+            return 0
+
+        self._stats["runs"] += 1
+        self._stats["searches_run"] += len(rows)
+        semaphore = asyncio.Semaphore(self.llm_concurrency)
+
+        async def build(row, search, response: Optional[SearchResponse]) -> bool:
+            request, user, window_start = search
+            if response is None:
+                self._stats["search_failures"] += 1
+                return False
+
+            summary = None
+            if response.results:
+                async with semaphore:
+                    summary = await LLMService().generate_digest(row["name"], request.query, response.results, user)
+
+            await self.store.execute(
+                """
+                INSERT INTO digests
+                    (id, saved_search_id, user_id, created_at, window_start, window_end, total, results_json, summary)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    str(uuid.uuid4()), row["id"], row["user_id"], _now().isoformat(), window_start, window_end,
+                    response.total, json.dumps([result.model_dump() for result in response.results]), summary
+                )
+            )
+            await self.store.execute(
+                "UPDATE saved_searches SET last_run_at = ?, next_run_at = ? WHERE id = ?",
+                (window_end, (now + timedelta(hours=row["interval_hours"])).isoformat(), row["id"])
+            )
+            return True
+
+        outcomes = await asyncio.gather(
+            *(build(row, search, response) for row, search, response in zip(rows, searches, responses)),
+            return_exceptions=True
+        )
+        stored = 0
+        for row, outcome in zip(rows, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Digest for saved search {row['id']} failed: {outcome}")
+            elif outcome:
+                stored += 1
+        self._stats["digests_generated"] += stored
+        logger.info(f"Digest run stored {stored} of {len(rows)} due saved searches")
+        return stored
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "running": self._task is not None and not self._task.done()}
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                # A full batch may mean more searches are waiting
+                while await self.run_due() >= self.batch_size:
+                    pass
+            except Exception as e:
+                logger.error(f"Digest scheduler pass failed: {e}")
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def _to_saved_search(self, row) -> SavedSearch:
+        return SavedSearch(
+            id=row["id"],
+            name=row["name"],
+            query=row["query"],
+            filters=SearchFilter(**json.loads(row["filters_json"])),
+            interval_hours=row["interval_hours"],
+            max_results=row["max_results"],
+            created_at=row["created_at"],
+            last_run_at=row["last_run_at"],
+            next_run_at=row["next_run_at"]
+        )
+
+    def _to_digest(self, row) -> Digest:
+        return Digest(
+            id=row["id"],
+            saved_search_id=row["saved_search_id"],
+            saved_search_name=row["saved_search_name"],
+            created_at=row["created_at"],
+            window_start=row["window_start"],
+            window_end=row["window_end"],
+            total=row["total"],
+            results=json.loads(row["results_json"]),
+            summary=row["summary"]
+        )
+
+
+digest_service = DigestService(
+    db_path=settings.DIGESTS_DB_PATH,
+    enabled=settings.DIGEST_SCHEDULER_ENABLED,
+    poll_seconds=settings.DIGEST_POLL_SECONDS,
+    batch_size=settings.DIGEST_BATCH_SIZE,
+    llm_concurrency=settings.DIGEST_LLM_CONCURRENCY,
+    max_results=settings.DIGEST_MAX_RESULTS,
+    percolator_enabled=settings.ELASTICSEARCH_PERCOLATOR_ENABLED
+)
@@ -1,13 +1,27 @@
 import httpx
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, AsyncIterator
 from models.search import SearchRequest, SearchResult, SearchResponse, SearchFilter
 from models.user import User
 from config import settings
+from services.cache import TTLCache
+from services.embedder import query_embedder
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Fields needed to rebuild a SearchResult; skips semantic_* and nested user_ratings
+DOCUMENT_SOURCE_FIELDS = [
+    "title", "summary", "content", "source", "url", "author",
+    "timestamp", "content_type", "tags", "abstract", "key_facts"
+]
+
+# Shared across requests; keyed by (index, document id)
+document_cache = TTLCache(
+    max_size=settings.ELASTICSEARCH_DOCUMENT_CACHE_SIZE,
+    ttl_seconds=settings.ELASTICSEARCH_DOCUMENT_CACHE_TTL_SECONDS
+)
+
 
 class ElasticsearchService:
     def __init__(self):
@@ -19,7 +33,19 @@ class ElasticsearchService:
         self.semantic_enabled = settings.ELASTICSEARCH_SEMANTIC_ENABLED
         self.semantic_model = settings.ELASTICSEARCH_SEMANTIC_MODEL
         self.semantic_field_prefix = settings.ELASTICSEARCH_SEMANTIC_FIELD_PREFIX
+        self.semantic_field_mode = settings.ELASTICSEARCH_SEMANTIC_FIELD_MODE
         self.hybrid_weight = settings.ELASTICSEARCH_HYBRID_SEARCH_WEIGHT
+        self.vector_enabled = settings.ELASTICSEARCH_VECTOR_ENABLED
+        self.vector_field = settings.ELASTICSEARCH_VECTOR_FIELD
+        self.vector_num_candidates = settings.ELASTICSEARCH_VECTOR_NUM_CANDIDATES
+        self.passages_enabled = settings.ELASTICSEARCH_PASSAGES_ENABLED
+        self.passages_per_hit = settings.ELASTICSEARCH_PASSAGES_PER_HIT
+        self.collapse_duplicates = settings.ELASTICSEARCH_COLLAPSE_DUPLICATES
+        self.rating_boost = settings.ELASTICSEARCH_RATING_BOOST
+        self.freshness_boost = settings.ELASTICSEARCH_FRESHNESS_BOOST
+        self.freshness_pivot = settings.ELASTICSEARCH_FRESHNESS_PIVOT
+        self.percolator_index = settings.ELASTICSEARCH_PERCOLATOR_INDEX or f"{self.index}_saved_searches"
+        self.alerts_index = settings.ELASTICSEARCH_ALERTS_INDEX or f"{self.index}_search_alerts"
 
     def _get_headers(self) -> Dict[str, str]:
         headers = {"Content-Type": "application/json"}
@@ -90,6 +116,60 @@ class ElasticsearchService:
             logger.error(f"Elasticsearch connection test failed: {e}")
             raise
 
+    async def verify_index(self) -> None:
+        """
+        Check at startup that the index can serve the configured search options.
+        Raises RuntimeError on a mismatch; an unreachable cluster is only logged
+        so the API can start before Elasticsearch does.
+        """
+        if not self.vector_enabled and not self.collapse_duplicates:
+            return
+        try:
+            async with httpx.AsyncClient() as client:
+                if self.vector_enabled:
+                    response = await client.get(
+                        f"{self.endpoint}/{self.index}/_mapping/field/{self.vector_field}",
+                        headers=self._get_headers()
+                    )
+                    response.raise_for_status()
+                    mappings = response.json()
+                if self.collapse_duplicates:
+                    response = await client.post(
+                        f"{self.endpoint}/{self.index}/_count",
+                        headers=self._get_headers(),
+                        json={"query": {"bool": {"must_not": [{"exists": {"field": "dup_cluster"}}]}}}
+                    )
+                    response.raise_for_status()
+                    unclustered = response.json()["count"]
+        except Exception as e:
+            logger.warning(f"Could not verify the index at startup: {e}")
+            return
+
+        if self.vector_enabled:
+            self._verify_vector_field(mappings)
+        # Collapse puts every document without a cluster id into a single group
+        if self.collapse_duplicates and unclustered:
+            raise RuntimeError(
+                f"ELASTICSEARCH_COLLAPSE_DUPLICATES is set but {unclustered} documents in '{self.index}' "
+                f"have no dup_cluster; run `python dedup.py` in python/ to backfill them"
+            )
+
+    def _verify_vector_field(self, mappings: Dict[str, Any]) -> None:
+        leaf = self.vector_field.rsplit(".", 1)[-1]
+        # Keyed by each concrete index behind the alias
+        for index_name, index_mapping in mappings.items():
+            field = index_mapping.get("mappings", {}).get(self.vector_field)
+            if field is None:
+                raise RuntimeError(
+                    f"ELASTICSEARCH_VECTOR_ENABLED is set but '{index_name}' has no '{self.vector_field}' field"
+                )
+            dims = field["mapping"][leaf].get("dims")
+            if dims != settings.EMBEDDER_DIMS:
+                raise RuntimeError(
+                    f"EMBEDDER_DIMS is {settings.EMBEDDER_DIMS} but '{self.vector_field}' in '{index_name}' "
+                    f"has {dims} dims; set it to the VECTOR_DIMS the index was created with"
+                )
+
     async def search(self, request: SearchRequest, user: User) -> SearchResponse:
         """Perform search using Elasticsearch"""
         try:
@@ -101,6 +181,216 @@ class ElasticsearchService:
             logger.error(f"Search failed: {e}")
             raise
 
+    async def get_documents(self, document_ids: List[str]) -> List[SearchResult]:
+        """Fetch documents by id in one _mget call, serving repeats from the document cache"""
+        if not self.index:
+            raise ValueError("ELASTICSEARCH_INDEX must be set to resolve documents by id")
+
+        documents: Dict[str, SearchResult] = {}
+        missing = []
+        for document_id in dict.fromkeys(document_ids):
+            cached = document_cache.get((self.index, document_id))
+            if cached is not None:
+                documents[document_id] = cached
+            else:
+                missing.append(document_id)
+
+        if missing:
+            async with httpx.AsyncClient() as client:
+                response = await client.post(
+                    f"{self.endpoint}/{self.index}/_mget",
+                    headers=self._get_headers(),
+                    params={"_source_includes": ",".join(DOCUMENT_SOURCE_FIELDS)},
+                    json={"ids": missing}
+                )
+                response.raise_for_status()
+                data = response.json()
+
+            for doc in data.get("docs", []):
+                if not doc.get("found"):
+                    logger.warning(f"Document '{doc.get('_id')}' not found in index '{self.index}'")
+                    continue
+                result = self._hit_to_result(doc)
+                document_cache.set((self.index, result.id), result)
+                documents[result.id] = result
+
+        return [documents[document_id] for document_id in document_ids if document_id in documents]
+
+    async def multi_search(
+        self, searches: List[Tuple[SearchRequest, User, Optional[str]]]
+    ) -> List[Optional[SearchResponse]]:
+        """
+        Run many direct searches in one _msearch call.
+        Each search is (request, user, newer_than); newer_than limits hits to documents
+        ingested after it (ingested_at, or timestamp for documents loaded before that
+        field existed). Failed searches come back as None.
+        """
+        if not self.index:
+            raise ValueError("ELASTICSEARCH_INDEX must be set for batched searches")
+        if not searches:
+            return []
+
+        query_vectors = [None] * len(searches)
+        if self.vector_enabled:
+            query_vectors = await query_embedder.embed_queries([request.query for request, _, _ in searches])
+
+        lines = []
+        for (request, user, newer_than), query_vector in zip(searches, query_vectors):
+            body = self._build_search_body(request, user, query_vector=query_vector)
+            if newer_than:
+                newer_filter = self._build_newer_than_filter(newer_than)
+                body["query"]["bool"]["filter"].append(newer_filter)
+                if "knn" in body:
+                    body["knn"]["filter"].append(newer_filter)
+            lines.append(json.dumps({}))
+            lines.append(json.dumps(body))
+
+        headers = self._get_headers()
+        headers["Content-Type"] = "application/x-ndjson"
+        async with httpx.AsyncClient(timeout=60) as client:
+            response = await client.post(
+                f"{self.endpoint}/{self.index}/_msearch",
+                headers=headers,
+                content="\n".join(lines) + "\n"
+            )
+            response.raise_for_status()
+            data = response.json()
+
+        results = []
+        for (request, _, _), item in zip(searches, data.get("responses", [])):
+            if "error" in item:
+                logger.error(f"Batched search for '{request.query}' failed: {item['error']}")
+                results.append(None)
+            else:
+                results.append(self._process_search_response(item, request))
+        return results
+
+    async def bulk(self, operations: List[Dict[str, Any]], raise_on_error: bool = True) -> Dict[str, Any]:
+        """Send action/source lines to _bulk; raises if the request fails or (by default) any item errors"""
+        headers = self._get_headers()
+        headers["Content-Type"] = "application/x-ndjson"
+        async with httpx.AsyncClient(timeout=60) as client:
+            response = await client.post(
+                f"{self.endpoint}/_bulk",
+                headers=headers,
+                content="\n".join(json.dumps(operation) for operation in operations) + "\n"
+            )
+            response.raise_for_status()
+            data = response.json()
+
+        if data.get("errors") and raise_on_error:
+            failed = [item for item in data.get("items", []) if next(iter(item.values())).get("error")]
+            raise RuntimeError(f"{len(failed)} bulk items failed, first error: {next(iter(failed[0].values()))['error']}")
+        return data
+
+    async def search_raw(self, index: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Run an arbitrary search body (e.g. aggregations) against an index"""
+        async with httpx.AsyncClient(timeout=60) as client:
+            response = await client.post(
+                f"{self.endpoint}/{index}/_search",
+                headers=self._get_headers(),
+                json=body
+            )
+            response.raise_for_status()
+            return response.json()
+
+    async def scan(self, index: str, body: Dict[str, Any], page_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every hit matching body, paging with a point in time and search_after"""
+        async with httpx.AsyncClient(timeout=60) as client:
+            response = await client.post(
+                f"{self.endpoint}/{index}/_pit", headers=self._get_headers(), params={"keep_alive": "1m"}
+            )
+            response.raise_for_status()
+            pit_id = response.json()["id"]
+            try:
+                search_after = None
+                while True:
+                    page = {
+                        **body,
+                        "size": page_size,
+                        "pit": {"id": pit_id, "keep_alive": "1m"},
+                        "sort": body.get("sort", []) + [{"_shard_doc": "asc"}]
+                    }
+                    if search_after is not None:
+                        page["search_after"] = search_after
+                    response = await client.post(f"{self.endpoint}/_search", headers=self._get_headers(), json=page)
+                    response.raise_for_status()
+                    data = response.json()
+                    hits = data.get("hits", {}).get("hits", [])
+                    for hit in hits:
+                        yield hit
+                    if len(hits) < page_size:
+                        break
+                    pit_id = data.get("pit_id", pit_id)
+                    search_after = hits[-1]["sort"]
+            finally:
+                await client.request(
+                    "DELETE", f"{self.endpoint}/_pit", headers=self._get_headers(), json={"id": pit_id}
+                )
+
+    async def get_index_stats(self, metric: str = "docs") -> Dict[str, Any]:
+        """Index-level stats for the configured index (or every index behind its alias)"""
+        async with httpx.AsyncClient() as client:
+            response = await client.get(f"{self.endpoint}/{self.index}/_stats/{metric}", headers=self._get_headers())
+            response.raise_for_status()
+            return response.json()
+
+    async def refresh(self, index: str) -> None:
+        async with httpx.AsyncClient() as client:
+            response = await client.post(f"{self.endpoint}/{index}/_refresh", headers=self._get_headers())
+            response.raise_for_status()
+
+    async def register_saved_search(self, saved_search_id: str, name: str, request: SearchRequest, user: User) -> None:
+        """Store a saved search's compiled query in the percolator index"""
+        query = self._build_search_body(request, user, lexical_only=True)["query"]
+        async with httpx.AsyncClient() as client:
+            response = await client.put(
+                f"{self.endpoint}/{self.percolator_index}/_doc/{saved_search_id}",
+                headers=self._get_headers(),
+                json={
+                    "query": query,
+                    "saved_search_id": saved_search_id,
+                    "saved_search_name": name,
+                    "user_id": user.id
+                }
+            )
+            response.raise_for_status()
+
+    async def unregister_saved_search(self, saved_search_id: str) -> None:
+        async with httpx.AsyncClient() as client:
+            response = await client.delete(
+                f"{self.endpoint}/{self.percolator_index}/_doc/{saved_search_id}",
+                headers=self._get_headers()
+            )
+            if response.status_code != 404:
+                response.raise_for_status()
+
+    async def get_search_alerts(
+        self, user_id: str, saved_search_id: Optional[str] = None, size: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Saved-search matches recorded at ingest time, newest first"""
+        filters = [{"term": {"user_id": user_id}}]
+        if saved_search_id:
+            filters.append({"term": {"saved_search_id": saved_search_id}})
+
+        async with httpx.AsyncClient() as client:
+            response = await client.post(
+                f"{self.endpoint}/{self.alerts_index}/_search",
+                headers=self._get_headers(),
+                json={
+                    "query": {"bool": {"filter": filters}},
+                    "sort": [{"matched_at": {"order": "desc"}}],
+                    "size": size
+                }
+            )
+            if response.status_code == 404:
+                # Nothing has been percolated yet
+                return []
+            response.raise_for_status()
+            data = response.json()
+
+        return [hit["_source"] for hit in data.get("hits", {}).get("hits", [])]
+
     async def _search_with_application(self, request: SearchRequest, user: User) -> SearchResponse:
         """Search using Elasticsearch Search Application"""
         search_params = {
@@ -144,7 +434,8 @@ class ElasticsearchService:
 
     async def _search_direct(self, request: SearchRequest, user: User) -> SearchResponse:
         """Direct Elasticsearch query"""
-        search_body = self._build_search_body(request, user)
+        query_vector = await query_embedder.embed_query(request.query) if self.vector_enabled else None
+        search_body = self._build_search_body(request, user, query_vector=query_vector)
 
         async with httpx.AsyncClient() as client:
             response = await client.post(
@@ -157,9 +448,21 @@ class ElasticsearchService:
 
         return self._process_search_response(data, request)
 
-    def _build_search_body(self, request: SearchRequest, user: User) -> Dict[str, Any]:
-        """Build Elasticsearch query body"""
-        semantic_enabled = request.semantic_enabled or self.semantic_enabled
+    def _build_search_body(
+        self,
+        request: SearchRequest,
+        user: User,
+        lexical_only: bool = False,
+        query_vector: Optional[List[float]] = None
+    ) -> Dict[str, Any]:
+        """
+        Build Elasticsearch query body
+        lexical_only compiles a query that can be stored in the percolator: no semantic
+        clauses (they need inference), no nested passages and no relative date filters
+        query_vector adds an approximate kNN search on the dense_vector field whose
+        scores are summed with the query's
+        """
+        semantic_enabled = (request.semantic_enabled or self.semantic_enabled) and not lexical_only
         hybrid_weight = request.hybrid_weight or self.hybrid_weight
 
         if semantic_enabled:
@@ -168,27 +471,16 @@ class ElasticsearchService:
                 "bool": {
                     "should": [
                         # Semantic search
-                        {
-                            "semantic": {
-                                "field": f"{self.semantic_field_prefix}content",
-                                "query": request.query,
-                                "boost": hybrid_weight
+                        *[
+                            {
+                                "semantic": {
+                                    "field": field,
+                                    "query": request.query,
+                                    "boost": hybrid_weight * boost
+                                }
                             }
-                        },
-                        {
-                            "semantic": {
-                                "field": f"{self.semantic_field_prefix}title",
-                                "query": request.query,
-                                "boost": hybrid_weight * 1.5
-                            }
-                        },
-                        {
-                            "semantic": {
-                                "field": f"{self.semantic_field_prefix}summary",
-                                "query": request.query,
-                                "boost": hybrid_weight * 1.2
-                            }
-                        },
+                            for field, boost in self._semantic_fields()
+                        ],
                         # Traditional lexical search
                         {
                             "multi_match": {
@@ -247,13 +539,23 @@ class ElasticsearchService:
         if request.filters.tags:
             filters.append({"terms": {"tags": request.filters.tags}})
         
-        if request.filters.date_range and request.filters.date_range != "all":
+        if request.filters.date_range and request.filters.date_range != "all" and not lexical_only:
             date_filter = self._build_date_filter(request.filters.date_range)
             if date_filter:
                 filters.append(date_filter)
 
         query["bool"]["filter"] = filters
 
+        # Match passages too and return the best ones as inner hits
+        if self.passages_enabled and not lexical_only:
+            query["bool"].setdefault("should", []).append(self._build_passage_query(request.query))
+
+        # Quality, recency and role signals only add to the score of documents that
+        # already match, which keeps top-k early termination possible (unlike sorting)
+        boosts = [] if lexical_only else self._build_scoring_boosts(user)
+        if boosts:
+            query = {"bool": {"must": [query], "should": boosts, "filter": []}}
+
         # Build complete search body
         search_body = {
             "query": query,
@@ -270,16 +572,110 @@ class ElasticsearchService:
             "from": request.from_
         }
 
+        if query_vector is not None and not lexical_only:
+            k = request.size + request.from_
+            search_body["knn"] = {
+                "field": self.vector_field,
+                "query_vector": query_vector,
+                "k": k,
+                "num_candidates": max(request.num_candidates or self.vector_num_candidates, k),
+                "boost": hybrid_weight,
+                "filter": list(filters)
+            }
+
+        # One hit per near-duplicate cluster, so result pages aren't filled with copies
+        if self.collapse_duplicates and not lexical_only:
+            search_body["collapse"] = {"field": "dup_cluster"}
+
+        # Full passage lists are only needed via inner hits, and vectors never
+        source_excludes = []
+        if self.passages_enabled:
+            source_excludes.append("passages")
+        if self.vector_enabled:
+            source_excludes.append(self.vector_field)
+        if source_excludes:
+            search_body["_source"] = {"excludes": source_excludes}
+
         # Add semantic highlighting if enabled
         if semantic_enabled:
             search_body["highlight"]["fields"].update({
-                f"{self.semantic_field_prefix}content": {},
-                f"{self.semantic_field_prefix}title": {},
-                f"{self.semantic_field_prefix}summary": {}
+                field: {} for field, _ in self._semantic_fields()
             })
 
         return search_body
 
+    def _semantic_fields(self) -> List[Tuple[str, float]]:
+        """semantic_text fields for the configured field layout, with their relative boosts"""
+        if self.semantic_field_mode == "combined":
+            # One field holds title, content and summary; weighted like the title clause
+            return [(f"{self.semantic_field_prefix}text", 1.5)]
+        return [
+            (f"{self.semantic_field_prefix}content", 1.0),
+            (f"{self.semantic_field_prefix}title", 1.5),
+            (f"{self.semantic_field_prefix}summary", 1.2)
+        ]
+
+    def _build_scoring_boosts(self, user: User) -> List[Dict[str, Any]]:
+        """Optional scoring clauses for ratings, freshness and the user's role"""
+        boosts = []
+        if self.rating_boost > 0:
+            boosts.append({
+                "rank_feature": {
+                    "field": "ratings.rank",
+                    # ratings.rank is 1.0 for unrated documents, so they score half the boost
+                    "saturation": {"pivot": 1.0},
+                    "boost": self.rating_boost
+                }
+            })
+        if self.freshness_boost > 0:
+            boosts.append({
+                "distance_feature": {
+                    "field": "timestamp",
+                    "origin": "now",
+                    "pivot": self.freshness_pivot,
+                    "boost": self.freshness_boost
+                }
+            })
+
+        role_boosts = self._get_role_boosts(user)
+        if role_boosts["department_boost"] > 1.0 and user.department:
+            boosts.append({"term": {"department": {"value": user.department, "boost": role_boosts["department_boost"]}}})
+        if role_boosts["priority"] > 1.0:
+            boosts.append({"terms": {"priority": ["Critical", "High"], "boost": role_boosts["priority"]}})
+        return boosts
+
+    def _build_passage_query(self, query_text: str) -> Dict[str, Any]:
+        """Nested passage clause; ignore_unmapped keeps older indices searchable"""
+        return {
+            "nested": {
+                "path": "passages",
+                "query": {"match": {"passages.text": query_text}},
+                "score_mode": "max",
+                "ignore_unmapped": True,
+                "inner_hits": {
+                    "size": self.passages_per_hit,
+                    "_source": ["passages.text"]
+                }
+            }
+        }
+
+    def _build_newer_than_filter(self, newer_than: str) -> Dict[str, Any]:
+        """Documents ingested after newer_than; timestamp stands in where ingested_at is missing"""
+        return {
+            "bool": {
+                "should": [
+                    {"range": {"ingested_at": {"gt": newer_than}}},
+                    {
+                        "bool": {
+                            "must_not": {"exists": {"field": "ingested_at"}},
+                            "filter": {"range": {"timestamp": {"gt": newer_than}}}
+                        }
+                    }
+                ],
+                "minimum_should_match": 1
+            }
+        }
+
     def _build_date_filter(self, date_range: str) -> Optional[Dict[str, Any]]:
         """Build date range filter"""
         date_filters = {
@@ -291,24 +687,16 @@ class ElasticsearchService:
 
     def _process_search_response(self, data: Dict[str, Any], request: SearchRequest) -> SearchResponse:
         """Process Elasticsearch response into SearchResponse model"""
-        results = []
-        for hit in data.get("hits", {}).get("hits", []):
-            source = hit.get("_source", {})
-            result = SearchResult(
-                id=hit.get("_id", ""),
-                title=source.get("title", "Untitled"),
-                summary=source.get("summary", source.get("content", "")[:200] + "..." if source.get("content") else ""),
-                source=source.get("source", "unknown"),
-                url=source.get("url", "#"),
-                author=source.get("author", "Unknown"),
-                date=source.get("timestamp", "Unknown"),
-                content_type=source.get("content_type", "document"),
-                tags=source.get("tags", []),
-                relevance_score=round(hit.get("_score", 0) * 10),
-                highlights=hit.get("highlight", {}),
-                content=source.get("content", source.get("summary", ""))
-            )
-            results.append(result)
+        results = [self._hit_to_result(hit) for hit in data.get("hits", {}).get("hits", [])]
+
+        # Follow-up LLM calls usually reference these hits by id, possibly for another
+        # query, so only the query-independent fields are cached
+        if self.index:
+            for result in results:
+                document_cache.set(
+                    (self.index, result.id),
+                    result.model_copy(update={"passages": [], "highlights": {}, "relevance_score": 0})
+                )
 
         return SearchResponse(
             results=results,
@@ -317,4 +705,26 @@ class ElasticsearchService:
             took=data.get("took", 0),
             filters_applied=request.filters,
             search_mode="elasticsearch"
-        )
\ No newline at end of file
+        )
+
+    def _hit_to_result(self, hit: Dict[str, Any]) -> SearchResult:
+        """Convert a search hit or _mget doc into a SearchResult"""
+        source = hit.get("_source", {})
+        passage_hits = hit.get("inner_hits", {}).get("passages", {}).get("hits", {}).get("hits", [])
+        return SearchResult(
+            id=hit.get("_id", ""),
+            title=source.get("title", "Untitled"),
+            summary=source.get("summary", source.get("content", "")[:200] + "..." if source.get("content") else ""),
+            source=source.get("source", "unknown"),
+            url=source.get("url", "#"),
+            author=source.get("author", "Unknown"),
+            date=source.get("timestamp", "Unknown"),
+            content_type=source.get("content_type", "document"),
+            tags=source.get("tags", []),
+            relevance_score=round((hit.get("_score") or 0) * 10),
+            highlights=hit.get("highlight", {}),
+            content=source.get("content", source.get("summary", "")),
+            passages=[passage["_source"]["text"] for passage in passage_hits if passage.get("_source", {}).get("text")],
+            abstract=source.get("abstract", ""),
+            key_facts=source.get("key_facts", [])
+        )
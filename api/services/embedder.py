@@ -0,0 +1,155 @@
+import abc
+import asyncio
+import hashlib
+import importlib
+import math
+import re
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from config import settings
+from services.cache import TTLCache
+import logging
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Bigrams add a little word-order signal to the hashed bag of words
+BIGRAM_WEIGHT = 0.5
+
+
+class Embedder(abc.ABC):
+    """
+    Turns query text into vectors for kNN search on the dense_vector field.
+    Queries must be embedded exactly like documents were at ingest, so this
+    follows the same contract as python/embedders.py and a custom
+    "module:ClassName" embedder works on both sides: the constructor takes the
+    dimensions plus the keyword options from embedder_options(), and embed()
+    is synchronous (QueryEmbedder runs it in a worker thread).
+    """
+
+    def __init__(self, dimensions: int, **options: Any):
+        self.dimensions = dimensions
+
+    @abc.abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Return one vector per text"""
+
+
+class HashingEmbedder(Embedder):
+    """Deterministic feature hashing; matches HashingEmbedder in python/embedders.py"""
+
+    def __init__(self, dimensions: int, seed: str = "0", **options: Any):
+        super().__init__(dimensions)
+        self.seed = seed
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [hashing_vector(text, self.dimensions, self.seed) for text in texts]
+
+
+class OpenAIEmbedder(Embedder):
+    """Embeddings from an OpenAI-compatible /v1/embeddings endpoint"""
+
+    def __init__(self, dimensions: int, model: str = "", endpoint: str = "", api_key: str = "", **options: Any):
+        super().__init__(dimensions)
+        self.model = model
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.client = httpx.Client(timeout=30)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        response = self.client.post(
+            self.endpoint,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            json={"model": self.model, "input": texts, "dimensions": self.dimensions}
+        )
+        response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return [item["embedding"] for item in data]
+
+
+EMBEDDERS = {
+    "hashing": HashingEmbedder,
+    "openai": OpenAIEmbedder
+}
+
+
+def hashing_vector(text: str, dimensions: int, seed: str = "0") -> List[float]:
+    """Signed feature hashing of unigrams and bigrams, L2-normalised; must match python/embedders.py"""
+    vector = [0.0] * dimensions
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    features = [(token, 1.0) for token in tokens]
+    features += [(f"{first} {second}", BIGRAM_WEIGHT) for first, second in zip(tokens, tokens[1:])]
+
+    for feature, weight in features:
+        digest = hashlib.blake2b(f"{seed}:{feature}".encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        vector[value % dimensions] += weight if (value >> 63) & 1 else -weight
+
+    norm = math.sqrt(sum(component * component for component in vector))
+    if norm == 0:
+        # cosine similarity rejects zero vectors; give empty texts a fixed unit vector
+        vector[0] = 1.0
+        return vector
+    return [component / norm for component in vector]
+
+
+class QueryEmbedder:
+    """Caches query vectors so repeated searches don't pay for embedding again"""
+
+    def __init__(self, embedder: Embedder, cache: TTLCache):
+        self.embedder = embedder
+        self.cache = cache
+
+    async def embed_query(self, query: str) -> List[float]:
+        vector = self.cache.get(query)
+        if vector is None:
+            vector = (await asyncio.to_thread(self.embedder.embed, [query]))[0]
+            self.cache.set(query, vector)
+        return vector
+
+    async def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed many queries, sending only the uncached ones in a single call"""
+        vectors: Dict[str, List[float]] = {}
+        missing = []
+        for query in dict.fromkeys(queries):
+            cached = self.cache.get(query)
+            if cached is None:
+                missing.append(query)
+            else:
+                vectors[query] = cached
+        if missing:
+            for query, vector in zip(missing, await asyncio.to_thread(self.embedder.embed, missing)):
+                self.cache.set(query, vector)
+                vectors[query] = vector
+        return [vectors[query] for query in queries]
+
+
+def embedder_options() -> Dict[str, Any]:
+    """Keyword options every embedder constructor receives after the dimensions (same names as ingest)"""
+    return {
+        "model": settings.EMBEDDER_MODEL,
+        "endpoint": settings.EMBEDDER_ENDPOINT,
+        "api_key": settings.EMBEDDER_API_KEY or settings.OPENAI_API_KEY,
+        "seed": settings.EMBEDDER_HASHING_SEED
+    }
+
+
+def create_embedder(name: str) -> Embedder:
+    """Build the embedder named by EMBEDDER (a built-in name or "module:ClassName")"""
+    if name in EMBEDDERS:
+        cls = EMBEDDERS[name]
+    else:
+        module_name, _, class_name = name.partition(":")
+        if not class_name:
+            raise ValueError(f"Unknown embedder '{name}'; use hashing, openai or module:ClassName")
+        cls = getattr(importlib.import_module(module_name), class_name)
+    return cls(settings.EMBEDDER_DIMS, **embedder_options())
+
+
+query_embedder: Optional[QueryEmbedder] = QueryEmbedder(
+    create_embedder(settings.EMBEDDER),
+    TTLCache(max_size=settings.EMBEDDER_CACHE_SIZE, ttl_seconds=settings.EMBEDDER_CACHE_TTL_SECONDS)
+) if settings.ELASTICSEARCH_VECTOR_ENABLED else None
@@ -0,0 +1,139 @@
+import re
+from typing import List, Optional
+
+import numpy as np
+
+from models.search import SearchResult
+
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'])")
+TOKEN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a about above after again all also an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from
+further had has have having he her here hers him his how i if in into is it its itself
+just me more most my no nor not now of off on once only or other our out over own same
+she should so some such than that the their them then there these they this those
+through to too under until up very was we were what when where which while who whom
+why will with would you your
+""".split())
+
+
+class ExtractiveSummarizer:
+    """
+    Query-biased TextRank over TF-IDF sentence vectors.
+    Used when the LLM misses its deadline or fails, so the summary panel
+    still shows the most central sentences from the retrieved content.
+    """
+
+    def __init__(
+        self,
+        max_sentences: int = 3,
+        max_chars_per_document: int = 2000,
+        damping: float = 0.85,
+        iterations: int = 50,
+        redundancy_threshold: float = 0.7,
+        query_bias: float = 0.5
+    ):
+        self.max_sentences = max_sentences
+        self.max_chars_per_document = max_chars_per_document
+        self.damping = damping
+        self.iterations = iterations
+        self.redundancy_threshold = redundancy_threshold
+        self.query_bias = query_bias
+
+    def summarize(self, query: str, results: List[SearchResult]) -> Optional[str]:
+        sentences = self._collect_sentences(results)
+        if not sentences:
+            return None
+
+        matrix, vocabulary = self._tfidf([self._tokenize(sentence) for sentence in sentences])
+        if matrix is None:
+            return " ".join(sentences[:self.max_sentences])
+
+        query_vector = np.zeros(len(vocabulary))
+        for token in self._tokenize(query):
+            index = vocabulary.get(token)
+            if index is not None:
+                query_vector[index] = 1.0
+
+        scores = self._textrank(matrix, matrix @ query_vector)
+        chosen = self._select(matrix, scores)
+        # Present in reading order rather than score order
+        return " ".join(sentences[index] for index in sorted(chosen))
+
+    def _collect_sentences(self, results: List[SearchResult]) -> List[str]:
+        sentences = []
+        seen = set()
+        for result in results:
+            # Query-matched passages are already the most relevant text
+            text = (" ".join(result.passages) or result.content or result.summary or "")[:self.max_chars_per_document]
+            for sentence in SENTENCE_SPLIT.split(text):
+                sentence = " ".join(sentence.split())
+                # Skip fragments and verbatim repeats across templated documents
+                if len(sentence) < 25 or sentence.lower() in seen:
+                    continue
+                seen.add(sentence.lower())
+                sentences.append(sentence)
+        return sentences
+
+    def _tokenize(self, text: str) -> List[str]:
+        return [token for token in TOKEN.findall(text.lower()) if token not in STOPWORDS and len(token) > 1]
+
+    def _tfidf(self, tokenized: List[List[str]]):
+        vocabulary = {}
+        for tokens in tokenized:
+            for token in tokens:
+                vocabulary.setdefault(token, len(vocabulary))
+        if not vocabulary:
+            return None, vocabulary
+
+        counts = np.zeros((len(tokenized), len(vocabulary)))
+        for row, tokens in enumerate(tokenized):
+            for token in tokens:
+                counts[row, vocabulary[token]] += 1
+
+        document_frequency = np.count_nonzero(counts, axis=0)
+        idf = np.log((1 + len(tokenized)) / (1 + document_frequency)) + 1
+        matrix = counts * idf
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms, vocabulary
+
+    def _textrank(self, matrix: np.ndarray, query_similarity: np.ndarray) -> np.ndarray:
+        count = matrix.shape[0]
+        similarity = matrix @ matrix.T
+        np.fill_diagonal(similarity, 0.0)
+
+        row_sums = similarity.sum(axis=1, keepdims=True)
+        transition = np.divide(similarity, row_sums, out=np.full_like(similarity, 1.0 / count), where=row_sums > 0)
+
+        # Teleport towards sentences that mention the query terms, strongly enough
+        # that a matching sentence outranks more central ones that don't match
+        if query_similarity.sum() > 0:
+            teleport = query_similarity / query_similarity.sum()
+            jump = max(self.query_bias, 1 - self.damping)
+        else:
+            teleport = np.full(count, 1.0 / count)
+            jump = 1 - self.damping
+
+        scores = np.full(count, 1.0 / count)
+        for _ in range(self.iterations):
+            updated = jump * teleport + (1 - jump) * (transition.T @ scores)
+            if np.abs(updated - scores).sum() < 1e-6:
+                scores = updated
+                break
+            scores = updated
+        return scores
+
+    def _select(self, matrix: np.ndarray, scores: np.ndarray) -> List[int]:
+        chosen: List[int] = []
+        for index in np.argsort(-scores):
+            if len(chosen) >= self.max_sentences:
+                break
+            if chosen and (matrix[chosen] @ matrix[index]).max() > self.redundancy_threshold:
+                continue
+            chosen.append(int(index))
+        return chosen
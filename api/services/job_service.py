@@ -0,0 +1,260 @@
+import asyncio
+import hashlib
+import json
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from models.jobs import JobStatus, JobResponse
+from models.llm import ComprehensiveSummaryRequest
+from models.user import User
+from services.llm_service import LLMService
+from services.sqlite_store import SQLiteStore
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+JOBS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    dedup_key TEXT NOT NULL,
+    user_json TEXT NOT NULL,
+    payload_json TEXT NOT NULL,
+    result_json TEXT,
+    error TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_dedup_key ON jobs (dedup_key, status);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+TERMINAL_STATUSES = {JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED}
+
+
+async def _run_comprehensive_summary(payload: Dict[str, Any], user: User) -> Dict[str, str]:
+    request = ComprehensiveSummaryRequest(**payload)
+    # A failed LLM call must fail the job, or dedup would hand the fallback text to identical jobs
+    summary = await LLMService().generate_comprehensive_summary(request, user, fallback=False)
+    return {"summary": summary}
+
+
+# Job kind -> coroutine producing the JSON-serialisable result
+JOB_HANDLERS: Dict[str, Callable[[Dict[str, Any], User], Awaitable[Any]]] = {
+    "comprehensive_summary": _run_comprehensive_summary
+}
+
+# Job kind -> request model the payload must match
+JOB_PAYLOAD_MODELS = {
+    "comprehensive_summary": ComprehensiveSummaryRequest
+}
+
+
+def _now() -> str:
+    return datetime.utcnow().isoformat()
+
+
+class JobService:
+    """
+    Persistent queue of long-running LLM jobs.
+    Jobs are stored in SQLite so queued and interrupted work resumes after a
+    restart, executed by a bounded pool of asyncio workers, and identical
+    submissions from the same user share a single job.
+    """
+
+    def __init__(self, db_path: str, concurrency: int, dedup_ttl_seconds: int):
+        self.store = SQLiteStore(db_path, JOBS_SCHEMA)
+        self.concurrency = concurrency
+        self.dedup_ttl_seconds = dedup_ttl_seconds
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._changes: Dict[str, asyncio.Event] = {}
+
+    async def start(self) -> None:
+        await self.store.initialize()
+
+        # Work interrupted by a shutdown is picked up again
+        await self.store.execute(
+            "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?",
+            (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+        )
+        for row in await self.store.fetchall(
+            "SELECT id FROM jobs WHERE status = ? ORDER BY created_at", (JobStatus.QUEUED.value,)
+        ):
+            self._queue.put_nowait(row["id"])
+
+        self._workers = [asyncio.create_task(self._worker(index)) for index in range(self.concurrency)]
+        logger.info(f"Job service started with {self.concurrency} workers, {self._queue.qsize()} queued jobs")
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, kind: str, payload: Dict[str, Any], user: User) -> JobResponse:
+        if kind not in JOB_HANDLERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        # Validate now so bad payloads fail the request rather than the job
+        payload = JOB_PAYLOAD_MODELS[kind](**payload).model_dump()
+        dedup_key = hashlib.sha256(
+            json.dumps([kind, user.id, payload], sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+        reuse_after = (datetime.utcnow() - timedelta(seconds=self.dedup_ttl_seconds)).isoformat()
+        existing = await self.store.fetchone(
+            """
+            SELECT * FROM jobs
+            WHERE dedup_key = ? AND (status IN (?, ?) OR (status = ? AND finished_at >= ?))
+            ORDER BY created_at DESC LIMIT 1
+            """,
+            (dedup_key, JobStatus.QUEUED.value, JobStatus.RUNNING.value, JobStatus.COMPLETED.value, reuse_after)
+        )
+        if existing is not None:
+            response = self._to_response(existing)
+            response.deduplicated = True
+            return response
+
+        job_id = str(uuid.uuid4())
+        await self.store.execute(
+            """
+            INSERT INTO jobs (id, kind, status, dedup_key, user_json, payload_json, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (job_id, kind, JobStatus.QUEUED.value, dedup_key, user.model_dump_json(), json.dumps(payload), _now())
+        )
+        self._queue.put_nowait(job_id)
+        return await self.get(job_id)
+
+    async def get(self, job_id: str, user: Optional[User] = None) -> Optional[JobResponse]:
+        row = await self._get_row(job_id, user)
+        return self._to_response(row) if row is not None else None
+
+    async def list_jobs(self, user: User, limit: int = 50) -> List[JobResponse]:
+        rows = await self.store.fetchall(
+            "SELECT * FROM jobs WHERE json_extract(user_json, '$.id') = ? ORDER BY created_at DESC LIMIT ?",
+            (user.id, limit)
+        )
+        return [self._to_response(row) for row in rows]
+
+    async def cancel(self, job_id: str, user: User) -> Optional[JobResponse]:
+        row = await self._get_row(job_id, user)
+        if row is None:
+            return None
+
+        if JobStatus(row["status"]) not in TERMINAL_STATUSES:
+            await self._set_status(job_id, JobStatus.CANCELLED, finished_at=_now())
+            task = self._running.get(job_id)
+            if task is not None:
+                task.cancel()
+        return await self.get(job_id)
+
+    async def wait_for_change(self, job_id: str, timeout: float) -> None:
+        """Block until the job's status changes or the timeout passes"""
+        event = self._changes.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "queued": self._queue.qsize(),
+            "running": len(self._running)
+        }
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._execute(job_id)
+            except Exception as e:
+                logger.error(f"Job worker {index} failed on job {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, job_id: str) -> None:
+        row = await self._get_row(job_id)
+        if row is None or JobStatus(row["status"]) != JobStatus.QUEUED:
+            # Cancelled (or already handled) while waiting in the queue
+            return
+
+        # Conditional update so a cancellation racing with pickup wins
+        claimed = await self.store.execute(
+            "UPDATE jobs SET status = ?, started_at = ? WHERE id = ? AND status = ?",
+            (JobStatus.RUNNING.value, _now(), job_id, JobStatus.QUEUED.value)
+        )
+        if not claimed:
+            return
+        self._notify(job_id)
+
+        handler = JOB_HANDLERS[row["kind"]]
+        user = User(**json.loads(row["user_json"]))
+        task = asyncio.create_task(handler(json.loads(row["payload_json"]), user))
+        self._running[job_id] = task
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if not task.cancelled():
+                # The worker itself is shutting down; leave the job to be resumed
+                task.cancel()
+                raise
+            logger.info(f"Job {job_id} cancelled while running")
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            await self._set_status(job_id, JobStatus.FAILED, error=str(e), finished_at=_now())
+        else:
+            await self.store.execute(
+                "UPDATE jobs SET status = ?, result_json = ?, finished_at = ? WHERE id = ? AND status = ?",
+                (JobStatus.COMPLETED.value, json.dumps(result, default=str), _now(), job_id, JobStatus.RUNNING.value)
+            )
+            self._notify(job_id)
+        finally:
+            self._running.pop(job_id, None)
+
+    async def _get_row(self, job_id: str, user: Optional[User] = None):
+        row = await self.store.fetchone("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        if row is None:
+            return None
+        if user is not None and json.loads(row["user_json"]).get("id") != user.id:
+            return None
+        return row
+
+    async def _set_status(self, job_id: str, status: JobStatus, error: Optional[str] = None, finished_at: Optional[str] = None) -> None:
+        await self.store.execute(
+            "UPDATE jobs SET status = ?, error = COALESCE(?, error), finished_at = COALESCE(?, finished_at) WHERE id = ?",
+            (status.value, error, finished_at, job_id)
+        )
+        self._notify(job_id)
+
+    def _notify(self, job_id: str) -> None:
+        event = self._changes.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    def _to_response(self, row) -> JobResponse:
+        return JobResponse(
+            id=row["id"],
+            kind=row["kind"],
+            status=JobStatus(row["status"]),
+            created_at=row["created_at"],
+            started_at=row["started_at"],
+            finished_at=row["finished_at"],
+            result=json.loads(row["result_json"]) if row["result_json"] else None,
+            error=row["error"]
+        )
+
+
+job_service = JobService(
+    db_path=settings.LLM_JOBS_DB_PATH,
+    concurrency=settings.LLM_JOBS_CONCURRENCY,
+    dedup_ttl_seconds=settings.LLM_JOBS_DEDUP_TTL_SECONDS
+)
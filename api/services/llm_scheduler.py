@@ -0,0 +1,395 @@
+import asyncio
+import itertools
+import random
+import re
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Lower value = served first
+LANE_PRIORITIES = {
+    "interactive": 0,  # chat
+    "standard": 1,     # search result summaries
+    "background": 2    # comprehensive summaries, prefetch and batch work
+}
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse OpenAI reset headers such as "1s", "6m0s" or "20ms" into seconds"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+
+    units = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(amount) * units[unit] for amount, unit in parts)
+
+
+def parse_retry_after(headers: httpx.Headers) -> Optional[float]:
+    """Read the server-requested retry delay in seconds, if any"""
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            # HTTP-date form is not used by OpenAI-compatible providers
+            return None
+    return None
+
+
+class TokenBucket:
+    """Continuously refilling budget, e.g. requests or tokens per minute"""
+
+    def __init__(self, capacity: float, period_seconds: float = 60.0):
+        self.capacity = float(capacity)
+        self.period_seconds = period_seconds
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.period_seconds
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until `amount` can be consumed (0 if available now)"""
+        amount = min(amount, self.capacity)
+        missing = amount - self.available()
+        if missing <= 0:
+            return 0.0
+        return missing / self.refill_rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def sync(self, limit: Optional[float], remaining: Optional[float]) -> None:
+        """Align the bucket with the provider's view from rate-limit headers"""
+        if limit:
+            self.capacity = float(limit)
+        if remaining is not None:
+            self._refill()
+            self.tokens = min(self.tokens, float(remaining))
+
+    def snapshot(self) -> Dict[str, float]:
+        return {"capacity": self.capacity, "available": round(self.available(), 1)}
+
+
+class UpstreamBudget:
+    """Rate-limit state for one OpenAI-compatible endpoint"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.paused_until = 0.0
+
+    def delay_for(self, tokens: int) -> float:
+        return max(
+            self.paused_until - time.monotonic(),
+            self.request_bucket.time_until(1),
+            self.token_bucket.time_until(tokens)
+        )
+
+    def consume(self, tokens: int) -> None:
+        self.request_bucket.consume(1)
+        self.token_bucket.consume(tokens)
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def is_paused(self) -> bool:
+        return time.monotonic() < self.paused_until
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "requests_per_minute": self.request_bucket.snapshot(),
+            "tokens_per_minute": self.token_bucket.snapshot(),
+            "paused_for_seconds": round(max(0.0, self.paused_until - time.monotonic()), 2)
+        }
+
+
+class LaneStats:
+    def __init__(self, window: int = 200):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.waits: Deque[float] = deque(maxlen=window)
+
+    def snapshot(self, queued: int) -> Dict[str, Any]:
+        waits = sorted(self.waits)
+        return {
+            "queued": queued,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_ms": round(1000 * sum(waits) / len(waits), 1) if waits else 0.0,
+            "p95_wait_ms": round(1000 * waits[int(0.95 * (len(waits) - 1))], 1) if waits else 0.0,
+            "max_wait_ms": round(1000 * waits[-1], 1) if waits else 0.0
+        }
+
+
+class LLMScheduler:
+    """
+    Admission control for calls to the OpenAI-compatible endpoint.
+    Requests wait in priority lanes until both the requests-per-minute and
+    tokens-per-minute budgets of their upstream allow them, and are retried
+    with backoff (honouring Retry-After) on rate limiting and transient errors.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int,
+        max_retries: int,
+        backoff_base: float,
+        backoff_max: float
+    ):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._budgets: Dict[str, UpstreamBudget] = {}
+        self._waiters: List[Tuple[int, int, int, str, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self._lane_stats = {lane: LaneStats() for lane in LANE_PRIORITIES}
+        self.retries = 0
+        self.rate_limited = 0
+
+    async def submit(
+        self,
+        send: Callable[[], Awaitable[httpx.Response]],
+        estimated_tokens: int,
+        lane: str = "standard",
+        upstream: str = "default",
+        max_retries: Optional[int] = None
+    ) -> httpx.Response:
+        """Run `send` once the upstream's budget allows, retrying transient failures"""
+        if lane not in LANE_PRIORITIES:
+            raise ValueError(f"Unknown scheduler lane: {lane}")
+
+        if max_retries is None:
+            max_retries = self.max_retries
+        budget = self._get_budget(upstream)
+        stats = self._lane_stats[lane]
+        stats.submitted += 1
+        attempt = 0
+
+        while True:
+            waited = await self._acquire(lane, estimated_tokens, upstream)
+            if attempt == 0:
+                stats.waits.append(waited)
+
+            response = None
+            try:
+                response = await send()
+            except httpx.TransportError:
+                if attempt >= max_retries:
+                    stats.failed += 1
+                    raise
+                delay = self._backoff(attempt)
+            finally:
+                self._release()
+
+            if response is not None:
+                self._sync_budget(budget, response.headers)
+
+                retryable = response.status_code in RETRYABLE_STATUS_CODES
+                if retryable:
+                    retry_after = parse_retry_after(response.headers)
+                    delay = retry_after if retry_after is not None else self._backoff(attempt)
+                    if response.status_code == 429:
+                        # Everyone waits, including a caller failing over to another model on this
+                        # upstream, otherwise queued requests keep hitting the limit
+                        self.rate_limited += 1
+                        budget.pause(delay)
+
+                if not retryable or attempt >= max_retries:
+                    if response.is_success:
+                        stats.completed += 1
+                    else:
+                        stats.failed += 1
+                    return response
+
+            attempt += 1
+            self.retries += 1
+            logger.warning(f"LLM request in lane '{lane}' to '{upstream}' retrying in {delay:.2f}s (attempt {attempt}/{max_retries})")
+            await asyncio.sleep(delay)
+
+    def is_saturated(self, max_queued: int = 0) -> bool:
+        """True when new background work would only add to the backlog"""
+        return (
+            len(self._waiters) > max_queued
+            or self._in_flight >= self.max_concurrency
+            or any(budget.is_paused() for budget in self._budgets.values())
+        )
+
+    def is_paused(self, upstream: str) -> bool:
+        """True while an upstream is waiting out a rate limit"""
+        budget = self._budgets.get(upstream)
+        return budget is not None and budget.is_paused()
+
+    def get_stats(self) -> Dict[str, Any]:
+        queued = {lane: 0 for lane in LANE_PRIORITIES}
+        priority_to_lane = {priority: lane for lane, priority in LANE_PRIORITIES.items()}
+        for priority, _, _, _, _ in self._waiters:
+            queued[priority_to_lane[priority]] += 1
+
+        return {
+            "queue_depth": len(self._waiters),
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "budgets": {upstream: budget.snapshot() for upstream, budget in self._budgets.items()},
+            "lanes": {lane: stats.snapshot(queued[lane]) for lane, stats in self._lane_stats.items()}
+        }
+
+    def _get_budget(self, upstream: str) -> UpstreamBudget:
+        budget = self._budgets.get(upstream)
+        if budget is None:
+            budget = UpstreamBudget(self.requests_per_minute, self.tokens_per_minute)
+            self._budgets[upstream] = budget
+        return budget
+
+    async def _acquire(self, lane: str, estimated_tokens: int, upstream: str) -> float:
+        loop = asyncio.get_running_loop()
+        started = time.monotonic()
+        future = loop.create_future()
+        entry = (LANE_PRIORITIES[lane], next(self._sequence), estimated_tokens, upstream, future)
+        self._waiters.append(entry)
+
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just before cancellation
+                self._release()
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                self._dispatch()
+            raise
+        return time.monotonic() - started
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant slots to waiters in priority order while their budgets allow"""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        blocked = set()
+        next_check = None
+        for entry in sorted(self._waiters):
+            if self._in_flight >= self.max_concurrency:
+                return
+
+            _, _, tokens, upstream, future = entry
+            if future.cancelled():
+                self._waiters.remove(entry)
+                continue
+            if upstream in blocked:
+                # Lower lanes never overtake a waiting request for the same upstream
+                continue
+
+            budget = self._get_budget(upstream)
+            delay = budget.delay_for(tokens)
+            if delay > 0:
+                blocked.add(upstream)
+                next_check = delay if next_check is None else min(next_check, delay)
+                continue
+
+            self._waiters.remove(entry)
+            budget.consume(tokens)
+            self._in_flight += 1
+            future.set_result(None)
+
+        if next_check is not None:
+            self._wakeup = asyncio.get_running_loop().call_later(next_check, self._dispatch)
+
+    def _backoff(self, attempt: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _sync_budget(self, budget: UpstreamBudget, headers: httpx.Headers) -> None:
+        def _number(name: str) -> Optional[float]:
+            value = headers.get(name)
+            try:
+                return float(value) if value is not None else None
+            except ValueError:
+                return None
+
+        remaining_requests = _number("x-ratelimit-remaining-requests")
+        remaining_tokens = _number("x-ratelimit-remaining-tokens")
+        budget.request_bucket.sync(_number("x-ratelimit-limit-requests"), remaining_requests)
+        budget.token_bucket.sync(_number("x-ratelimit-limit-tokens"), remaining_tokens)
+
+        # An exhausted window only reopens at the provider's reset time
+        if remaining_requests == 0:
+            reset = parse_reset_duration(headers.get("x-ratelimit-reset-requests"))
+            if reset:
+                budget.pause(reset)
+        if remaining_tokens == 0:
+            reset = parse_reset_duration(headers.get("x-ratelimit-reset-tokens"))
+            if reset:
+                budget.pause(reset)
+
+
+def estimate_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    """Rough prompt + completion size (~4 characters per token)"""
+    prompt_chars = sum(len(message.get("content", "")) for message in messages)
+    return prompt_chars // 4 + max_tokens
+
+
+# Shared across LLMService instances so limits apply process-wide
+llm_scheduler = LLMScheduler(
+    requests_per_minute=settings.OPENAI_REQUESTS_PER_MINUTE,
+    tokens_per_minute=settings.OPENAI_TOKENS_PER_MINUTE,
+    max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+    max_retries=settings.OPENAI_MAX_RETRIES,
+    backoff_base=settings.OPENAI_RETRY_BACKOFF_SECONDS,
+    backoff_max=settings.OPENAI_RETRY_BACKOFF_MAX_SECONDS
+)
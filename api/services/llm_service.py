@@ -1,6 +1,8 @@
+import asyncio
 import httpx
 import json
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Optional
 from models.llm import (
     SummaryRequest, ComprehensiveSummaryRequest, ChatRequest, 
     ChatResponse, SummaryResponse, ChatMessage
@@ -8,10 +10,19 @@ from models.llm import (
 from models.search import SearchResult
 from models.user import User
 from config import settings
+from services.llm_scheduler import llm_scheduler, estimate_tokens
+from services.model_routing import model_router, RouteTarget
+from services.summary_prefetch import summary_prefetcher, summary_cache_key
+from services.elasticsearch_service import ElasticsearchService
+from services.extractive_summarizer import ExtractiveSummarizer
+from services.analytics_service import analytics_service
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Errors specific to one endpoint/model that another target may not have
+FAILOVER_STATUS_CODES = {401, 403, 404, 429, 500, 502, 503, 504}
+
 
 class LLMService:
     def __init__(self):
@@ -19,81 +30,140 @@ class LLMService:
         self.endpoint = settings.OPENAI_ENDPOINT
         self.model = settings.OPENAI_MODEL
 
-    def _get_headers(self) -> Dict[str, str]:
+    def _get_headers(self, api_key: Optional[str] = None) -> Dict[str, str]:
         return {
             "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
+            "Authorization": f"Bearer {api_key or self.api_key}"
         }
 
     async def generate_summary(self, request: SummaryRequest, user: User) -> SummaryResponse:
         """Generate a summary of search results"""
+        document_ids = self._merge_document_ids(request.search_results, request.document_ids)
+        key = summary_cache_key(user.id, request.query, document_ids)
+        deadline = settings.LLM_SUMMARY_DEADLINE_SECONDS or None
         try:
-            context = [
-                {
-                    "title": result.title,
-                    "summary": result.summary,
-                    "source": result.source,
-                    "content": result.content[:500] if result.content else result.summary,
-                    "relevance_score": result.relevance_score
-                }
-                for result in request.search_results
-            ]
-
-            system_prompt = self._build_summary_system_prompt(user, len(context))
-            user_prompt = self._build_summary_user_prompt(request.query, context)
-
-            response = await self._call_openai([
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ], max_tokens=300)
-
-            # Calculate source distribution
-            source_distribution = {}
-            for result in request.search_results:
-                source = result.source
-                source_distribution[source] = source_distribution.get(source, 0) + 1
-
-            return SummaryResponse(
-                summary=response,
-                source_distribution=source_distribution,
-                confidence_score=0.8  # Could be calculated based on relevance scores
+            return await summary_prefetcher.run(
+                key,
+                lambda: self._summarize_with_llm(request, user, lane="standard"),
+                timeout=deadline
             )
 
+        except asyncio.TimeoutError:
+            # The LLM call keeps running and lands in the summary cache
+            logger.warning(f"Summary generation exceeded {deadline}s deadline, using extractive summary")
+            return await self._generate_fallback_summary(request)
+
         except Exception as e:
             logger.error(f"Summary generation failed: {e}")
-            # Fallback summary
-            sources = list(set(result.source for result in request.search_results))
-            fallback_summary = (
-                f"Found {len(request.search_results)} relevant documents across {', '.join(sources)}. "
-                f"The results include {', '.join(result.title for result in request.search_results[:3])}. "
-                "Unable to generate AI summary - please check OpenAI API configuration."
-            )
-            return SummaryResponse(
-                summary=fallback_summary,
-                source_distribution={source: sum(1 for r in request.search_results if r.source == source) for source in sources},
-                confidence_score=0.0
-            )
-
-    async def generate_comprehensive_summary(self, request: ComprehensiveSummaryRequest, user: User) -> str:
-        """Generate a comprehensive summary of selected documents"""
+            return await self._generate_fallback_summary(request)
+
+    def prefetch_summary(self, query: str, results: List[SearchResult], user: User) -> bool:
+        """Speculatively generate the summary a search is likely to be followed by"""
+        request = SummaryRequest(
+            query=query,
+            search_results=results[:settings.LLM_SUMMARY_PREFETCH_TOP_N]
+        )
+        if not request.search_results:
+            return False
+
+        key = summary_cache_key(user.id, request.query, [result.id for result in request.search_results])
+        return summary_prefetcher.prefetch(
+            key, lambda: self._summarize_with_llm(request, user, lane="background")
+        )
+
+    async def _summarize_with_llm(self, request: SummaryRequest, user: User, lane: str) -> SummaryResponse:
+        # Documents referenced by id are fetched while the prompt is assembled
+        documents_task = asyncio.create_task(
+            self._resolve_documents(request.search_results, request.document_ids)
+        )
+        document_count = len(self._merge_document_ids(request.search_results, request.document_ids))
+        system_prompt = self._build_summary_system_prompt(user, document_count)
+        search_results = await documents_task
+
+        context = [
+            {
+                "title": result.title,
+                "summary": result.summary,
+                "source": result.source,
+                "content": self._document_excerpt(result.model_dump(), 500),
+                "relevance_score": result.relevance_score
+            }
+            for result in search_results
+        ]
+
+        user_prompt = self._build_summary_user_prompt(request.query, context)
+
+        response = await self._call_openai([
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ], max_tokens=300, lane=lane, route="summary")
+
+        # Calculate source distribution
+        source_distribution = {}
+        for result in search_results:
+            source = result.source
+            source_distribution[source] = source_distribution.get(source, 0) + 1
+
+        return SummaryResponse(
+            summary=response,
+            source_distribution=source_distribution,
+            confidence_score=0.8  # Could be calculated based on relevance scores
+        )
+
+    async def generate_comprehensive_summary(self, request: ComprehensiveSummaryRequest, user: User, fallback: bool = True) -> str:
+        """Generate a comprehensive summary of selected documents; without fallback, LLM failures are raised"""
+        documents_task = asyncio.create_task(
+            self._resolve_documents(request.selected_documents, request.document_ids)
+        )
         try:
             system_prompt = self._build_comprehensive_system_prompt(user)
-            user_prompt = self._build_comprehensive_user_prompt(request.selected_documents, user)
+            documents = await documents_task
+            user_prompt = self._build_comprehensive_user_prompt(documents, user)
 
             response = await self._call_openai([
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt}
-            ], max_tokens=1500)
+            ], max_tokens=1500, lane="background", route="comprehensive")
 
             return response
 
         except Exception as e:
             logger.error(f"Comprehensive summary generation failed: {e}")
-            return self._generate_fallback_comprehensive_summary(request.selected_documents, user)
+            if not fallback:
+                raise
+            return self._generate_fallback_comprehensive_summary(await documents_task, user)
+
+    async def generate_digest(self, name: str, query: str, results: List[SearchResult], user: User) -> str:
+        """Summarise what is new for a saved search since its last run"""
+        try:
+            user_prompt = self._build_digest_user_prompt(name, query, results)
+            return await self._call_openai([
+                {"role": "system", "content": self._build_digest_system_prompt(user)},
+                {"role": "user", "content": user_prompt}
+            ], max_tokens=400, lane="background", route="digest")
+
+        except Exception as e:
+            logger.error(f"Digest generation failed for saved search '{name}': {e}")
+            extractive_summary = ExtractiveSummarizer(
+                max_sentences=settings.LLM_EXTRACTIVE_SUMMARY_SENTENCES
+            ).summarize(query, results)
+            return extractive_summary or (
+                f"{len(results)} new documents match '{name}', including "
+                f"{', '.join(result.title for result in results[:3])}."
+            )
 
     async def generate_chat_response(self, request: ChatRequest, user: User) -> ChatResponse:
         """Generate a chat response based on context and conversation history"""
         try:
+            if request.document_ids:
+                known_ids = {result.get('id') for result in request.search_context}
+                documents = await self._resolve_documents([], [
+                    document_id for document_id in request.document_ids if document_id not in known_ids
+                ])
+                request = request.model_copy(update={
+                    "search_context": request.search_context + [document.model_dump() for document in documents]
+                })
+
             has_context = len(request.search_context) > 0
             
             system_prompt = self._build_chat_system_prompt(user, has_context)
@@ -109,7 +179,7 @@ class LLMService:
             # Add current user message
             messages.append({"role": "user", "content": user_prompt})
 
-            response = await self._call_openai(messages, max_tokens=500)
+            response = await self._call_openai(messages, max_tokens=500, lane="interactive", route="chat")
             
             sources_referenced = []
             if has_context:
@@ -125,24 +195,103 @@ class LLMService:
             logger.error(f"Chat response generation failed: {e}")
             return self._generate_fallback_chat_response(request, e)
 
-    async def _call_openai(self, messages: List[Dict[str, str]], max_tokens: int = 500, temperature: float = 0.7) -> str:
-        """Make a call to OpenAI API"""
+    def _merge_document_ids(self, documents: List[SearchResult], document_ids: Optional[List[str]]) -> List[str]:
+        """Ids of posted documents followed by any additional referenced ids, in order"""
+        return list(dict.fromkeys([doc.id for doc in documents] + list(document_ids or [])))
+
+    async def _resolve_documents(self, documents: List[SearchResult], document_ids: Optional[List[str]]) -> List[SearchResult]:
+        """Combine posted documents with those referenced by id (fetched via _mget)"""
+        posted_ids = {doc.id for doc in documents}
+        missing_ids = [doc_id for doc_id in dict.fromkeys(document_ids or []) if doc_id not in posted_ids]
+        if not missing_ids:
+            return list(documents)
+
+        try:
+            fetched = await ElasticsearchService().get_documents(missing_ids)
+        except Exception as e:
+            logger.error(f"Failed to resolve referenced documents: {e}")
+            fetched = []
+        return list(documents) + fetched
+
+    async def _call_openai(
+        self,
+        messages: List[Dict[str, str]],
+        max_tokens: int = 500,
+        temperature: float = 0.7,
+        lane: str = "standard",
+        route: str = "summary"
+    ) -> str:
+        """Make a call to OpenAI API, routed by model tier and endpoint health"""
+        estimated_tokens = estimate_tokens(messages, max_tokens)
+        targets = model_router.plan(route, estimated_tokens)
+        last_error: Optional[Exception] = None
+        last_response: Optional[httpx.Response] = None
+
         async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.endpoint,
-                headers=self._get_headers(),
-                json={
-                    "model": self.model,
-                    "messages": messages,
-                    "max_tokens": max_tokens,
-                    "temperature": temperature,
-                    "presence_penalty": 0.1,
-                    "frequency_penalty": 0.1
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
-            return data["choices"][0]["message"]["content"]
+            remaining = list(targets)
+            while remaining:
+                target = remaining.pop(0)
+                has_fallback = bool(remaining)
+
+                async def send(target: RouteTarget = target) -> httpx.Response:
+                    started = time.monotonic()
+                    try:
+                        response = await client.post(
+                            target.upstream.endpoint,
+                            headers=self._get_headers(target.upstream.api_key),
+                            json={
+                                "model": target.model,
+                                "messages": messages,
+                                "max_tokens": max_tokens,
+                                "temperature": temperature,
+                                "presence_penalty": 0.1,
+                                "frequency_penalty": 0.1
+                            }
+                        )
+                    except httpx.TransportError:
+                        model_router.record(route, target, time.monotonic() - started, success=False)
+                        analytics_service.record_llm_call(
+                            route, lane, target, time.monotonic() - started, estimated_tokens, success=False
+                        )
+                        raise
+                    elapsed = time.monotonic() - started
+                    success = response.status_code not in FAILOVER_STATUS_CODES
+                    model_router.record(route, target, elapsed, success=success)
+                    analytics_service.record_llm_call(
+                        route, lane, target, elapsed, estimated_tokens, success=response.is_success
+                    )
+                    return response
+
+                try:
+                    # Fail over straight away rather than retrying when another target exists
+                    response = await llm_scheduler.submit(
+                        send,
+                        estimated_tokens=estimated_tokens,
+                        lane=lane,
+                        upstream=target.upstream.name,
+                        max_retries=0 if has_fallback else None
+                    )
+                except httpx.TransportError as e:
+                    last_error = e
+                    logger.warning(f"LLM target {target.upstream.name}/{target.model} unreachable: {e}")
+                    continue
+
+                if response.status_code in FAILOVER_STATUS_CODES and has_fallback:
+                    last_response = response
+                    logger.warning(f"LLM target {target.upstream.name}/{target.model} returned {response.status_code}, failing over")
+                    if response.status_code == 429:
+                        # Try upstreams that aren't rate limited first; the scheduler holds the
+                        # rest until their Retry-After has passed
+                        remaining.sort(key=lambda candidate: llm_scheduler.is_paused(candidate.upstream.name))
+                    continue
+
+                response.raise_for_status()
+                data = response.json()
+                return data["choices"][0]["message"]["content"]
+
+        if last_response is not None:
+            last_response.raise_for_status()
+        raise last_error
 
     def _build_summary_system_prompt(self, user: User, context_count: int) -> str:
         return f"""You are an AI assistant for a Bank's enterprise search system. Your role is to analyze search results and provide concise, professional summaries for {user.name}, a {user.position} in {user.department}.
@@ -161,6 +310,7 @@ Guidelines:
             f"{i+1}. Title: {item['title']}\n"
             f"   Source: {item['source']}\n"
             f"   Summary: {item['summary']}\n"
+            f"   Key Content: {item['content']}\n"
             f"   Relevance: {item['relevance_score']}%"
             for i, item in enumerate(context)
         ])
@@ -172,6 +322,16 @@ Search Results Context:
 
 Please provide a professional summary of these search results in response to the user's query."""
 
+    def _document_excerpt(self, document: Dict[str, Any], limit: int) -> str:
+        """Prefer the ingest-time abstract, then query-matched passages, over a prefix of the content"""
+        if document.get('abstract'):
+            key_facts = document.get('key_facts') or []
+            return document['abstract'] + (f" Key facts: {'; '.join(key_facts)}" if key_facts else "")
+        if document.get('passages'):
+            return " ... ".join(document['passages'])
+        content = document.get('content') or ''
+        return content[:limit] if content else document.get('summary', '')
+
     def _build_comprehensive_system_prompt(self, user: User) -> str:
         return f"""You are an AI assistant for a Bank's enterprise search system. Your role is to create comprehensive summaries for {user.name}, a {user.position} in {user.department}.
 
@@ -192,7 +352,7 @@ Focus on insights that would be valuable for strategic decision-making and opera
             f"Author: {doc.author}\n"
             f"Date: {doc.date}\n"
             f"Summary: {doc.summary}\n"
-            f"Content Preview: {doc.content[:800] if doc.content else doc.summary}\n"
+            f"Content Preview: {self._document_excerpt(doc.model_dump(), 800)}\n"
             f"Tags: {', '.join(doc.tags)}\n"
             f"Relevance Score: {doc.relevance_score}%\n\n---\n"
             for i, doc in enumerate(documents)
@@ -211,6 +371,29 @@ Please provide:
 
 Tailor your analysis to be most relevant for a {user.position} in {user.department}."""
 
+    def _build_digest_system_prompt(self, user: User) -> str:
+        return f"""You are an AI assistant for a Bank's enterprise search system. You write recurring digests of new documents for {user.name}, a {user.position} in {user.department}.
+
+Guidelines:
+- Lead with the most important change or decision
+- Group related documents and call out risks, blockers or deadlines
+- Reference documents by title
+- Keep the digest to a short paragraph or up to 5 bullet points"""
+
+    def _build_digest_user_prompt(self, name: str, query: str, results: List[SearchResult]) -> str:
+        documents_text = "\n".join([
+            f"{i+1}. {result.title} ({result.source}, {result.date})\n"
+            f"   {self._document_excerpt(result.model_dump(), 300)}"
+            for i, result in enumerate(results)
+        ])
+
+        return f"""Saved search: "{name}" (query: "{query}")
+
+New documents since the last digest:
+{documents_text}
+
+Please write a digest of what changed."""
+
     def _build_chat_system_prompt(self, user: User, has_context: bool) -> str:
         context_source = "retrieved documents" if has_context else "general knowledge"
         
@@ -233,7 +416,7 @@ Current context: {"Documents found and analyzed" if has_context else "No specifi
                 f"   Summary: {result.get('summary', '')}\n"
                 f"   Relevance: {result.get('relevance_score', result.get('relevanceScore', 0))}%\n"
                 f"   URL: {result.get('url', '#')}\n"
-                f"   Content Preview: {result.get('content', result.get('summary', ''))[:300]}"
+                f"   Content Preview: {self._document_excerpt(result, 300)}"
                 for i, result in enumerate(search_context)
             ])
 
@@ -248,6 +431,32 @@ Please respond helpfully based on the search results and conversation context.""
 
 Note: No specific search context is available. Please provide a helpful general response while noting that access to specific company documents would improve the answer."""
 
+    async def _generate_fallback_summary(self, request: SummaryRequest) -> SummaryResponse:
+        results = await self._resolve_documents(request.search_results, request.document_ids)
+        sources = list(set(result.source for result in results))
+        source_distribution = {source: sum(1 for r in results if r.source == source) for source in sources}
+
+        extractive_summary = ExtractiveSummarizer(
+            max_sentences=settings.LLM_EXTRACTIVE_SUMMARY_SENTENCES
+        ).summarize(request.query, results)
+        if extractive_summary:
+            return SummaryResponse(
+                summary=extractive_summary,
+                source_distribution=source_distribution,
+                confidence_score=settings.LLM_EXTRACTIVE_CONFIDENCE
+            )
+
+        fallback_summary = (
+            f"Found {len(results)} relevant documents across {', '.join(sources)}. "
+            f"The results include {', '.join(result.title for result in results[:3])}. "
+            "Unable to generate AI summary - please check OpenAI API configuration."
+        )
+        return SummaryResponse(
+            summary=fallback_summary,
+            source_distribution=source_distribution,
+            confidence_score=0.0
+        )
+
     def _generate_fallback_comprehensive_summary(self, documents: List[SearchResult], user: User) -> str:
         sources = list(set(doc.source for doc in documents))
         authors = list(set(doc.author for doc in documents))
@@ -272,7 +481,7 @@ Note: No specific search context is available. Please provide a helpful general
 
     def _generate_fallback_chat_response(self, request: ChatRequest, error: Exception) -> ChatResponse:
         context_count = len(request.search_context)
-        sources = list(set(result.source for result in request.search_context)) if request.search_context else []
+        sources = list(set(result.get('source', 'unknown') for result in request.search_context)) if request.search_context else []
         
         if "401" in str(error):
             response = f"I'm having trouble accessing the AI system - please check the OpenAI API key configuration. Based on the {context_count} search results currently displayed, I can see content from {', '.join(sources)}."
@@ -0,0 +1,176 @@
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Which model tier each LLM call site prefers
+ROUTE_TIERS = {
+    "summary": "fast",
+    "chat": "fast",
+    "digest": "fast",
+    "comprehensive": "strong"
+}
+
+
+class Upstream:
+    """An OpenAI-compatible chat completions endpoint"""
+
+    def __init__(self, name: str, endpoint: str, api_key: str):
+        self.name = name
+        self.endpoint = endpoint
+        self.api_key = api_key
+
+
+class RouteTarget:
+    def __init__(self, upstream: Upstream, model: str, tier: str):
+        self.upstream = upstream
+        self.model = model
+        self.tier = tier
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.upstream.name, self.model)
+
+
+class RouteStats:
+    """Rolling latency and error statistics for one upstream/model pair"""
+
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.last_error_at = 0.0
+
+    def record(self, latency: float, success: bool) -> None:
+        self.outcomes.append(success)
+        if success:
+            self.latencies.append(latency)
+        else:
+            self.last_error_at = time.monotonic()
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[int(fraction * (len(ordered) - 1))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50 = self.percentile(0.5)
+        p95 = self.percentile(0.95)
+        return {
+            "calls": len(self.outcomes),
+            "error_rate": round(self.error_rate, 3),
+            "p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 1) if p95 is not None else None
+        }
+
+
+class ModelRouter:
+    """
+    Chooses an ordered list of (endpoint, model) targets for each LLM call.
+    The call site and prompt size pick the preferred model tier; observed
+    latency and error rates order the candidates so that slow or failing
+    endpoints are tried last and calls fail over to the next target.
+    """
+
+    def __init__(
+        self,
+        upstreams: List[Upstream],
+        tier_models: Dict[str, str],
+        large_prompt_tokens: int,
+        window: int,
+        max_error_rate: float,
+        cooldown_seconds: float
+    ):
+        self.upstreams = upstreams
+        self.tier_models = tier_models
+        self.large_prompt_tokens = large_prompt_tokens
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.cooldown_seconds = cooldown_seconds
+        self._stats: Dict[Tuple[str, str], RouteStats] = {}
+        self._route_stats: Dict[str, RouteStats] = {}
+
+    def plan(self, route: str, prompt_tokens: int) -> List[RouteTarget]:
+        """Return targets in the order they should be tried"""
+        tier = ROUTE_TIERS.get(route, "fast")
+        if tier == "fast" and prompt_tokens > self.large_prompt_tokens:
+            tier = "strong"
+        alternate_tier = "strong" if tier == "fast" else "fast"
+
+        candidates = []
+        for upstream in self.upstreams:
+            candidates.append(RouteTarget(upstream, self.tier_models[tier], tier))
+            if self.tier_models[alternate_tier] != self.tier_models[tier]:
+                candidates.append(RouteTarget(upstream, self.tier_models[alternate_tier], alternate_tier))
+
+        # Stable sort keeps configuration order among equally healthy targets
+        return sorted(candidates, key=lambda target: self._score(target, preferred=target.tier == tier))
+
+    def record(self, route: str, target: RouteTarget, latency: float, success: bool) -> None:
+        self._get_stats(self._stats, target.key).record(latency, success)
+        self._get_stats(self._route_stats, route).record(latency, success)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "routes": {route: stats.snapshot() for route, stats in self._route_stats.items()},
+            "targets": {
+                f"{upstream}/{model}": stats.snapshot()
+                for (upstream, model), stats in self._stats.items()
+            },
+            "tiers": self.tier_models,
+            "upstreams": [upstream.name for upstream in self.upstreams]
+        }
+
+    def _get_stats(self, table: Dict[Any, RouteStats], key: Any) -> RouteStats:
+        stats = table.get(key)
+        if stats is None:
+            stats = RouteStats(self.window)
+            table[key] = stats
+        return stats
+
+    def _score(self, target: RouteTarget, preferred: bool) -> Tuple[int, int, float]:
+        stats = self._stats.get(target.key)
+        unhealthy = 0
+        latency = 0.0
+        if stats is not None:
+            recently_failed = time.monotonic() - stats.last_error_at < self.cooldown_seconds
+            if stats.error_rate > self.max_error_rate and recently_failed:
+                unhealthy = 1
+            latency = (stats.percentile(0.5) or 0.0) * (1 + stats.error_rate)
+
+        # Healthy beats unhealthy, then the preferred tier, then lower latency
+        return (unhealthy, 0 if preferred else 1, latency)
+
+
+def _configured_upstreams() -> List[Upstream]:
+    upstreams = [Upstream("primary", settings.OPENAI_ENDPOINT, settings.OPENAI_API_KEY)]
+    for index, entry in enumerate(settings.OPENAI_FALLBACK_ENDPOINTS.split(",")):
+        if not entry.strip():
+            continue
+        endpoint, _, api_key = entry.strip().partition("|")
+        upstreams.append(Upstream(f"fallback-{index + 1}", endpoint, api_key or settings.OPENAI_API_KEY))
+    return upstreams
+
+
+model_router = ModelRouter(
+    upstreams=_configured_upstreams(),
+    tier_models={
+        "fast": settings.OPENAI_FAST_MODEL or settings.OPENAI_MODEL,
+        "strong": settings.OPENAI_STRONG_MODEL or settings.OPENAI_MODEL
+    },
+    large_prompt_tokens=settings.OPENAI_LARGE_PROMPT_TOKENS,
+    window=settings.OPENAI_ROUTE_STATS_WINDOW,
+    max_error_rate=settings.OPENAI_ROUTE_MAX_ERROR_RATE,
+    cooldown_seconds=settings.OPENAI_ROUTE_COOLDOWN_SECONDS
+)
@@ -0,0 +1,214 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.analytics import RatingAggregate, RatingAnalytics
+from services.elasticsearch_service import ElasticsearchService
+from services.ratings_service import ratings_service, summarize_ratings
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+DIMENSIONS = ("document", "source", "query", "day")
+
+# Events applied per source lookup
+APPLY_BATCH_SIZE = 1000
+
+
+def _normalize_query(query: Optional[str]) -> Optional[str]:
+    return " ".join(query.lower().split()) if query else None
+
+
+class RatingAnalyticsService:
+    """
+    Rating analytics served from in-memory rollups instead of re-aggregating
+    documents per dashboard load. Each refresh reads only the rating events
+    ingested since the previous watermark and applies them as deltas: a user's
+    newer vote on a document replaces their older one in every rollup it counted
+    towards. Legacy nested user_ratings are loaded once at startup.
+    """
+
+    def __init__(self, enabled: bool, events_index: str, refresh_interval: float, settle_seconds: float):
+        self.enabled = enabled
+        self.events_index = events_index
+        self.refresh_interval = refresh_interval
+        self.settle_seconds = settle_seconds
+        # (document id, user id) -> (rating, timestamp, normalized query)
+        self._votes: Dict[Tuple[str, str], Tuple[int, str, Optional[str]]] = {}
+        self._sources: Dict[str, str] = {}
+        # dimension -> key -> [positive, negative]
+        self._tables: Dict[str, Dict[str, List[int]]] = {dimension: {} for dimension in DIMENSIONS}
+        self._bootstrapped = False
+        self._watermark: Optional[str] = None
+        self._refreshed_at: Optional[str] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if not self.enabled:
+            return
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def refresh(self) -> int:
+        """Apply events ingested since the watermark; returns the number applied"""
+        async with self._lock:
+            # Events still being indexed near "now" are left for the next refresh
+            upper = (datetime.utcnow() - timedelta(seconds=self.settle_seconds)).isoformat()
+            service = ElasticsearchService()
+            if not self._bootstrapped:
+                await self._bootstrap(service)
+                self._bootstrapped = True
+
+            window = {"range": {"ingested_at": {"lte": upper}}}
+            if self._watermark is not None:
+                window["range"]["ingested_at"]["gt"] = self._watermark
+            else:
+                # Events written before ingested_at was recorded are read once
+                window = {"bool": {"should": [window, {"bool": {"must_not": {"exists": {"field": "ingested_at"}}}}]}}
+            body = {
+                "query": {"bool": {"filter": [window]}},
+                "_source": ["document_id", "user_id", "rating", "query", "timestamp"]
+            }
+
+            applied = 0
+            batch = []
+            async for hit in service.scan(self.events_index, body):
+                event = hit["_source"]
+                batch.append((event["document_id"], event["user_id"], event["rating"], event["timestamp"], event.get("query")))
+                if len(batch) >= APPLY_BATCH_SIZE:
+                    applied += await self._apply(service, batch)
+                    batch = []
+            applied += await self._apply(service, batch)
+
+            # Re-applying a window after a failure is harmless, so only advance on success
+            self._watermark = upper
+            self._refreshed_at = datetime.utcnow().isoformat()
+            return applied
+
+    def get_analytics(self, dimension: str, limit: int = 50, order_by: str = "total") -> RatingAnalytics:
+        table = self._tables[dimension]
+        rows = [self._aggregate(key, counts) for key, counts in table.items()]
+        if order_by == "score":
+            rows.sort(key=lambda row: (row.score, row.total_ratings), reverse=True)
+        elif dimension == "day":
+            rows.sort(key=lambda row: row.key, reverse=True)
+        else:
+            rows.sort(key=lambda row: row.total_ratings, reverse=True)
+
+        # Every counted vote belongs to exactly one day
+        positive = sum(counts[0] for counts in self._tables["day"].values())
+        negative = sum(counts[1] for counts in self._tables["day"].values())
+        return RatingAnalytics(
+            dimension=dimension,
+            rows=rows[:limit],
+            totals=self._aggregate("all", [positive, negative]),
+            watermark=self._watermark,
+            refreshed_at=self._refreshed_at
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "votes": len(self._votes),
+            "rows": {dimension: len(table) for dimension, table in self._tables.items()},
+            "watermark": self._watermark,
+            "refreshed_at": self._refreshed_at
+        }
+
+    async def _bootstrap(self, service: ElasticsearchService) -> None:
+        """Load votes stored as nested user_ratings on documents"""
+        body = {
+            "query": {
+                "nested": {
+                    "path": "user_ratings",
+                    "query": {"exists": {"field": "user_ratings.user_id"}},
+                    "ignore_unmapped": True
+                }
+            },
+            "_source": ["source", "user_ratings"]
+        }
+        loaded = 0
+        async for hit in service.scan(service.index, body):
+            source = hit["_source"]
+            self._sources[hit["_id"]] = source.get("source") or "unknown"
+            for vote in source.get("user_ratings", []):
+                self._record(hit["_id"], vote["user_id"], vote["rating"], vote["timestamp"], vote.get("query"))
+                loaded += 1
+        logger.info(f"Rating analytics loaded {loaded} legacy document ratings")
+
+    async def _apply(self, service: ElasticsearchService, events: List[Tuple]) -> int:
+        unknown = list(dict.fromkeys(event[0] for event in events if event[0] not in self._sources))
+        if unknown:
+            documents = await service.get_documents(unknown)
+            for document in documents:
+                self._sources[document.id] = document.source or "unknown"
+            for document_id in unknown:
+                self._sources.setdefault(document_id, "unknown")
+
+        for event in events:
+            self._record(*event)
+        return len(events)
+
+    def _record(self, document_id: str, user_id: str, rating: int, timestamp: str, query: Optional[str]) -> None:
+        key = (document_id, user_id)
+        previous = self._votes.get(key)
+        if previous is not None:
+            if previous[1] > timestamp:
+                return
+            self._count(document_id, previous, -1)
+        vote = (rating, timestamp, _normalize_query(query))
+        self._votes[key] = vote
+        self._count(document_id, vote, 1)
+
+    def _count(self, document_id: str, vote: Tuple[int, str, Optional[str]], delta: int) -> None:
+        rating, timestamp, query = vote
+        if rating == 0:
+            return
+        column = 0 if rating > 0 else 1
+        keys = {
+            "document": document_id,
+            "source": self._sources.get(document_id, "unknown"),
+            "query": query,
+            "day": timestamp[:10]
+        }
+        for dimension, key in keys.items():
+            if key is None:
+                continue
+            counts = self._tables[dimension].setdefault(key, [0, 0])
+            counts[column] += delta
+            if counts == [0, 0]:
+                del self._tables[dimension][key]
+
+    def _aggregate(self, key: str, counts: List[int]) -> RatingAggregate:
+        summary = summarize_ratings(counts[0], counts[1])
+        return RatingAggregate(
+            key=key,
+            positive_count=summary["positive_count"],
+            negative_count=summary["negative_count"],
+            total_ratings=summary["total_ratings"],
+            score=summary["score"]
+        )
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                applied = await self.refresh()
+                if applied:
+                    logger.info(f"Rating analytics applied {applied} new rating events")
+            except Exception as e:
+                logger.error(f"Rating analytics refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+
+rating_analytics_service = RatingAnalyticsService(
+    enabled=settings.RATING_ANALYTICS_ENABLED,
+    events_index=ratings_service.events_index,
+    refresh_interval=settings.RATING_ANALYTICS_REFRESH_SECONDS,
+    settle_seconds=settings.RATING_ANALYTICS_SETTLE_SECONDS
+)
@@ -0,0 +1,217 @@
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set
+
+from models.ratings import RatingRequest, RatingResponse, DocumentRatings
+from models.user import User
+from services.bulk_buffer import BulkBuffer
+from services.elasticsearch_service import ElasticsearchService
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Documents aggregated per rollup query
+ROLLUP_CHUNK_SIZE = 500
+
+
+def summarize_ratings(positive: int, negative: int, last_updated: Optional[str] = None) -> Dict[str, Any]:
+    """The ratings.* summary stored on documents (same formula the UI used to compute)"""
+    total = positive + negative
+    score = (positive - negative) / total if total else 0.0
+    return {
+        "positive_count": positive,
+        "negative_count": negative,
+        "total_ratings": total,
+        "score": score,
+        # rank_feature values must be positive; 1.0 is neutral
+        "rank": round(max(1.0 + score, 0.01), 3),
+        "last_updated": last_updated or datetime.utcnow().isoformat()
+    }
+
+
+class RatingsService:
+    """
+    Document ratings recorded as events instead of per-click document updates.
+    Each rating is appended to a separate events index through a write-behind
+    buffer flushed with _bulk. A periodic rollup recomputes the ratings.*
+    summary of only the documents rated since the last pass, so the main index
+    sees at most one small update per document per interval.
+    """
+
+    def __init__(self, events_index: str, flush_size: int, flush_interval: float, max_pending: int, rollup_interval: float):
+        self.events_index = events_index
+        self.rollup_interval = rollup_interval
+        self.buffer = BulkBuffer(
+            "ratings",
+            self._write_events,
+            max_batch=flush_size,
+            flush_interval=flush_interval,
+            max_pending=max_pending
+        )
+        self._dirty: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"rollups": 0, "documents_rolled_up": 0, "failed_rollups": 0}
+
+    async def start(self) -> None:
+        self.buffer.start()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.buffer.stop()
+        await self.rollup()
+
+    def submit(self, request: RatingRequest, user: User) -> RatingResponse:
+        event = {
+            "event_id": str(uuid.uuid4()),
+            "document_id": request.document_id,
+            "user_id": user.id,
+            "user_department": user.department,
+            "rating": request.rating,
+            "query": request.query,
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        self.buffer.add(event)
+        self._dirty.add(request.document_id)
+        return RatingResponse(
+            event_id=event["event_id"],
+            document_id=event["document_id"],
+            rating=event["rating"],
+            timestamp=event["timestamp"]
+        )
+
+    async def get_document_ratings(self, document_id: str, user: User) -> DocumentRatings:
+        votes = (await self._latest_votes([document_id])).get(document_id, {})
+
+        # Read-your-writes for events still waiting in the buffer
+        for event in self.buffer.pending_items():
+            if event["document_id"] == document_id:
+                votes[event["user_id"]] = event["rating"]
+
+        positive = sum(1 for rating in votes.values() if rating > 0)
+        negative = sum(1 for rating in votes.values() if rating < 0)
+        summary = summarize_ratings(positive, negative)
+        return DocumentRatings(
+            document_id=document_id,
+            positive_count=summary["positive_count"],
+            negative_count=summary["negative_count"],
+            total_ratings=summary["total_ratings"],
+            score=summary["score"],
+            user_rating=votes.get(user.id)
+        )
+
+    async def rollup(self) -> int:
+        """Write ratings.* for every document rated since the last rollup"""
+        dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return 0
+
+        service = ElasticsearchService()
+        try:
+            await self.buffer.flush()
+            # Events that could not be written yet are rolled up next time
+            for event in self.buffer.pending_items():
+                self._dirty.add(event["document_id"])
+            await service.refresh(self.events_index)
+
+            document_ids = sorted(dirty)
+            now = datetime.utcnow().isoformat()
+            operations = []
+            for start in range(0, len(document_ids), ROLLUP_CHUNK_SIZE):
+                chunk = document_ids[start:start + ROLLUP_CHUNK_SIZE]
+                votes = await self._latest_votes(chunk)
+                for document_id in chunk:
+                    ratings = votes.get(document_id, {}).values()
+                    summary = summarize_ratings(
+                        sum(1 for rating in ratings if rating > 0),
+                        sum(1 for rating in ratings if rating < 0),
+                        now
+                    )
+                    operations.append({"update": {"_index": service.index, "_id": document_id}})
+                    operations.append({"doc": {"ratings": summary}})
+
+            data = await service.bulk(operations, raise_on_error=False)
+        except Exception as e:
+            self._dirty |= dirty
+            self._stats["failed_rollups"] += 1
+            logger.error(f"Ratings rollup of {len(dirty)} documents failed: {e}")
+            return 0
+
+        failed = [item["update"] for item in data.get("items", []) if item["update"].get("error")]
+        for item in failed:
+            # Ratings for deleted documents are dropped; anything else is retried
+            if item.get("status") != 404:
+                self._dirty.add(item["_id"])
+        if failed:
+            logger.warning(f"Ratings rollup could not update {len(failed)} documents")
+
+        self._stats["rollups"] += 1
+        self._stats["documents_rolled_up"] += len(dirty) - len(failed)
+        return len(dirty) - len(failed)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self._stats, "dirty_documents": len(self._dirty), "buffer": self.buffer.get_stats()}
+
+    async def _write_events(self, events: List[Dict[str, Any]]) -> None:
+        # Analytics refreshes read events by the time they were written, not rated
+        ingested_at = datetime.utcnow().isoformat()
+        operations = []
+        for event in events:
+            # Explicit ids keep retried batches idempotent
+            operations.append({"index": {"_index": self.events_index, "_id": event["event_id"]}})
+            operations.append({**event, "ingested_at": ingested_at})
+        await ElasticsearchService().bulk(operations)
+
+    async def _latest_votes(self, document_ids: List[str]) -> Dict[str, Dict[str, int]]:
+        """document id -> user id -> that user's most recent rating"""
+        body = {
+            "size": 0,
+            "query": {"terms": {"document_id": document_ids}},
+            "aggs": {
+                "documents": {
+                    "terms": {"field": "document_id", "size": len(document_ids)},
+                    "aggs": {
+                        "users": {
+                            "terms": {"field": "user_id", "size": 10000},
+                            "aggs": {
+                                "latest": {
+                                    "top_hits": {
+                                        "size": 1,
+                                        "sort": [{"timestamp": {"order": "desc"}}],
+                                        "_source": ["rating"]
+                                    }
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+        data = await ElasticsearchService().search_raw(self.events_index, body)
+
+        votes: Dict[str, Dict[str, int]] = {}
+        for document_bucket in data.get("aggregations", {}).get("documents", {}).get("buckets", []):
+            votes[document_bucket["key"]] = {
+                user_bucket["key"]: user_bucket["latest"]["hits"]["hits"][0]["_source"]["rating"]
+                for user_bucket in document_bucket["users"]["buckets"]
+            }
+        return votes
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.rollup_interval)
+            await self.rollup()
+
+
+ratings_service = RatingsService(
+    events_index=settings.RATINGS_EVENTS_INDEX or f"{settings.ELASTICSEARCH_INDEX}_rating_events",
+    flush_size=settings.RATINGS_FLUSH_SIZE,
+    flush_interval=settings.RATINGS_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.RATINGS_MAX_PENDING,
+    rollup_interval=settings.RATINGS_ROLLUP_INTERVAL_SECONDS
+)
@@ -0,0 +1,60 @@
+import asyncio
+import sqlite3
+from typing import Any, Iterable, List, Optional
+
+
+class SQLiteStore:
+    """
+    Minimal async wrapper around a SQLite database file.
+    Each call opens its own connection in a worker thread so the event loop
+    never blocks on disk I/O.
+    """
+
+    def __init__(self, path: str, schema: str):
+        self.path = path
+        self.schema = schema
+
+    async def initialize(self) -> None:
+        await asyncio.to_thread(self._initialize)
+
+    async def execute(self, sql: str, params: Iterable[Any] = ()) -> int:
+        """Run a write statement and return the number of affected rows"""
+        return await asyncio.to_thread(self._execute, sql, tuple(params))
+
+    async def fetchone(self, sql: str, params: Iterable[Any] = ()) -> Optional[sqlite3.Row]:
+        rows = await asyncio.to_thread(self._fetch, sql, tuple(params))
+        return rows[0] if rows else None
+
+    async def fetchall(self, sql: str, params: Iterable[Any] = ()) -> List[sqlite3.Row]:
+        return await asyncio.to_thread(self._fetch, sql, tuple(params))
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def _initialize(self) -> None:
+        connection = self._connect()
+        try:
+            # WAL lets readers poll while a worker is writing
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(self.schema)
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _execute(self, sql: str, params: tuple) -> int:
+        connection = self._connect()
+        try:
+            cursor = connection.execute(sql, params)
+            connection.commit()
+            return cursor.rowcount
+        finally:
+            connection.close()
+
+    def _fetch(self, sql: str, params: tuple) -> List[sqlite3.Row]:
+        connection = self._connect()
+        try:
+            return connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from models.llm import SummaryResponse
+from services.cache import TTLCache
+from services.llm_scheduler import llm_scheduler
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def summary_cache_key(user_id: str, query: str, document_ids: List[str]) -> str:
+    """Summaries are personalised, so the key covers user, query and result set"""
+    payload = json.dumps([user_id, query, document_ids])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SummaryPrefetcher:
+    """
+    Single-flight cache for search result summaries.
+    Summary requests join an in-flight generation for the same key instead of
+    starting another one, and speculative prefetches started after a search
+    warm the cache so the follow-up /llm/summary call returns immediately.
+    """
+
+    def __init__(self, cache: TTLCache, max_concurrency: int):
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._active_prefetches = 0
+        self.prefetched = 0
+        self.skipped = 0
+        self.joined = 0
+
+    async def run(
+        self,
+        key: str,
+        generate: Callable[[], Awaitable[SummaryResponse]],
+        timeout: Optional[float] = None
+    ) -> SummaryResponse:
+        """
+        Return the cached summary, join an in-flight one, or generate it.
+        On timeout the generation keeps running and its result is cached
+        for the next request.
+        """
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.joined += 1
+            try:
+                # Shielded so a disconnecting client does not cancel shared work
+                return await asyncio.wait_for(asyncio.shield(task), timeout)
+            except asyncio.TimeoutError:
+                raise
+            except Exception as e:
+                logger.warning(f"In-flight summary generation failed, retrying: {e}")
+
+        return await asyncio.wait_for(asyncio.shield(self._start(key, generate)), timeout)
+
+    def prefetch(self, key: str, generate: Callable[[], Awaitable[SummaryResponse]]) -> bool:
+        """Start a background generation unless it is redundant or would add to LLM backlog"""
+        if key in self._in_flight or self.cache.get(key) is not None:
+            return False
+
+        if self._active_prefetches >= self.max_concurrency or llm_scheduler.is_saturated():
+            self.skipped += 1
+            return False
+
+        self._active_prefetches += 1
+        self.prefetched += 1
+        task = self._start(key, generate)
+        task.add_done_callback(self._on_prefetch_done)
+        logger.info(f"Prefetching summary {key[:12]}")
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._in_flight),
+            "active_prefetches": self._active_prefetches,
+            "max_concurrency": self.max_concurrency,
+            "prefetched": self.prefetched,
+            "skipped": self.skipped,
+            "joined": self.joined,
+            "cache": self.cache.get_stats()
+        }
+
+    def _start(self, key: str, generate: Callable[[], Awaitable[SummaryResponse]]) -> asyncio.Task:
+        task = asyncio.create_task(self._generate_and_store(key, generate))
+        task.add_done_callback(self._log_failure)
+        self._in_flight[key] = task
+        return task
+
+    async def _generate_and_store(self, key: str, generate: Callable[[], Awaitable[SummaryResponse]]) -> SummaryResponse:
+        try:
+            response = await generate()
+            self.cache.set(key, response)
+            return response
+        finally:
+            self._in_flight.pop(key, None)
+
+    def _on_prefetch_done(self, task: asyncio.Task) -> None:
+        self._active_prefetches -= 1
+
+    def _log_failure(self, task: asyncio.Task) -> None:
+        # Retrieving the exception also keeps unawaited tasks from warning at shutdown
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Summary generation failed: {task.exception()}")
+
+
+summary_prefetcher = SummaryPrefetcher(
+    cache=TTLCache(
+        max_size=settings.LLM_SUMMARY_CACHE_SIZE,
+        ttl_seconds=settings.LLM_SUMMARY_CACHE_TTL_SECONDS
+    ),
+    max_concurrency=settings.LLM_SUMMARY_PREFETCH_CONCURRENCY
+)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for search response handling in the Elasticsearch service
+"""
+import asyncio
+import os
+import sys
+
+import httpx
+import pytest
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models.search import SearchRequest
+from services.elasticsearch_service import ElasticsearchService, document_cache
+
+
+def test_document_cache_keeps_only_query_independent_fields():
+    service = ElasticsearchService()
+    service.index = "test_documents"
+    hit = {
+        "_id": "doc-1",
+        "_score": 2.5,
+        "_source": {"title": "VPN setup", "content": "Install the client. Then sign in.", "source": "confluence"},
+        "highlight": {"content": ["Install the <em>client</em>"]},
+        "inner_hits": {"passages": {"hits": {"hits": [{"_source": {"text": "Install the client."}}]}}}
+    }
+
+    response = service._process_search_response({"hits": {"hits": [hit]}}, SearchRequest(query="client"))
+
+    result = response.results[0]
+    assert result.passages and result.highlights and result.relevance_score
+    cached = document_cache.get(("test_documents", "doc-1"))
+    assert cached.title == "VPN setup"
+    assert cached.passages == [] and cached.highlights == {} and cached.relevance_score == 0
+
+
+def test_digest_window_filters_on_ingestion_time():
+    newer_filter = ElasticsearchService()._build_newer_than_filter("2026-01-01T00:00:00")
+    clauses = newer_filter["bool"]["should"]
+    assert clauses[0] == {"range": {"ingested_at": {"gt": "2026-01-01T00:00:00"}}}
+    # Documents from before ingested_at existed fall back to their own timestamp
+    assert clauses[1]["bool"]["must_not"] == {"exists": {"field": "ingested_at"}}
+
+
+def test_collapse_is_refused_while_documents_lack_a_cluster(monkeypatch):
+    counts = iter([3, 0])
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, json={"count": next(counts)})
+
+    client = httpx.AsyncClient
+    monkeypatch.setattr(httpx, "AsyncClient", lambda **kwargs: client(transport=httpx.MockTransport(handler)))
+    service = ElasticsearchService()
+    service.endpoint, service.index = "http://es", "test_documents"
+    service.vector_enabled, service.collapse_duplicates = False, True
+
+    with pytest.raises(RuntimeError, match="dedup.py"):
+        asyncio.run(service.verify_index())
+    asyncio.run(service.verify_index())
+
+    assert requests[0].url.path == "/test_documents/_count"
+    assert b'"must_not"' in requests[0].content
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the extractive summary used when the LLM misses its deadline
+"""
+import asyncio
+import os
+import sys
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config import settings
+from models.llm import SummaryRequest
+from models.search import SearchResult
+from models.user import User
+from services.extractive_summarizer import ExtractiveSummarizer
+from services.llm_service import LLMService
+
+
+def make_result(document_id, content="", passages=None, summary=""):
+    return SearchResult(
+        id=document_id, title=f"Document {document_id}", summary=summary, source="confluence",
+        url=f"https://example.com/{document_id}", author="Sam Lee", date="2025-01-01",
+        content_type="document", tags=[], relevance_score=1, highlights={},
+        content=content, passages=passages or []
+    )
+
+
+def test_empty_or_short_content_gives_no_summary():
+    summarizer = ExtractiveSummarizer()
+    assert summarizer.summarize("vpn", []) is None
+    assert summarizer.summarize("vpn", [make_result("a", content="Too short. Also short!")]) is None
+
+
+def test_query_sentences_rank_first():
+    content = (
+        "The offsite planning team booked the main hall for the spring offsite. "
+        "Offsite planning sessions start at nine and the team meets in the main hall. "
+        "The offsite budget was approved by finance after the planning review. "
+        "The team shares offsite planning notes in the main hall channel."
+    )
+    summarizer = ExtractiveSummarizer(max_sentences=1)
+    # The budget sentence is the least central, so only the query can put it first
+    assert summarizer.summarize("budget", [make_result("a", content=content)]) == \
+        "The offsite budget was approved by finance after the planning review."
+    assert summarizer.summarize("channel", [make_result("a", content=content)]) == \
+        "The team shares offsite planning notes in the main hall channel."
+
+
+def test_near_duplicate_sentences_are_filtered():
+    content = (
+        "The payments platform security review found three critical issues in the gateway. "
+        "The payments platform security review found three critical issues in the gateway service. "
+        "Remediation owners were assigned for each issue before the release freeze."
+    )
+    summary = ExtractiveSummarizer(max_sentences=2).summarize("security review", [make_result("a", content=content)])
+    assert summary.count("security review found") == 1
+    assert "Remediation owners" in summary
+
+
+def test_passages_are_preferred_over_content():
+    result = make_result(
+        "a",
+        content="The full document content describes the onboarding checklist in detail.",
+        passages=["The matched passage explains how to request hardware on the first day."]
+    )
+    summary = ExtractiveSummarizer().summarize("onboarding", [result])
+    assert summary == "The matched passage explains how to request hardware on the first day."
+
+
+def test_deadline_falls_back_to_extractive_summary(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_SUMMARY_DEADLINE_SECONDS", 0.05)
+
+    async def slow_llm(self, request, user, lane):
+        await asyncio.sleep(5)
+
+    monkeypatch.setattr(LLMService, "_summarize_with_llm", slow_llm)
+    user = User(id="extractive-test", name="Sam Lee", email="sam@example.com",
+                department="IT", position="Engineer", role="employee")
+    request = SummaryRequest(query="deadline test", search_results=[make_result(
+        "deadline-test",
+        content="The deadline test document explains how summaries fall back when the model is slow."
+    )])
+
+    response = asyncio.run(LLMService().generate_summary(request, user))
+
+    assert response.confidence_score == settings.LLM_EXTRACTIVE_CONFIDENCE
+    assert response.summary.startswith("The deadline test document")
+    assert response.source_distribution == {"confluence": 1}
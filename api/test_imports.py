@@ -22,11 +22,22 @@ def test_imports():
         from models.user import User, UserRole
         from models.search import SearchRequest, SearchResponse
         from models.llm import SummaryRequest, ChatRequest
+        from models.jobs import JobRequest, JobResponse
+        from models.digests import SavedSearchRequest, Digest
+        from models.ratings import RatingRequest, DocumentRatings
+        from models.analytics import RatingAnalytics
         print("✅ Models imported successfully")
         
         print("Testing service imports...")
         from services.elasticsearch_service import ElasticsearchService
         from services.llm_service import LLMService
+        from services.job_service import JobService
+        from services.digest_service import DigestService
+        from services.ratings_service import RatingsService
+        from services.rating_analytics_service import RatingAnalyticsService
+        from services.analytics_service import AnalyticsService
+        from services.cache_warmer import CacheWarmer
+        from services.embedder import QueryEmbedder, HashingEmbedder
         print("✅ Services imported successfully")
         
         print("Testing middleware imports...")
@@ -34,7 +45,7 @@ def test_imports():
         print("✅ Middleware imported successfully")
         
         print("Testing router imports...")
-        from routers import search, llm, health, auth
+        from routers import search, llm, health, auth, jobs, digests, ratings, analytics
         print("✅ Routers imported successfully")
         
         print("Testing main app...")
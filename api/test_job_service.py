@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite-backed LLM job pool
+"""
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from models.jobs import JobStatus
+from models.user import User
+from services import job_service as job_module
+from services.job_service import JobService, TERMINAL_STATUSES
+from services.llm_service import LLMService
+
+USER = User(id="job-test", name="Sam Lee", email="sam@example.com",
+            department="IT", position="Engineer", role="employee")
+
+PAYLOAD = {"document_ids": ["doc-1"]}
+
+DOCUMENT = {
+    "id": "doc-1", "title": "VPN setup", "summary": "How to connect", "source": "confluence",
+    "url": "https://example.com/doc-1", "author": "Sam Lee", "date": "2025-01-01",
+    "content_type": "document", "tags": [], "relevance_score": 1, "highlights": {},
+    "content": "Install the client and sign in."
+}
+
+
+@pytest.fixture
+def handler_calls(monkeypatch):
+    """Replace the comprehensive summary handler with one that records its calls"""
+    calls = []
+
+    async def handler(payload, user):
+        calls.append(payload)
+        return {"summary": f"summary {len(calls)}"}
+
+    monkeypatch.setitem(job_module.JOB_HANDLERS, "comprehensive_summary", handler)
+    return calls
+
+
+def make_service(tmp_path, dedup_ttl_seconds=3600):
+    return JobService(str(tmp_path / "jobs.db"), concurrency=1, dedup_ttl_seconds=dedup_ttl_seconds)
+
+
+async def wait_until_done(service, job_id):
+    for _ in range(200):
+        job = await service.get(job_id)
+        if job.status in TERMINAL_STATUSES:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_running_jobs_are_requeued_on_restart(tmp_path, handler_calls):
+    async def run():
+        crashed = make_service(tmp_path)
+        await crashed.store.initialize()
+        job = await crashed.submit("comprehensive_summary", PAYLOAD, USER)
+        # Claimed by a worker when the process died
+        await crashed.store.execute(
+            "UPDATE jobs SET status = ?, started_at = ? WHERE id = ?",
+            (JobStatus.RUNNING.value, datetime.utcnow().isoformat(), job.id)
+        )
+
+        restarted = make_service(tmp_path)
+        await restarted.start()
+        try:
+            return await wait_until_done(restarted, job.id)
+        finally:
+            await restarted.stop()
+
+    job = asyncio.run(run())
+    assert job.status == JobStatus.COMPLETED
+    assert job.result == {"summary": "summary 1"}
+    assert len(handler_calls) == 1
+
+
+def test_cancellation_racing_the_claim_wins(tmp_path, handler_calls):
+    async def run():
+        service = make_service(tmp_path)
+        await service.store.initialize()
+        job = await service.submit("comprehensive_summary", PAYLOAD, USER)
+
+        read_row = service._get_row
+
+        async def cancelled_after_read(job_id, user=None):
+            # The worker has seen the job as queued; the user cancels before it claims it
+            row = await read_row(job_id, user)
+            service._get_row = read_row
+            await service.cancel(job_id, USER)
+            return row
+
+        service._get_row = cancelled_after_read
+        await service._execute(job.id)
+        return await service.get(job.id)
+
+    job = asyncio.run(run())
+    assert job.status == JobStatus.CANCELLED
+    assert job.started_at is None
+    assert handler_calls == []
+
+
+def test_cancelling_a_running_job_stops_it(tmp_path, monkeypatch):
+    started = []
+
+    async def handler(payload, user):
+        started.append(payload)
+        await asyncio.sleep(5)
+        return {"summary": "too late"}
+
+    monkeypatch.setitem(job_module.JOB_HANDLERS, "comprehensive_summary", handler)
+
+    async def run():
+        service = make_service(tmp_path)
+        await service.start()
+        try:
+            job = await service.submit("comprehensive_summary", PAYLOAD, USER)
+            while not started:
+                await asyncio.sleep(0.01)
+            await service.cancel(job.id, USER)
+            await service._queue.join()
+            return await service.get(job.id)
+        finally:
+            await service.stop()
+
+    job = asyncio.run(run())
+    assert job.status == JobStatus.CANCELLED
+    assert job.result is None
+
+
+def test_identical_jobs_are_shared_within_the_ttl(tmp_path, handler_calls):
+    async def run():
+        service = make_service(tmp_path)
+        await service.start()
+        try:
+            first = await service.submit("comprehensive_summary", PAYLOAD, USER)
+            queued_duplicate = await service.submit("comprehensive_summary", PAYLOAD, USER)
+            await wait_until_done(service, first.id)
+            completed_duplicate = await service.submit("comprehensive_summary", PAYLOAD, USER)
+            other = await service.submit("comprehensive_summary", {"document_ids": ["doc-2"]}, USER)
+            return first, queued_duplicate, completed_duplicate, other
+        finally:
+            await service.stop()
+
+    first, queued_duplicate, completed_duplicate, other = asyncio.run(run())
+    assert not first.deduplicated
+    assert queued_duplicate.id == first.id and queued_duplicate.deduplicated
+    assert completed_duplicate.id == first.id and completed_duplicate.deduplicated
+    assert completed_duplicate.result == {"summary": "summary 1"}
+    assert other.id != first.id
+
+
+def test_completed_jobs_are_not_reused_after_the_ttl(tmp_path, handler_calls):
+    async def run():
+        service = make_service(tmp_path, dedup_ttl_seconds=60)
+        await service.start()
+        try:
+            first = await service.submit("comprehensive_summary", PAYLOAD, USER)
+            await wait_until_done(service, first.id)
+            expired = (datetime.utcnow() - timedelta(seconds=120)).isoformat()
+            await service.store.execute("UPDATE jobs SET finished_at = ? WHERE id = ?", (expired, first.id))
+            second = await service.submit("comprehensive_summary", PAYLOAD, USER)
+            return first, second, await wait_until_done(service, second.id)
+        finally:
+            await service.stop()
+
+    first, second, finished = asyncio.run(run())
+    assert second.id != first.id and not second.deduplicated
+    assert finished.result == {"summary": "summary 2"}
+
+
+def test_failed_llm_call_fails_the_job_and_is_not_reused(tmp_path, monkeypatch):
+    async def unavailable(self, *args, **kwargs):
+        raise RuntimeError("upstream unavailable")
+
+    monkeypatch.setattr(LLMService, "_call_openai", unavailable)
+    payload = {"selected_documents": [DOCUMENT]}
+
+    async def run():
+        service = make_service(tmp_path)
+        await service.start()
+        try:
+            first = await service.submit("comprehensive_summary", payload, USER)
+            failed = await wait_until_done(service, first.id)
+            retried = await service.submit("comprehensive_summary", payload, USER)
+            return failed, retried
+        finally:
+            await service.stop()
+
+    failed, retried = asyncio.run(run())
+    assert failed.status == JobStatus.FAILED
+    assert failed.error == "upstream unavailable"
+    assert failed.result is None
+    assert retried.id != failed.id and not retried.deduplicated
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tests for the rate-limit-aware LLM scheduler
+"""
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+import pytest
+
+# Add the current directory to Python path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.llm_scheduler import LLMScheduler, TokenBucket, parse_reset_duration, parse_retry_after
+
+
+def make_scheduler(**overrides):
+    options = {
+        "requests_per_minute": 600,
+        "tokens_per_minute": 100000,
+        "max_concurrency": 4,
+        "max_retries": 2,
+        "backoff_base": 0.01,
+        "backoff_max": 0.05
+    }
+    options.update(overrides)
+    return LLMScheduler(**options)
+
+
+def responder(*responses):
+    """A send() returning the given responses in turn, recording call times"""
+    calls = []
+
+    async def send():
+        calls.append(time.monotonic())
+        return responses[min(len(calls), len(responses)) - 1]
+
+    return send, calls
+
+
+def test_rate_limit_pauses_upstream_without_retries():
+    scheduler = make_scheduler()
+    send, _ = responder(httpx.Response(429, headers={"retry-after": "30"}))
+
+    response = asyncio.run(scheduler.submit(send, estimated_tokens=10, upstream="primary", max_retries=0))
+
+    assert response.status_code == 429
+    assert scheduler.is_paused("primary")
+    assert not scheduler.is_paused("secondary")
+    assert 29 < scheduler._budgets["primary"].paused_until - time.monotonic() <= 30
+
+
+def test_parse_retry_after_prefers_milliseconds():
+    assert parse_retry_after(httpx.Headers({"retry-after-ms": "250", "retry-after": "9"})) == 0.25
+    assert parse_retry_after(httpx.Headers({"retry-after": "2"})) == 2.0
+    assert parse_retry_after(httpx.Headers({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) is None
+    assert parse_retry_after(httpx.Headers({})) is None
+
+
+def test_parse_reset_duration():
+    assert parse_reset_duration("1s") == 1.0
+    assert parse_reset_duration("6m0s") == 360.0
+    assert parse_reset_duration("20ms") == 0.02
+    assert parse_reset_duration("1.5") == 1.5
+    assert parse_reset_duration("soon") is None
+
+
+def test_token_bucket_refills_continuously():
+    bucket = TokenBucket(60, period_seconds=60)
+    bucket.consume(60)
+    assert bucket.time_until(1) == pytest.approx(1.0, abs=0.05)
+    bucket.updated_at -= 10
+    assert bucket.available() == pytest.approx(10, abs=0.1)
+    # Requests larger than the bucket only wait for a full bucket
+    assert bucket.time_until(1000) == pytest.approx(50, abs=0.5)
+
+
+def test_token_bucket_syncs_with_provider_headers():
+    bucket = TokenBucket(100)
+    bucket.sync(limit=500, remaining=20)
+    assert bucket.capacity == 500
+    assert bucket.available() == pytest.approx(20, abs=0.1)
+
+
+def test_retry_waits_for_retry_after():
+    scheduler = make_scheduler()
+    send, calls = responder(httpx.Response(429, headers={"retry-after-ms": "200"}), httpx.Response(200))
+
+    response = asyncio.run(scheduler.submit(send, estimated_tokens=10))
+
+    assert response.status_code == 200
+    assert len(calls) == 2
+    assert calls[1] - calls[0] >= 0.19
+    assert scheduler.retries == 1
+    assert scheduler.rate_limited == 1
+
+
+def test_exhausted_window_pauses_until_reset():
+    scheduler = make_scheduler()
+    send, _ = responder(httpx.Response(200, headers={
+        "x-ratelimit-remaining-requests": "0",
+        "x-ratelimit-reset-requests": "5s"
+    }))
+
+    asyncio.run(scheduler.submit(send, estimated_tokens=10))
+
+    assert scheduler.is_paused("default")
+    assert scheduler._budgets["default"].delay_for(10) > 4
+
+
+def test_higher_priority_lanes_are_served_first():
+    scheduler = make_scheduler(max_concurrency=1)
+    order = []
+
+    async def run():
+        release = asyncio.Event()
+
+        async def blocker():
+            await release.wait()
+            return httpx.Response(200)
+
+        def recorder(lane):
+            async def send():
+                order.append(lane)
+                return httpx.Response(200)
+            return send
+
+        first = asyncio.create_task(scheduler.submit(blocker, estimated_tokens=1))
+        await asyncio.sleep(0)
+        queued = [
+            asyncio.create_task(scheduler.submit(recorder(lane), estimated_tokens=1, lane=lane))
+            for lane in ("background", "standard", "interactive")
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, *queued)
+
+    asyncio.run(run())
+    assert order == ["interactive", "standard", "background"]
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Index Profile Benchmark for Enterprise Search
+Loads the same seeded synthetic corpus into one scratch index per profile (see
+index_profiles.py) and measures what each profile changes:
+
+- ingest:   bulk indexing throughput, store size and segment count
+- highlight: match on content with highlighting (offsets / term vectors)
+- recent:   a filtered, newest-first search without total hit counts (index sorting)
+- facets:   terms aggregations on the facet fields
+- fresh facets: the same aggregations right after a write and refresh, where
+            eager global ordinals move the cost from the query into the refresh
+
+Semantic fields are left out by default: inference dominates indexing time and
+hides the differences the profiles make.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+
+from elasticsearch.helpers import bulk
+from dotenv import load_dotenv
+
+from corpus_data import DEPARTMENTS, RATING_QUERIES
+from dedup import load_dedup_config
+from embedders import load_embedder_config
+from index_profiles import FACET_FIELDS, INDEX_PROFILES, shard_count
+from semantic_fields import validate_mode
+from setup_elastic import ElasticsearchSetup
+from synth_corpus import ShardSynthesiser, build_fragment_pools
+
+load_dotenv()
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ProfileBenchmark:
+    def __init__(self, args):
+        """Initialize with the parsed arguments; connection settings come from setup_elastic."""
+        self.args = args
+        self.setup = ElasticsearchSetup()
+        self.es = self.setup.es
+        self.setup.config['semantic_enabled'] = args.semantic
+        # Vectors are unaffected by the profiles and would only slow the corpus build
+        self.setup.config['vector_enabled'] = False
+        # Shard counts follow the benchmark corpus, as they would in production
+        self.setup.config['expected_doc_count'] = args.expected_docs or args.docs
+        self.rng = random.Random(args.seed)
+
+    def build_corpus(self):
+        """Generate the corpus once so every profile indexes identical documents."""
+        dedup_config = load_dedup_config()
+        options = {
+            'seed': self.args.seed,
+            'anchor_date': '2025-01-01T00:00:00',
+            'semantic_enabled': self.args.semantic,
+            'semantic_field_prefix': self.setup.config['semantic_field_prefix'],
+            'semantic_field_mode': validate_mode(self.setup.config['semantic_field_mode']),
+            'passages_enabled': self.setup.config['passages_enabled'],
+            'passage_max_chars': int(os.getenv('PASSAGE_MAX_CHARS', '600')),
+            'passage_overlap_chars': int(os.getenv('PASSAGE_OVERLAP_CHARS', '100')),
+            'vectors_enabled': False,
+            'embedder_config': load_embedder_config(),
+            'dedup_enabled': dedup_config['enabled'],
+            'dedup_config': dedup_config
+        }
+        synthesiser = ShardSynthesiser(options, build_fragment_pools(self.args.seed))
+        return list(synthesiser.generate(0, 0, self.args.docs))
+
+    def run_profile(self, profile, corpus):
+        """Create a scratch index with the profile's mapping, load the corpus and time the queries."""
+        index = f"{self.setup.index_name}_bench_{profile.replace('-', '_')}"
+        mapping = self.setup.get_index_mapping(profile)
+        self.es.indices.delete(index=index, ignore_unavailable=True)
+        self.es.indices.create(index=index, body=mapping)
+
+        try:
+            started = time.monotonic()
+            indexed, _ = bulk(
+                self.es.options(request_timeout=300),
+                ({'_index': index, '_id': doc_id, '_source': doc} for doc_id, doc in corpus),
+                chunk_size=self.args.bulk_size
+            )
+            ingest_seconds = time.monotonic() - started
+            self.es.indices.refresh(index=index)
+
+            stats = self.es.indices.stats(index=index, metric=['store', 'segments'])['_all']['primaries']
+            result = {
+                'profile': profile,
+                'shards': mapping['settings']['index']['number_of_shards'],
+                'documents': indexed,
+                'ingest_docs_per_second': indexed / max(ingest_seconds, 1e-9),
+                'store_mb': stats['store']['size_in_bytes'] / 1024 / 1024,
+                'segments': stats['segments']['count']
+            }
+
+            queries = {
+                'highlight': self._highlight_query,
+                'recent': self._recent_query,
+                'facets': self._facet_query
+            }
+            for name, build in queries.items():
+                result[name] = self._time_queries(index, build)
+            result['fresh_facets'] = self._time_fresh_facets(index, corpus)
+            return result
+        finally:
+            if not self.args.keep:
+                self.es.indices.delete(index=index, ignore_unavailable=True)
+
+    def _highlight_query(self):
+        return {
+            'size': 10,
+            'query': {'match': {'content': self.rng.choice(RATING_QUERIES)}},
+            'highlight': {'fields': {'content': {'fragment_size': 150, 'number_of_fragments': 3}}}
+        }
+
+    def _recent_query(self):
+        return {
+            'size': 10,
+            'track_total_hits': False,
+            'query': {'bool': {'filter': [{'term': {'department': self.rng.choice(DEPARTMENTS)}}]}},
+            'sort': [{'timestamp': {'order': 'desc'}}]
+        }
+
+    def _facet_query(self):
+        return {
+            'size': 0,
+            'query': {'match': {'content': self.rng.choice(RATING_QUERIES)}},
+            'aggs': {field: {'terms': {'field': field, 'size': 10}} for field in FACET_FIELDS}
+        }
+
+    def _time_queries(self, index, build):
+        """Server-side latency percentiles (ms) after a warm-up, with the request cache off."""
+        for _ in range(self.args.warmup):
+            self.es.search(index=index, body=build(), request_cache=False)
+        took = [
+            self.es.search(index=index, body=build(), request_cache=False)['took']
+            for _ in range(self.args.queries)
+        ]
+        return {'p50_ms': percentile(took, 0.5), 'p95_ms': percentile(took, 0.95), 'mean_ms': statistics.mean(took)}
+
+    def _time_fresh_facets(self, index, corpus):
+        """Facet latency on the first search after each refresh, plus the refresh time itself."""
+        took = []
+        refresh_ms = []
+        for _ in range(self.args.refreshes):
+            doc_id, doc = self.rng.choice(corpus)
+            self.es.index(index=index, id=doc_id, document=doc)
+            started = time.monotonic()
+            self.es.indices.refresh(index=index)
+            refresh_ms.append((time.monotonic() - started) * 1000)
+            took.append(self.es.search(index=index, body=self._facet_query(), request_cache=False)['took'])
+        return {'p50_ms': percentile(took, 0.5), 'p95_ms': percentile(took, 0.95),
+                'refresh_p50_ms': percentile(refresh_ms, 0.5)}
+
+
+def print_results(results):
+    """Print one row per profile."""
+    header = (f"{'profile':<13} {'shards':>6} {'docs/s':>8} {'MB':>7} {'segs':>5} "
+              f"{'highlight p50/p95':>18} {'recent p50/p95':>15} {'facets p50/p95':>15} {'fresh facets':>13}")
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(
+            f"{result['profile']:<13} {result['shards']:>6} {result['ingest_docs_per_second']:>8,.0f} "
+            f"{result['store_mb']:>7.1f} {result['segments']:>5} "
+            f"{result['highlight']['p50_ms']:>8}/{result['highlight']['p95_ms']:<9} "
+            f"{result['recent']['p50_ms']:>7}/{result['recent']['p95_ms']:<7} "
+            f"{result['facets']['p50_ms']:>7}/{result['facets']['p95_ms']:<7} "
+            f"{result['fresh_facets']['p50_ms']:>6}/{result['fresh_facets']['p95_ms']:<6}"
+        )
+    print("\nLatencies are server-side 'took' in ms. 'fresh facets' is the first aggregation after a refresh;")
+    print("the refresh times are in the JSON output.")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure the effect of each index profile on a synthetic corpus")
+    parser.add_argument('--profiles', nargs='+', choices=INDEX_PROFILES, default=list(INDEX_PROFILES),
+                        help="Profiles to benchmark (default: all)")
+    parser.add_argument('--docs', type=int, default=20000, help="Documents per profile (default: 20000)")
+    parser.add_argument('--expected-docs', type=int,
+                        help="Corpus size the shard counts are chosen for (default: --docs)")
+    parser.add_argument('--seed', type=int, default=42, help="Corpus and query seed (default: 42)")
+    parser.add_argument('--queries', type=int, default=200, help="Timed searches per query type (default: 200)")
+    parser.add_argument('--warmup', type=int, default=20, help="Untimed searches per query type (default: 20)")
+    parser.add_argument('--refreshes', type=int, default=20, help="Write/refresh/aggregate rounds (default: 20)")
+    parser.add_argument('--bulk-size', type=int, default=500, help="Documents per bulk request (default: 500)")
+    parser.add_argument('--semantic', action=argparse.BooleanOptionalAction, default=False,
+                        help="Include semantic_text fields (default: off; inference dominates the timings)")
+    parser.add_argument('--keep', action='store_true', help="Keep the scratch indices for inspection")
+    parser.add_argument('--output', default='benchmark_profiles.json', help="Results file (default: benchmark_profiles.json)")
+    return parser.parse_args()
+
+
+def main():
+    """Main function to benchmark index profiles."""
+    args = parse_args()
+
+    print("Enterprise Search - Index Profile Benchmark")
+    print("=" * 50)
+
+    benchmark = ProfileBenchmark(args)
+    if not benchmark.setup.test_connection():
+        return False
+
+    print(f"🧱 Generating {args.docs:,} documents (seed {args.seed})...")
+    corpus = benchmark.build_corpus()
+
+    results = []
+    try:
+        for profile in args.profiles:
+            shards = shard_count(profile, benchmark.setup.config['expected_doc_count'])
+            print(f"\n⏱️  Benchmarking '{profile}' ({shards} shards)...")
+            results.append(benchmark.run_profile(profile, corpus))
+    except KeyboardInterrupt:
+        print("\n\n⏹️  Benchmark cancelled by user")
+        return False
+
+    print("\n" + "=" * 50)
+    print_results(results)
+
+    with open(args.output, 'w') as f:
+        json.dump({'docs': args.docs, 'seed': args.seed, 'semantic': args.semantic, 'results': results}, f, indent=2)
+    print(f"\n📁 Results: {args.output}")
+    return True
+
+
+if __name__ == "__main__":
+    main()
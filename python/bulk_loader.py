@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+Adaptive Bulk Loader for Enterprise Search
+Streams NDJSON corpora (e.g. from synth_corpus.py) into Elasticsearch.
+
+Files are memory-mapped (gzip files are streamed) and sent as raw bytes, so a
+corpus is never held in memory or re-serialised (ingested_at is spliced into
+each document's bytes). Chunks are sized by payload
+bytes and adjusted from observed bulk latency, several bulk requests run in
+parallel, and 429 rejections pause every worker with exponential backoff
+before the rejected items are retried. Refresh and replicas are switched off
+for the duration of the load and restored afterwards.
+"""
+
+import argparse
+import glob
+import gzip
+import mmap
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from elasticsearch import Elasticsearch, ApiError
+from dotenv import load_dotenv
+
+from ingest_manifest import ingest_timestamp
+
+load_dotenv()
+
+ACTION_PREFIXES = (b'{"index"', b'{"create"', b'{"update"', b'{"delete"')
+DEFAULT_ACTION = b'{"index":{}}'
+
+
+def iter_operations(path):
+    """Yield (action, source) byte lines from an NDJSON file; source is None for deletes.
+
+    Lines that are not bulk action lines are treated as documents to index.
+    """
+    if path.endswith('.gz'):
+        with gzip.open(path, 'rb') as f:
+            yield from _pair_lines(f)
+        return
+
+    if os.path.getsize(path) == 0:
+        return
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield from _pair_lines(iter(mapped.readline, b''))
+
+
+def _pair_lines(lines):
+    action = None
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if action is None and line.startswith(ACTION_PREFIXES):
+            if line.startswith(b'{"delete"'):
+                yield line, None
+            else:
+                action = line
+            continue
+        yield action or DEFAULT_ACTION, line
+        action = None
+
+
+def with_ingested_at(action, source, stamp):
+    """Add "ingested_at" to an index or create source by splicing bytes, without re-serialising it."""
+    if source is None or action.startswith(b'{"update"') or not source.startswith(b'{'):
+        return source
+    rest = source[1:].lstrip()
+    separator = b'' if rest.startswith(b'}') else b','
+    return b'{"ingested_at":"' + stamp + b'"' + separator + rest
+
+
+def expand_paths(paths):
+    """Expand directories into their NDJSON files, in name order."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(
+                glob.glob(os.path.join(path, '*.ndjson')) + glob.glob(os.path.join(path, '*.ndjson.gz'))
+            ))
+        else:
+            files.append(path)
+    return files
+
+
+class AdaptiveChunkSize:
+    """Additive-increase / multiplicative-decrease chunk sizing from bulk latency and rejections."""
+
+    def __init__(self, initial_bytes, min_bytes, max_bytes, target_latency):
+        self.bytes = initial_bytes
+        self.min_bytes = min_bytes
+        self.max_bytes = max_bytes
+        self.target_latency = target_latency
+        self._lock = threading.Lock()
+
+    def observe(self, latency, rejected):
+        with self._lock:
+            if rejected:
+                self.bytes = max(self.min_bytes, self.bytes // 2)
+            elif latency > self.target_latency:
+                self.bytes = max(self.min_bytes, int(self.bytes * 0.75))
+            elif latency < self.target_latency / 2:
+                self.bytes = min(self.max_bytes, self.bytes + self.min_bytes)
+
+
+class BulkLoader:
+    def __init__(self, options):
+        """Initialize the loader from parsed command line options."""
+        self.options = options
+        self.config = self._load_config()
+        self.es = self._create_elasticsearch_client()
+        self.index_name = options.index or self.config['index']
+        self.chunk_size = AdaptiveChunkSize(
+            initial_bytes=int(options.chunk_mb * 1024 * 1024),
+            min_bytes=int(options.min_chunk_kb * 1024),
+            max_bytes=int(options.max_chunk_mb * 1024 * 1024),
+            target_latency=options.target_latency
+        )
+        self.stats = {'indexed': 0, 'failed': 0, 'rejected': 0, 'requests': 0, 'bytes': 0}
+        self._stats_lock = threading.Lock()
+        self._pause_until = 0.0
+        self._errors_shown = 0
+
+    def _load_config(self):
+        """Load connection configuration from environment variables."""
+        return {
+            'host': os.getenv('ELASTIC_HOST', 'localhost'),
+            'port': int(os.getenv('ELASTIC_PORT', '9200')),
+            'scheme': os.getenv('ELASTIC_SCHEME', 'http'),
+            'index': os.getenv('ELASTIC_INDEX', 'enterprise_documents'),
+            'username': os.getenv('ELASTIC_USERNAME'),
+            'password': os.getenv('ELASTIC_PASSWORD'),
+            'api_key': os.getenv('ELASTIC_API_KEY'),
+            'cloud_id': os.getenv('ELASTIC_CLOUD_ID'),
+            'use_ssl': os.getenv('ELASTIC_USE_SSL', 'false').lower() == 'true',
+            'verify_certs': os.getenv('ELASTIC_VERIFY_CERTS', 'false').lower() == 'true',
+            'ca_certs': os.getenv('ELASTIC_CA_CERTS')
+        }
+
+    def _create_elasticsearch_client(self):
+        """Create Elasticsearch client."""
+        connection_params = {}
+
+        if self.config['cloud_id']:
+            connection_params['cloud_id'] = self.config['cloud_id']
+        else:
+            connection_params['hosts'] = [
+                f"{self.config['scheme']}://{self.config['host']}:{self.config['port']}"
+            ]
+
+        if self.config['api_key']:
+            connection_params['api_key'] = self.config['api_key']
+        elif self.config['username'] and self.config['password']:
+            connection_params['basic_auth'] = (self.config['username'], self.config['password'])
+
+        if self.config['use_ssl']:
+            connection_params['verify_certs'] = self.config['verify_certs']
+            if self.config['ca_certs']:
+                connection_params['ca_certs'] = self.config['ca_certs']
+
+        # Large bulk requests can legitimately take a while under load
+        connection_params['request_timeout'] = 120
+
+        return Elasticsearch(**connection_params)
+
+    def prepare_index(self):
+        """Disable refresh and replicas for the load; returns the settings to restore."""
+        current = self.es.indices.get_settings(index=self.index_name, flat_settings=True)
+        original = {}
+        for index, data in current.body.items():
+            settings = data['settings']
+            original[index] = {
+                # None restores the cluster default
+                'index.refresh_interval': settings.get('index.refresh_interval'),
+                'index.number_of_replicas': settings.get('index.number_of_replicas')
+            }
+        self.es.indices.put_settings(
+            index=self.index_name,
+            settings={'index.refresh_interval': '-1', 'index.number_of_replicas': 0}
+        )
+        print(f"⚙️  Disabled refresh and replicas on '{self.index_name}' for the load")
+        return original
+
+    def restore_index(self, original):
+        """Restore refresh and replica settings, refresh, and optionally force-merge."""
+        for index, settings in original.items():
+            self.es.indices.put_settings(index=index, settings=settings)
+        print("⚙️  Restored refresh interval and replicas")
+
+        self.es.indices.refresh(index=self.index_name)
+
+        if self.options.force_merge:
+            print(f"🧹 Force-merging to {self.options.force_merge} segment(s) per shard...")
+            self.es.options(request_timeout=3600).indices.forcemerge(
+                index=self.index_name, max_num_segments=self.options.force_merge
+            )
+
+    def load(self, files):
+        """Stream every file through parallel bulk workers; returns the final stats."""
+        started = time.monotonic()
+        last_report = started
+        last_indexed = 0
+        max_in_flight = self.options.workers * 2
+
+        with ThreadPoolExecutor(max_workers=self.options.workers) as executor:
+            in_flight = set()
+            for chunk in self._chunks(files):
+                # Bounded in-flight chunks keep memory flat however large the corpus
+                if len(in_flight) >= max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                in_flight.add(executor.submit(self._send, chunk))
+
+                now = time.monotonic()
+                if now - last_report >= self.options.report_seconds:
+                    last_indexed = self._report(started, now, last_report, last_indexed)
+                    last_report = now
+
+            for future in wait(in_flight).done:
+                future.result()
+
+        elapsed = time.monotonic() - started
+        self.stats['elapsed'] = elapsed
+        self.stats['docs_per_second'] = self.stats['indexed'] / max(elapsed, 1e-9)
+        return self.stats
+
+    def _chunks(self, files):
+        chunk, size = [], 0
+        for path in files:
+            print(f"📂 Loading {path}")
+            for action, source in iter_operations(path):
+                chunk.append((action, source))
+                size += len(action) + (len(source) if source is not None else 0) + 2
+                if size >= self.chunk_size.bytes:
+                    yield chunk
+                    chunk, size = [], 0
+        if chunk:
+            yield chunk
+
+    def _send(self, chunk):
+        attempt = 0
+        while chunk:
+            self._wait_for_backoff()
+            # Stamped per attempt, so a retried document is dated when it actually lands
+            stamp = ingest_timestamp().encode('ascii')
+            body = b'\n'.join(
+                action + b'\n' + with_ingested_at(action, source, stamp) if source is not None else action
+                for action, source in chunk
+            ) + b'\n'
+
+            started = time.monotonic()
+            try:
+                response = self.es.bulk(operations=body, index=self.index_name)
+            except ApiError as e:
+                if e.meta.status != 429:
+                    raise
+                # The whole request was rejected; retry it unchanged
+                retry = chunk
+            else:
+                retry = self._collect_results(chunk, response.body)
+            latency = time.monotonic() - started
+
+            self.chunk_size.observe(latency, rejected=bool(retry))
+            with self._stats_lock:
+                self.stats['requests'] += 1
+                self.stats['bytes'] += len(body)
+                self.stats['rejected'] += len(retry)
+
+            if not retry:
+                return
+            attempt += 1
+            if attempt > self.options.max_retries:
+                with self._stats_lock:
+                    self.stats['failed'] += len(retry)
+                print(f"❌ Giving up on {len(retry)} documents after {self.options.max_retries} retries")
+                return
+            self._back_off(attempt)
+            chunk = retry
+
+    def _collect_results(self, chunk, body):
+        """Count results; returns the operations rejected with 429 for retry."""
+        retry = []
+        errors = []
+        indexed = 0
+        for operation, item in zip(chunk, body.get('items', [])):
+            result = next(iter(item.values()))
+            status = result.get('status', 200)
+            if status == 429:
+                retry.append(operation)
+            elif status >= 300:
+                errors.append((status, result.get('error')))
+            else:
+                indexed += 1
+        with self._stats_lock:
+            self.stats['indexed'] += indexed
+            self.stats['failed'] += len(errors)
+            # Only the first few failures across all workers are printed
+            shown = errors[:max(0, 5 - self._errors_shown)]
+            self._errors_shown += len(shown)
+        for status, error in shown:
+            print(f"⚠️  Bulk item failed ({status}): {error}")
+        return retry
+
+    def _back_off(self, attempt):
+        # Jittered exponential backoff shared by all workers, so the cluster gets a real pause
+        delay = min(self.options.max_backoff, self.options.initial_backoff * (2 ** (attempt - 1)))
+        delay *= random.uniform(0.5, 1.0)
+        with self._stats_lock:
+            self._pause_until = max(self._pause_until, time.monotonic() + delay)
+
+    def _wait_for_backoff(self):
+        delay = self._pause_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _report(self, started, now, last_report, last_indexed):
+        indexed = self.stats['indexed']
+        overall = indexed / max(now - started, 1e-9)
+        recent = (indexed - last_indexed) / max(now - last_report, 1e-9)
+        print(
+            f"   {indexed:,} indexed | {recent:,.0f} docs/s now, {overall:,.0f} docs/s avg | "
+            f"chunk {self.chunk_size.bytes / 1024 / 1024:.1f}MB | "
+            f"rejected {self.stats['rejected']:,} | failed {self.stats['failed']:,}"
+        )
+        return indexed
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Stream NDJSON corpora into Elasticsearch with adaptive parallel bulk requests")
+    parser.add_argument('paths', nargs='+', help="NDJSON files (.ndjson or .ndjson.gz) or directories containing them")
+    parser.add_argument('--index', help="Target index or alias (default: ELASTIC_INDEX)")
+    parser.add_argument('--workers', type=int, default=4, help="Parallel bulk requests (default: 4)")
+    parser.add_argument('--chunk-mb', type=float, default=5, help="Initial bulk payload size in MB (default: 5)")
+    parser.add_argument('--min-chunk-kb', type=float, default=512, help="Smallest bulk payload in KB (default: 512)")
+    parser.add_argument('--max-chunk-mb', type=float, default=50, help="Largest bulk payload in MB (default: 50)")
+    parser.add_argument('--target-latency', type=float, default=2.0, help="Bulk latency in seconds to size chunks for (default: 2)")
+    parser.add_argument('--max-retries', type=int, default=8, help="Retries for 429-rejected documents (default: 8)")
+    parser.add_argument('--initial-backoff', type=float, default=1.0, help="First 429 backoff in seconds (default: 1)")
+    parser.add_argument('--max-backoff', type=float, default=60.0, help="Longest 429 backoff in seconds (default: 60)")
+    parser.add_argument('--no-tune-settings', dest='tune_settings', action='store_false',
+                        help="Leave refresh_interval and number_of_replicas unchanged during the load")
+    parser.add_argument('--force-merge', type=int, metavar='SEGMENTS',
+                        help="Force-merge to this many segments per shard after loading")
+    parser.add_argument('--report-seconds', type=float, default=5.0, help="Progress report interval (default: 5)")
+    return parser.parse_args()
+
+
+def main():
+    """Main function to bulk load NDJSON files."""
+    args = parse_args()
+
+    print("Enterprise Search - Bulk Loader")
+    print("=" * 50)
+
+    files = expand_paths(args.paths)
+    if not files:
+        print("❌ No NDJSON files found")
+        return False
+
+    loader = BulkLoader(args)
+    if not loader.es.indices.exists(index=loader.index_name):
+        print(f"❌ Index '{loader.index_name}' does not exist. Run setup_elastic.py first.")
+        return False
+
+    original_settings = loader.prepare_index() if args.tune_settings else None
+    try:
+        stats = loader.load(files)
+    except KeyboardInterrupt:
+        print("\n\n⏹️  Load cancelled by user")
+        return False
+    finally:
+        if original_settings is not None:
+            loader.restore_index(original_settings)
+
+    print("\n" + "=" * 50)
+    print(f"✅ Indexed {stats['indexed']:,} documents in {stats['elapsed']:.1f}s ({stats['docs_per_second']:,.0f} docs/s)")
+    print(f"   Requests: {stats['requests']:,}, payload: {stats['bytes'] / 1024 / 1024:,.0f}MB")
+    if stats['rejected']:
+        print(f"   Retried after 429 rejections: {stats['rejected']:,}")
+    if stats['failed']:
+        print(f"❌ Failed: {stats['failed']:,}")
+    return stats['failed'] == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,817 @@
+#!/usr/bin/env python3
+"""
+Connector Pipeline for Enterprise Search
+Ingests local exports from the source systems and maps them to the index schema:
+
+- Confluence: HTML space exports (*.html) and XML site/space exports (entities.xml)
+- Jira: REST search or issue JSON (*.json), with plain or Atlassian Document Format descriptions
+- SharePoint: library metadata exports (*.csv)
+
+Files flow through read -> parse -> normalise -> dedup -> enrich -> bulk stages
+running as asyncio tasks joined by bounded queues, so a slow stage (usually
+enrichment or bulk) applies backpressure to everything upstream instead of
+buffering the whole export in memory. Parsing runs in a process pool; the dedup
+stage assigns near-duplicate clusters (DEDUP_ENABLED, see dedup.py) and the enrich
+stage adds abstracts (--enrich) and client-side vectors (VECTOR_ENABLED). Unchanged
+documents are skipped with the ingest manifest (see ingest_manifest.py), and per-stage throughput,
+utilisation and queue depth are reported while the pipeline runs.
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+from xml.etree import ElementTree
+
+from dotenv import load_dotenv
+from elasticsearch import Elasticsearch
+from elasticsearch.helpers import streaming_bulk
+
+from corpus_data import rating_rank
+from dedup import NearDuplicateIndex, load_dedup_config
+from embedders import embed_documents, load_embedder, load_embedder_config, vector_dims_problem
+from enrichment import DocumentEnricher, load_enrichment_config
+from ingest_manifest import IngestManifest, bulk_upsert_actions, document_id
+from passages import split_into_passages
+from percolate import SavedSearchPercolator
+from semantic_fields import add_client_semantic_fields, validate_mode
+
+load_dotenv()
+
+FILE_KINDS = {
+    '.html': 'confluence_html',
+    '.htm': 'confluence_html',
+    '.xml': 'confluence_xml',
+    '.json': 'jira_json',
+    '.csv': 'sharepoint_csv'
+}
+
+STAGES = ('read', 'parse', 'normalise', 'dedup', 'enrich', 'bulk')
+
+SUMMARY_CHARS = 200
+
+TIMESTAMP_FORMATS = (
+    '%Y-%m-%dT%H:%M:%S.%f%z',       # Jira
+    '%Y-%m-%d %H:%M:%S.%f',         # Confluence XML
+    '%Y-%m-%d %H:%M:%S',
+    '%m/%d/%Y %I:%M %p',            # SharePoint list views
+    '%m/%d/%Y %H:%M',
+    '%m/%d/%Y',
+    '%b %d, %Y'                     # Confluence HTML page footers
+)
+
+# Column names SharePoint metadata exports use for each schema field (matched case-insensitively)
+SHAREPOINT_COLUMNS = {
+    'title': ('title', 'name', 'fileleafref'),
+    'url': ('url', 'path', 'encodedabsurl', 'fileref', 'link'),
+    'author': ('author', 'created by', 'owner', 'modified by', 'editor'),
+    'timestamp': ('modified', 'last modified', 'created'),
+    'content': ('description', 'content', 'body', 'summary'),
+    'tags': ('tags', 'keywords', 'taxkeyword', 'categories'),
+    'site': ('site', 'site name'),
+    'department': ('department',),
+    'project': ('project',),
+    'doc_type': ('content type', 'document type', 'type')
+}
+
+_DONE = object()
+
+
+# --- Parsing (runs in worker processes) ---
+
+class _TextExtractor(HTMLParser):
+    """Collects visible text, the page title and Confluence page metadata from HTML."""
+
+    SKIPPED_TAGS = {'script', 'style', 'head'}
+    BLOCK_TAGS = {'p', 'div', 'br', 'li', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'pre', 'table'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ''
+        self.authors = []
+        self.labels = []
+        self._parts = []
+        self._main_parts = []
+        self._skip_depth = 0
+        self._main_depth = 0
+        self._capture = None
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if tag == 'title':
+            self._in_title = True
+        elif tag in self.SKIPPED_TAGS:
+            self._skip_depth += 1
+        if tag == 'div' and (attrs.get('id') == 'main-content' or self._main_depth):
+            self._main_depth += 1
+        if tag in ('span', 'a') and 'author' in classes:
+            self._capture = self.authors
+            self.authors.append('')
+        elif tag in ('span', 'a') and ('aui-label' in classes or 'label' in classes):
+            self._capture = self.labels
+            self.labels.append('')
+        if tag in self.BLOCK_TAGS:
+            self._append('\n')
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._in_title = False
+        elif tag in self.SKIPPED_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        if tag == 'div' and self._main_depth:
+            self._main_depth -= 1
+        if tag in ('span', 'a'):
+            self._capture = None
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+            return
+        if self._skip_depth:
+            return
+        if self._capture is not None:
+            self._capture[-1] += data
+        self._append(data)
+
+    def _append(self, text):
+        self._parts.append(text)
+        if self._main_depth:
+            self._main_parts.append(text)
+
+    @property
+    def text(self):
+        """Text of Confluence's main-content div when present, otherwise of the whole page."""
+        return ''.join(self._main_parts or self._parts)
+
+    @property
+    def page_text(self):
+        """Text of the whole page, including the metadata around the main content."""
+        return ''.join(self._parts)
+
+
+def _html_to_text(markup):
+    extractor = _TextExtractor()
+    extractor.feed(markup or '')
+    extractor.close()
+    return extractor.text
+
+
+def parse_confluence_html(path, data, config):
+    """One record per exported page; the space key is the export's directory name."""
+    extractor = _TextExtractor()
+    extractor.feed(data.decode('utf-8', errors='replace'))
+    extractor.close()
+
+    # Exported page titles read "Space Name : Page Title"
+    title = extractor.title.rpartition(' : ')[2]
+    space = os.path.basename(os.path.dirname(path))
+    page_name = os.path.splitext(os.path.basename(path))[0]
+    page_id = page_name.rsplit('_', 1)[-1]
+    if page_id.isdigit():
+        url = f"{config['confluence_base_url']}/wiki/spaces/{space}/pages/{page_id}"
+    else:
+        url = f"{config['confluence_base_url']}/wiki/spaces/{space}/pages/{page_name}"
+
+    page_text = extractor.page_text
+    modified = re.search(r'last (?:modified|updated)(?: by .+?)? on ([A-Z][a-z]{2} \d{1,2}, \d{4})', page_text)
+    created = re.search(r'[Cc]reated(?: by .+?)? on ([A-Z][a-z]{2} \d{1,2}, \d{4})', page_text)
+    authors = [author.strip() for author in extractor.authors if author.strip()]
+
+    return [{
+        'source': 'confluence',
+        'content_type': 'document',
+        'title': title or extractor.title or page_name,
+        'content': extractor.text,
+        'author': authors[-1] if authors else None,
+        'url': url,
+        'timestamp': (modified or created).group(1) if (modified or created) else None,
+        'tags': [label.strip() for label in extractor.labels if label.strip()],
+        'space': space
+    }]
+
+
+def parse_confluence_xml(path, data, config):
+    """Current pages from a Confluence XML export (entities.xml)."""
+    root = ElementTree.fromstring(data)
+    objects = {}
+    for obj in root.iter('object'):
+        properties = {prop.get('name'): prop for prop in obj.findall('property')}
+        objects.setdefault(obj.get('class'), []).append((obj.findtext('id'), properties))
+
+    def text(properties, name):
+        prop = properties.get(name)
+        return prop.text if prop is not None and prop.text else None
+
+    def reference(properties, name):
+        prop = properties.get(name)
+        return prop.findtext('id') if prop is not None else None
+
+    spaces = {obj_id: text(props, 'key') for obj_id, props in objects.get('Space', [])}
+    users = {obj_id: text(props, 'name') for obj_id, props in objects.get('ConfluenceUserImpl', [])}
+    bodies = {
+        reference(props, 'content'): text(props, 'body')
+        for _, props in objects.get('BodyContent', [])
+    }
+    label_names = {obj_id: text(props, 'name') for obj_id, props in objects.get('Label', [])}
+    labels = {}
+    for _, props in objects.get('Labelling', []):
+        name = label_names.get(reference(props, 'label'))
+        if name:
+            labels.setdefault(reference(props, 'content'), []).append(name)
+
+    records = []
+    for page_id, props in objects.get('Page', []):
+        # Historical versions point at their current page; drafts and deleted pages have another status
+        if 'originalVersion' in props or text(props, 'contentStatus') not in (None, 'current'):
+            continue
+        space = spaces.get(reference(props, 'space'))
+        author = (
+            text(props, 'lastModifierName') or text(props, 'creatorName')
+            or users.get(reference(props, 'lastModifier')) or users.get(reference(props, 'creator'))
+        )
+        records.append({
+            'source': 'confluence',
+            'content_type': 'document',
+            'title': text(props, 'title'),
+            'content': _html_to_text(bodies.get(page_id)),
+            'author': author,
+            'url': f"{config['confluence_base_url']}/wiki/spaces/{space}/pages/{page_id}",
+            'timestamp': text(props, 'lastModificationDate') or text(props, 'creationDate'),
+            'tags': labels.get(page_id, []),
+            'space': space
+        })
+    return records
+
+
+def _adf_to_text(node):
+    """Flatten Atlassian Document Format (Jira Cloud descriptions and comments) to text."""
+    if isinstance(node, str):
+        return node
+    if isinstance(node, list):
+        return ' '.join(filter(None, (_adf_to_text(child) for child in node)))
+    if isinstance(node, dict):
+        if node.get('type') == 'text':
+            return node.get('text', '')
+        return _adf_to_text(node.get('content', []))
+    return ''
+
+
+def _wiki_to_text(markup):
+    """Drop the most common Jira wiki markup ({code}, {noformat}, h1. ...) from server descriptions."""
+    markup = re.sub(r'\{[a-z]+(?::[^}]*)?\}', ' ', markup)
+    return re.sub(r'^h[1-6]\.\s*', '', markup, flags=re.MULTILINE)
+
+
+def parse_jira_json(path, data, config):
+    """Issues from a REST search response ({"issues": [...]}), a list of issues or a single issue."""
+    payload = json.loads(data)
+    if isinstance(payload, dict):
+        issues = payload.get('issues', [payload])
+    else:
+        issues = payload
+
+    records = []
+    for issue in issues:
+        fields = issue.get('fields', {})
+
+        def name(field, key='name'):
+            value = fields.get(field)
+            return value.get(key) if isinstance(value, dict) else None
+
+        description = fields.get('description')
+        description = _adf_to_text(description) if isinstance(description, dict) else _wiki_to_text(description or '')
+        comments = [
+            _adf_to_text(comment.get('body')) if isinstance(comment.get('body'), dict) else comment.get('body', '')
+            for comment in (fields.get('comment') or {}).get('comments', [])
+        ]
+
+        base_url = config['jira_base_url']
+        if not base_url and issue.get('self'):
+            parts = urlsplit(issue['self'])
+            base_url = f"{parts.scheme}://{parts.netloc}"
+
+        tags = list(fields.get('labels') or [])
+        tags += [component['name'] for component in fields.get('components') or [] if component.get('name')]
+        if name('issuetype'):
+            tags.append(name('issuetype').lower())
+        if name('priority'):
+            tags.append(name('priority').lower())
+
+        records.append({
+            'source': 'jira',
+            'content_type': 'ticket',
+            'title': fields.get('summary') or issue.get('key'),
+            'content': '\n'.join(filter(None, [description] + comments)),
+            'author': name('reporter', 'displayName') or name('assignee', 'displayName'),
+            'url': f"{base_url}/browse/{issue.get('key')}",
+            'timestamp': fields.get('updated') or fields.get('created'),
+            'tags': tags,
+            'priority': name('priority'),
+            'status': name('status'),
+            'project': name('project')
+        })
+    return records
+
+
+def parse_sharepoint_csv(path, data, config):
+    """One record per row of a SharePoint library metadata export."""
+    reader = csv.DictReader(io.StringIO(data.decode('utf-8-sig', errors='replace')))
+    columns = {column.strip().lower(): column for column in reader.fieldnames or []}
+    resolved = {
+        field: next((columns[alias] for alias in aliases if alias in columns), None)
+        for field, aliases in SHAREPOINT_COLUMNS.items()
+    }
+
+    records = []
+    for row in reader:
+        def value(field):
+            column = resolved[field]
+            return (row.get(column) or '').strip() if column else ''
+
+        url = value('url')
+        if url.startswith('/'):
+            url = f"{config['sharepoint_base_url']}{url}"
+        site = value('site')
+        if not site:
+            match = re.search(r'/sites/([^/]+)/', url)
+            site = match.group(1) if match else None
+        title = value('title')
+        if title and '.' in title and title == os.path.basename(urlsplit(url).path):
+            title = os.path.splitext(title)[0]
+
+        tags = [tag.strip() for tag in re.split(r'[;,]', value('tags')) if tag.strip()]
+        if value('doc_type'):
+            tags.append(value('doc_type').lower().replace(' ', '_'))
+
+        records.append({
+            'source': 'sharepoint',
+            'content_type': 'document',
+            'title': title,
+            'content': value('content') or title,
+            'author': value('author'),
+            'url': url,
+            'timestamp': value('timestamp'),
+            'tags': tags,
+            'site': site,
+            'department': value('department'),
+            'project': value('project')
+        })
+    return records
+
+
+PARSERS = {
+    'confluence_html': parse_confluence_html,
+    'confluence_xml': parse_confluence_xml,
+    'jira_json': parse_jira_json,
+    'sharepoint_csv': parse_sharepoint_csv
+}
+
+
+def parse_export(kind, path, data, modified, config):
+    """Parse one export file; records without a timestamp fall back to the file's mtime."""
+    records = PARSERS[kind](path, data, config)
+    for record in records:
+        if not record.get('timestamp'):
+            record['timestamp'] = modified
+    return records
+
+
+# --- Normalisation ---
+
+def _collapse(text):
+    return re.sub(r'\s+', ' ', text or '').strip()
+
+
+def normalise_timestamp(value):
+    """ISO 8601 string for the timestamp formats the exports use, or None."""
+    value = (value or '').strip()
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).isoformat()
+    except ValueError:
+        pass
+    for timestamp_format in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(value, timestamp_format).isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def summarise(content, max_chars=SUMMARY_CHARS):
+    if len(content) <= max_chars:
+        return content
+    return content[:max_chars].rsplit(' ', 1)[0] + "..."
+
+
+# --- Pipeline ---
+
+class StageMetrics:
+    def __init__(self, name, workers, queue):
+        self.name = name
+        self.workers = workers
+        self.queue = queue
+        self.items_in = 0
+        self.items_out = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.max_queue_depth = 0
+
+    def utilisation(self, elapsed):
+        """Share of worker time spent processing (as opposed to waiting on either queue)."""
+        return self.busy_seconds / max(elapsed * self.workers, 1e-9)
+
+
+class ConnectorPipeline:
+    def __init__(self, options):
+        """Initialize the pipeline from parsed command line options."""
+        self.options = options
+        self.config = self._load_config()
+        self.es = self._create_elasticsearch_client()
+        self.index_name = options.index or self.config['index']
+        self.manifest = IngestManifest(self.config['ingest_manifest_file'], self.config['semantic_field_prefix'])
+        dedup_config = load_dedup_config()
+        self.dedup = NearDuplicateIndex(dedup_config) if dedup_config['enabled'] else None
+        self.enricher = DocumentEnricher(load_enrichment_config()) if options.enrich else None
+        self.embedder_config = load_embedder_config()
+        self.embedder = load_embedder(self.embedder_config) if self.embedder_config['vector_enabled'] else None
+        self.percolator = SavedSearchPercolator(
+            self.es, self.config['percolator_index'], self.config['alerts_index']
+        ) if self.config['percolator_enabled'] else None
+        self.parser_config = {
+            key: self.config[key] for key in ('confluence_base_url', 'jira_base_url', 'sharepoint_base_url')
+        }
+        self.stats = {'unchanged': 0, 'duplicates': 0, 'indexed': 0, 'failed': 0, 'alerts': 0}
+
+    def _load_config(self):
+        """Load configuration from environment variables."""
+        return {
+            'host': os.getenv('ELASTIC_HOST', 'localhost'),
+            'port': int(os.getenv('ELASTIC_PORT', '9200')),
+            'scheme': os.getenv('ELASTIC_SCHEME', 'http'),
+            'index': os.getenv('ELASTIC_INDEX', 'enterprise_documents'),
+            'username': os.getenv('ELASTIC_USERNAME'),
+            'password': os.getenv('ELASTIC_PASSWORD'),
+            'api_key': os.getenv('ELASTIC_API_KEY'),
+            'cloud_id': os.getenv('ELASTIC_CLOUD_ID'),
+            'use_ssl': os.getenv('ELASTIC_USE_SSL', 'false').lower() == 'true',
+            'verify_certs': os.getenv('ELASTIC_VERIFY_CERTS', 'false').lower() == 'true',
+            'ca_certs': os.getenv('ELASTIC_CA_CERTS'),
+            'semantic_enabled': os.getenv('SEMANTIC_ENABLED', 'true').lower() == 'true',
+            'semantic_field_prefix': os.getenv('SEMANTIC_FIELD_PREFIX', 'semantic_'),
+            'semantic_field_mode': validate_mode(os.getenv('SEMANTIC_FIELD_MODE', 'client')),
+            'passages_enabled': os.getenv('PASSAGES_ENABLED', 'true').lower() == 'true',
+            'passage_max_chars': int(os.getenv('PASSAGE_MAX_CHARS', '600')),
+            'passage_overlap_chars': int(os.getenv('PASSAGE_OVERLAP_CHARS', '100')),
+            'ingest_manifest_file': os.getenv('INGEST_MANIFEST_FILE', '.ingest_manifest.json'),
+            'percolator_enabled': os.getenv('PERCOLATOR_ENABLED', 'true').lower() == 'true',
+            'percolator_index': os.getenv('PERCOLATOR_INDEX') or f"{os.getenv('ELASTIC_INDEX', 'enterprise_documents')}_saved_searches",
+            'alerts_index': os.getenv('ALERTS_INDEX') or f"{os.getenv('ELASTIC_INDEX', 'enterprise_documents')}_search_alerts",
+            # Connector sources (base URLs build links for exports that only carry ids or paths)
+            'confluence_base_url': os.getenv('CONFLUENCE_BASE_URL', 'https://company.atlassian.net').rstrip('/'),
+            'jira_base_url': os.getenv('JIRA_BASE_URL', '').rstrip('/'),
+            'sharepoint_base_url': os.getenv('SHAREPOINT_BASE_URL', 'https://company.sharepoint.com').rstrip('/'),
+            'default_department': os.getenv('CONNECTOR_DEFAULT_DEPARTMENT', '')
+        }
+
+    def _create_elasticsearch_client(self):
+        """Create Elasticsearch client."""
+        connection_params = {}
+
+        if self.config['cloud_id']:
+            connection_params['cloud_id'] = self.config['cloud_id']
+        else:
+            connection_params['hosts'] = [
+                f"{self.config['scheme']}://{self.config['host']}:{self.config['port']}"
+            ]
+
+        if self.config['api_key']:
+            connection_params['api_key'] = self.config['api_key']
+        elif self.config['username'] and self.config['password']:
+            connection_params['basic_auth'] = (self.config['username'], self.config['password'])
+
+        if self.config['use_ssl']:
+            connection_params['verify_certs'] = self.config['verify_certs']
+            if self.config['ca_certs']:
+                connection_params['ca_certs'] = self.config['ca_certs']
+
+        # semantic_text inference makes bulk requests slower than plain indexing
+        connection_params['request_timeout'] = 120
+
+        return Elasticsearch(**connection_params)
+
+    async def run(self, files):
+        """Run every file through the pipeline; returns the stats with per-stage metrics."""
+        options = self.options
+        queues = {name: asyncio.Queue(maxsize=options.queue_size) for name in STAGES}
+        workers = {
+            'read': options.read_workers,
+            'parse': options.parse_workers,
+            'normalise': options.normalise_workers,
+            # Cluster assignment depends on every earlier document, so it runs in order
+            'dedup': 1,
+            'enrich': options.enrich_workers if self.enricher or self.embedder else 1,
+            'bulk': options.bulk_workers
+        }
+        self.metrics = {name: StageMetrics(name, workers[name], queues[name]) for name in STAGES}
+
+        self._process_pool = ProcessPoolExecutor(max_workers=options.parse_workers)
+        started = time.monotonic()
+        reporter = asyncio.create_task(self._report_loop(started))
+        try:
+            await asyncio.gather(
+                self._feed(files, queues['read']),
+                self._run_stage('read', self._read, queues['read'], queues['parse']),
+                self._run_stage('parse', self._parse, queues['parse'], queues['normalise']),
+                self._run_stage('normalise', self._normalise, queues['normalise'], queues['dedup']),
+                self._run_stage('dedup', self._dedup, queues['dedup'], queues['enrich'],
+                                batch_size=options.dedup_batch_size),
+                self._run_stage('enrich', self._enrich, queues['enrich'], queues['bulk'],
+                                batch_size=options.enrich_batch_size),
+                self._run_stage('bulk', self._bulk, queues['bulk'], None, batch_size=options.bulk_size)
+            )
+        finally:
+            reporter.cancel()
+            await asyncio.gather(reporter, return_exceptions=True)
+            self._process_pool.shutdown(cancel_futures=True)
+            # Whatever was indexed before a failure or interrupt is not sent again next run
+            self.manifest.save()
+            if self.dedup:
+                self.dedup.save()
+            if self.enricher:
+                self.enricher.save_cache()
+
+        self.stats['elapsed'] = time.monotonic() - started
+        return self.stats
+
+    async def _feed(self, files, queue):
+        for path in files:
+            await queue.put(path)
+        await queue.put(_DONE)
+
+    async def _run_stage(self, name, handler, inbox, outbox, batch_size=1):
+        """Run a stage's workers until upstream is exhausted, then signal downstream.
+
+        Workers block on a full outbox, which is what propagates backpressure upstream.
+        Stages with a batch_size take whatever is queued (up to batch_size) as one batch.
+        A worker that takes the end-of-input sentinel puts it back for its siblings.
+        """
+        metrics = self.metrics[name]
+
+        async def worker():
+            finished = False
+            while not finished:
+                item = await inbox.get()
+                if item is _DONE:
+                    inbox.put_nowait(_DONE)
+                    break
+                batch = [item]
+                while len(batch) < batch_size and not inbox.empty():
+                    item = inbox.get_nowait()
+                    if item is _DONE:
+                        inbox.put_nowait(_DONE)
+                        finished = True
+                        break
+                    batch.append(item)
+                metrics.max_queue_depth = max(metrics.max_queue_depth, inbox.qsize() + len(batch))
+
+                started = time.monotonic()
+                try:
+                    results = await handler(batch if batch_size > 1 else batch[0])
+                except Exception as e:
+                    metrics.errors += len(batch)
+                    print(f"⚠️  {name} stage failed on {len(batch)} item(s): {e}")
+                    results = []
+                metrics.busy_seconds += time.monotonic() - started
+                metrics.items_in += len(batch)
+
+                for result in results:
+                    metrics.items_out += 1
+                    if outbox is not None:
+                        blocked = time.monotonic()
+                        await outbox.put(result)
+                        metrics.blocked_seconds += time.monotonic() - blocked
+
+        await asyncio.gather(*(worker() for _ in range(metrics.workers)))
+        inbox.get_nowait()
+        if outbox is not None:
+            await outbox.put(_DONE)
+
+    async def _read(self, path):
+        kind = FILE_KINDS[os.path.splitext(path)[1].lower()]
+        data = await asyncio.to_thread(_read_file, path)
+        modified = datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+        return [(kind, path, data, modified)]
+
+    async def _parse(self, item):
+        kind, path, data, modified = item
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._process_pool, parse_export, kind, path, data, modified, self.parser_config
+        )
+
+    async def _normalise(self, record):
+        """Map a parsed record onto the index schema; unchanged documents are dropped here."""
+        doc = {
+            field: value for field, value in record.items()
+            if value not in (None, '', [])
+        }
+        doc['title'] = _collapse(doc.get('title')) or 'Untitled'
+        doc['content'] = _collapse(doc.get('content'))
+        doc['summary'] = summarise(doc['content'])
+        doc['timestamp'] = normalise_timestamp(doc.get('timestamp')) or datetime.now().isoformat()
+        doc['tags'] = list(dict.fromkeys(tag.lower().replace(' ', '_') for tag in doc.get('tags', [])))
+        if 'department' not in doc and self.config['default_department']:
+            doc['department'] = self.config['default_department']
+
+        if self.options.full:
+            self.manifest.hashes.pop(document_id(doc), None)
+        changed, unchanged = self.manifest.select_changed([doc])
+        self.stats['unchanged'] += unchanged
+        if not changed:
+            return []
+
+        # Derived fields are excluded from the content hash, so they are only built for changed documents
+        doc['ratings'] = {'rank': rating_rank(0.0)}
+        if self.config['semantic_enabled']:
+            add_client_semantic_fields(doc, self.config['semantic_field_prefix'], self.config['semantic_field_mode'])
+        if self.config['passages_enabled']:
+            doc['passages'] = split_into_passages(
+                doc['content'],
+                max_chars=self.config['passage_max_chars'],
+                overlap_chars=self.config['passage_overlap_chars']
+            )
+        return changed
+
+    async def _dedup(self, batch):
+        """Assign dup_cluster ids to a batch in one vectorised MinHash pass."""
+        if not self.dedup:
+            return batch
+        kept, skipped = await asyncio.to_thread(self.dedup.assign, batch)
+        self.stats['duplicates'] += skipped
+        return kept
+
+    async def _enrich(self, batch):
+        documents = [doc for _, doc in batch]
+        if self.enricher:
+            await asyncio.to_thread(self.enricher.enrich_documents, documents)
+        if self.embedder:
+            await asyncio.to_thread(embed_documents, self.embedder, documents, self.embedder_config)
+        return batch
+
+    async def _bulk(self, batch):
+        await asyncio.to_thread(self._index_batch, batch)
+        return []
+
+    def _index_batch(self, batch):
+        documents = dict(batch)
+        indexed = []
+        for ok, item in streaming_bulk(
+            self.es, bulk_upsert_actions(self.index_name, batch),
+            chunk_size=len(batch), max_retries=3, initial_backoff=2, raise_on_error=False
+        ):
+            result = item['update']
+            if ok:
+                doc = documents[result['_id']]
+                self.manifest.mark_indexed(result['_id'], doc['content_hash'])
+                indexed.append((result['_id'], doc))
+            else:
+                self.stats['failed'] += 1
+                if self.stats['failed'] <= 5:
+                    print(f"❌ Failed to index {result['_id']}: {result.get('error')}")
+        self.stats['indexed'] += len(indexed)
+
+        if self.percolator and indexed:
+            try:
+                self.stats['alerts'] += self.percolator.percolate(indexed)
+            except Exception as e:
+                print(f"⚠️  Saved-search percolation failed: {e}")
+
+    async def _report_loop(self, started):
+        while True:
+            await asyncio.sleep(self.options.report_seconds)
+            self.print_metrics(time.monotonic() - started)
+
+    def print_metrics(self, elapsed):
+        print(f"   --- {elapsed:.0f}s: {self.stats['indexed']:,} indexed, {self.stats['unchanged']:,} unchanged ---")
+        for name in STAGES:
+            metrics = self.metrics[name]
+            print(
+                f"   {name:<10} in {metrics.items_in:>8,} | out {metrics.items_out:>8,} | "
+                f"{metrics.items_in / max(elapsed, 1e-9):>8,.1f}/s | busy {metrics.utilisation(elapsed):>4.0%} | "
+                f"blocked {metrics.blocked_seconds:>6.1f}s | queue {metrics.queue.qsize():>4}/{metrics.queue.maxsize} "
+                f"(max {metrics.max_queue_depth})"
+                + (f" | errors {metrics.errors}" if metrics.errors else "")
+            )
+
+    def bottleneck(self, elapsed):
+        """The busiest stage, which limits the pipeline's throughput."""
+        return max(self.metrics.values(), key=lambda metrics: metrics.utilisation(elapsed))
+
+
+def _read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def expand_paths(paths):
+    """Expand files and directories into the export files the connectors understand."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in sorted(os.walk(path)):
+                files.extend(
+                    os.path.join(directory, name) for name in sorted(names)
+                    if os.path.splitext(name)[1].lower() in FILE_KINDS
+                )
+        elif os.path.splitext(path)[1].lower() in FILE_KINDS:
+            files.append(path)
+    return files
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Ingest Confluence, Jira and SharePoint exports through a staged pipeline")
+    parser.add_argument('paths', nargs='+', help="Export files (.html, .xml, .json, .csv) or directories containing them")
+    parser.add_argument('--index', help="Target index or alias (default: ELASTIC_INDEX)")
+    parser.add_argument('--queue-size', type=int, default=100, help="Capacity of each queue between stages (default: 100)")
+    parser.add_argument('--read-workers', type=int, default=4, help="Concurrent file reads (default: 4)")
+    parser.add_argument('--parse-workers', type=int, default=os.cpu_count() or 2,
+                        help="Parser processes (default: CPU count)")
+    parser.add_argument('--normalise-workers', type=int, default=1, help="Normalisation tasks (default: 1)")
+    parser.add_argument('--dedup-batch-size', type=int, default=200,
+                        help="Documents per near-duplicate detection batch (default: 200)")
+    parser.add_argument('--enrich', dest='enrich', action='store_true',
+                        default=os.getenv('ENRICH_ENABLED', 'false').lower() == 'true',
+                        help="Generate abstracts and key facts (default: ENRICH_ENABLED)")
+    parser.add_argument('--no-enrich', dest='enrich', action='store_false')
+    parser.add_argument('--enrich-workers', type=int, default=2, help="Concurrent enrichment batches (default: 2)")
+    parser.add_argument('--enrich-batch-size', type=int, default=20, help="Documents per enrichment batch (default: 20)")
+    parser.add_argument('--bulk-workers', type=int, default=2, help="Concurrent bulk requests (default: 2)")
+    parser.add_argument('--bulk-size', type=int, default=200, help="Documents per bulk request (default: 200)")
+    parser.add_argument('--full', action='store_true', help="Ignore the ingest manifest and send every document")
+    parser.add_argument('--report-seconds', type=float, default=10.0, help="Metrics report interval (default: 10)")
+    return parser.parse_args()
+
+
+def main():
+    """Main function to run the connector pipeline."""
+    args = parse_args()
+
+    print("Enterprise Search - Connector Pipeline")
+    print("=" * 50)
+
+    files = expand_paths(args.paths)
+    if not files:
+        print("❌ No export files found")
+        return False
+
+    pipeline = ConnectorPipeline(args)
+    if not pipeline.es.indices.exists(index=pipeline.index_name):
+        print(f"❌ Index '{pipeline.index_name}' does not exist. Run setup_elastic.py first.")
+        return False
+    if pipeline.embedder:
+        # Keyed by the concrete index behind the alias
+        mapping = pipeline.es.indices.get_mapping(index=pipeline.index_name)
+        problem = vector_dims_problem(next(iter(mapping.body.values()))['mappings']['properties'],
+                                      pipeline.embedder_config)
+        if problem:
+            print(f"❌ {problem}")
+            return False
+    if pipeline.percolator and not pipeline.percolator.is_available():
+        pipeline.percolator = None
+
+    print(f"📂 Ingesting {len(files)} export files into '{pipeline.index_name}'...")
+    try:
+        stats = asyncio.run(pipeline.run(files))
+    except KeyboardInterrupt:
+        print("\n\n⏹️  Ingestion cancelled by user")
+        return False
+
+    print("\n" + "=" * 50)
+    pipeline.print_metrics(stats['elapsed'])
+    bottleneck = pipeline.bottleneck(stats['elapsed'])
+    print(f"\n🐢 Bottleneck: {bottleneck.name} stage ({bottleneck.utilisation(stats['elapsed']):.0%} busy)")
+    print(f"✅ Indexed {stats['indexed']:,} documents in {stats['elapsed']:.1f}s, skipped {stats['unchanged']:,} unchanged")
+    if stats['duplicates']:
+        print(f"🪞 Skipped {stats['duplicates']:,} exact duplicates")
+    if stats['alerts']:
+        print(f"🔔 Recorded {stats['alerts']} saved-search alerts")
+    if stats['failed']:
+        print(f"❌ Failed: {stats['failed']:,}")
+    return stats['failed'] == 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Shared vocabulary for the test data generators
+Used by gen_test_data.py for small interactive datasets and by
+synth_corpus.py for seeded benchmark-scale corpora.
+"""
+
+DEPARTMENTS = [
+    'Digital Banking', 'Consumer Banking', 'Institutional Banking',
+    'Technology & Operations', 'Risk Management', 'Human Resources',
+    'Corporate Banking', 'Investment Banking', 'Compliance',
+    'Marketing', 'Finance', 'Legal', 'Audit', 'Information Security',
+    'Business Intelligence', 'Operations', 'Engineering'
+]
+
+EMPLOYEES = [
+    'Sarah Chen', 'Michael Wong', 'Jennifer Park', 'Alex Kumar',
+    'Emma Thompson', 'David Lim', 'Rachel Tan', 'James Liu',
+    'Lisa Zhang', 'Robert Singh', 'Maria Garcia', 'Kevin Ng',
+    'Priya Sharma', 'Daniel Ho', 'Sophie Lee', 'Ryan Tay',
+    'Jennifer Tan', 'David Wong', 'Lisa Kumar', 'Alex Thompson',
+    'Mike Rodriguez'
+]
+
+ENTERPRISE_TOPICS = [
+    'digital transformation', 'customer experience', 'risk assessment',
+    'regulatory compliance', 'mobile applications', 'cybersecurity',
+    'data analytics', 'artificial intelligence', 'blockchain',
+    'payment systems', 'cloud migration', 'API integration',
+    'fraud detection', 'customer onboarding', 'process automation',
+    'business intelligence', 'data governance', 'system architecture',
+    'database migration', 'security incident response', 'marketing analytics',
+    'integration platform', 'microservices', 'container orchestration'
+]
+
+# User IDs that match the frontend users
+USER_IDS = [
+    'sarah_chen', 'mike_rodriguez', 'jennifer_tan', 'david_wong',
+    'lisa_kumar', 'alex_thompson'
+]
+
+RATING_QUERIES = [
+    "payment processing", "API integration", "security issues",
+    "database migration", "customer data", "compliance documents"
+]
+
+# ratings.rank is a rank_feature, so it must be positive; 1.0 marks an unrated document
+NEUTRAL_RATING_RANK = 1.0
+
+
+def rating_rank(score):
+    """Map a ratings.score in [-1, 1] to the positive ratings.rank feature value."""
+    return round(max(NEUTRAL_RATING_RANK + score, 0.01), 3)
+
+# Confluence
+CONFLUENCE_DOC_TYPES = [
+    'Requirements Document', 'Technical Specification', 'User Guide',
+    'Project Plan', 'Meeting Notes', 'Knowledge Base Article',
+    'Process Documentation', 'Architecture Overview', 'FAQ',
+    'Design Document', 'Implementation Guide', 'Best Practices'
+]
+CONFLUENCE_SPACES = ['TECH', 'PROD', 'HR', 'RISK', 'COMP', 'MKT', 'FIN', 'LEGAL', 'ENG', 'OPS', 'SEC', 'BI']
+CONFLUENCE_PROJECTS = ['Alpha', 'Beta', 'Gamma', 'Delta', 'Phoenix', 'Odyssey']
+CONFLUENCE_CONTENT_TEMPLATES = [
+    "This document outlines the {topic} implementation for our enterprise platform. "
+    "The solution addresses customer needs for secure and efficient {topic} processing. "
+    "Key components include authentication, validation, and real-time processing capabilities. "
+    "Integration with core systems ensures seamless data flow and operational integrity.",
+
+    "Comprehensive guide to {topic} processes within enterprise operations. "
+    "This documentation covers standard procedures, best practices, and compliance requirements. "
+    "Includes step-by-step instructions and troubleshooting guidelines. "
+    "Regular updates ensure alignment with evolving business needs."
+]
+CONFLUENCE_TAG_LEVELS = ['urgent', 'standard', 'low_priority']
+
+# Jira
+JIRA_TICKET_TYPES = ['Bug', 'Task', 'Story', 'Epic', 'Improvement', 'Sub-task']
+JIRA_PRIORITIES = ['Critical', 'High', 'Medium', 'Low']
+JIRA_STATUSES = ['Open', 'In Progress', 'Code Review', 'Testing', 'Done', 'Closed', 'Blocked']
+JIRA_PROJECT_KEYS = ['CORP', 'TECH', 'PROD', 'CORE']
+JIRA_PROJECTS = ['DIGITAL', 'CORE', 'MOBILE', 'API', 'CLOUD', 'SECURITY']
+JIRA_TITLE_TEMPLATES = {
+    'Bug': [
+        "Issue with {topic} functionality",
+        "API timeout in {topic} service",
+        "Data inconsistency in {topic} module",
+        "Performance issue in {topic} component"
+    ],
+    'Epic': [
+        "Epic: Transform {topic} capabilities",
+        "Epic: Modernize {topic} infrastructure",
+        "Epic: Enhance {topic} user experience"
+    ],
+    'default': [
+        "Implement {topic} enhancement",
+        "Upgrade {topic} infrastructure",
+        "Design {topic} user interface",
+        "Integrate {topic} with core systems"
+    ]
+}
+
+# SharePoint
+SHAREPOINT_DOC_TYPES = [
+    'Policy Document', 'Training Material', 'Procedure Manual',
+    'Report', 'Presentation', 'Spreadsheet', 'Form Template',
+    'Compliance Document', 'Audit Report', 'Guidelines'
+]
+SHAREPOINT_SITES = [
+    'HR-Portal', 'Risk-Management', 'Compliance', 'IT-Department',
+    'Corporate-Development', 'Operations', 'Finance', 'Legal-Documents'
+]
+SHAREPOINT_EXTENSIONS = ['.docx', '.xlsx', '.pptx', '.pdf']
+SHAREPOINT_CONTENT_TEMPLATES = [
+    "Official company policy regarding {topic} management and implementation. "
+    "This document establishes guidelines, procedures, and compliance requirements. "
+    "All staff must adhere to these policies to ensure regulatory compliance.",
+
+    "Comprehensive {doc_type} covering {topic} best practices. "
+    "Includes detailed procedures, examples, and reference materials. "
+    "Designed for operational reference and training purposes."
+]
+
+# Queries used to smoke-test search after loading data
+TEST_QUERIES = ["payment", "security", "API"]
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Detection for Enterprise Search
+Assigns every document a dup_cluster id at ingest so searches can collapse
+near-identical documents (template-generated pages, copied Confluence and
+SharePoint files) into one result.
+
+Documents are reduced to MinHash signatures of their word shingles, computed
+for a whole batch at once in NumPy. Signatures are split into LSH bands so only
+documents sharing a band are compared. A document joins the cluster of its most
+similar earlier document when the estimated Jaccard similarity reaches the
+threshold, otherwise it starts its own cluster named after its id. Cluster ids
+never change once assigned, so indexed documents don't need rewriting.
+
+Signatures of everything indexed are kept in a local file next to the ingest
+manifest; `python dedup.py` rebuilds it from the index and backfills
+dup_cluster on documents indexed before deduplication was enabled.
+"""
+
+import hashlib
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DUP_CLUSTER_FIELD = 'dup_cluster'
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Documents read, clustered and updated together by `python dedup.py`
+REBUILD_BATCH_SIZE = 2000
+
+# Upper bound on shingles hashed per NumPy pass (x num_perm x 8 bytes of scratch memory)
+CHUNK_SHINGLES = 32768
+
+# Odd multipliers that combine the token hashes of a shingle into one hash
+SHINGLE_MULTIPLIERS = np.array([
+    0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+    0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x94D049BB133111EB, 0xBF58476D1CE4E5B9
+], dtype=np.uint64)
+
+
+def load_dedup_config():
+    """Load near-duplicate detection configuration from environment variables."""
+    config = {
+        'enabled': os.getenv('DEDUP_ENABLED', 'true').lower() == 'true',
+        'skip_exact': os.getenv('DEDUP_SKIP_EXACT', 'false').lower() == 'true',
+        'threshold': float(os.getenv('DEDUP_THRESHOLD', '0.8')),
+        'num_perm': int(os.getenv('DEDUP_NUM_PERM', '128')),
+        'bands': int(os.getenv('DEDUP_BANDS', '16')),
+        'shingle_size': int(os.getenv('DEDUP_SHINGLE_SIZE', '5')),
+        'seed': int(os.getenv('DEDUP_SEED', '1')),
+        'index_file': os.getenv('DEDUP_INDEX_FILE', '.dedup_signatures.npz')
+    }
+    if config['shingle_size'] > len(SHINGLE_MULTIPLIERS):
+        raise ValueError(f"DEDUP_SHINGLE_SIZE can be at most {len(SHINGLE_MULTIPLIERS)}")
+    if config['num_perm'] % config['bands']:
+        raise ValueError(f"DEDUP_NUM_PERM ({config['num_perm']}) must be a multiple of DEDUP_BANDS ({config['bands']})")
+    return config
+
+
+def dedup_text(doc):
+    """The text near-duplicates are judged on; summaries are derived from content so they're left out."""
+    return f"{doc.get('title', '')}\n{doc.get('content', '')}"
+
+
+@lru_cache(maxsize=200_000)
+def _token_hash(token):
+    return int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def shingle_hashes(text, shingle_size):
+    """Unique 64-bit hashes of the word shingles of a text (empty for a text without words)."""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    token_hashes = np.fromiter((_token_hash(token) for token in tokens), dtype=np.uint64, count=len(tokens))
+    # Texts shorter than one shingle are a single shingle of all their words
+    size = min(shingle_size, len(tokens))
+    count = len(tokens) - size + 1
+    combined = np.zeros(count, dtype=np.uint64)
+    for offset in range(size):
+        # uint64 arithmetic wraps, which is what the hash wants
+        combined ^= token_hashes[offset:offset + count] * SHINGLE_MULTIPLIERS[offset]
+    return np.unique(combined)
+
+
+class MinHasher:
+    """Vectorised MinHash: one (a * x + b) permutation per signature slot, keeping the high 32 bits."""
+
+    def __init__(self, num_perm=128, shingle_size=5, seed=1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.a = rng.integers(1, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self.b = rng.integers(0, np.iinfo(np.uint64).max, size=num_perm, dtype=np.uint64)
+
+    def signatures(self, texts):
+        """Signatures (len(texts) x num_perm uint32) and a mask of texts that had any words."""
+        shingles = [shingle_hashes(text, self.shingle_size) for text in texts]
+        result = np.full((len(texts), self.num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+        has_words = np.array([len(values) > 0 for values in shingles], dtype=bool)
+
+        start = 0
+        while start < len(texts):
+            # Pack documents into a chunk until it holds CHUNK_SHINGLES shingles
+            end, total = start, 0
+            while end < len(texts) and (end == start or total + len(shingles[end]) <= CHUNK_SHINGLES):
+                total += len(shingles[end])
+                end += 1
+            self._sign_chunk(shingles, start, end, result)
+            start = end
+        return result, has_words
+
+    def _sign_chunk(self, shingles, start, end, result):
+        rows = [index for index in range(start, end) if len(shingles[index])]
+        if not rows:
+            return
+        values = np.concatenate([shingles[index] for index in rows])
+        offsets = np.cumsum([0] + [len(shingles[index]) for index in rows[:-1]])
+        permuted = (self.a[:, None] * values[None, :] + self.b[:, None]) >> np.uint64(32)
+        # Minimum of each document's span of columns, for every permutation at once
+        result[rows] = np.minimum.reduceat(permuted, offsets, axis=1).T.astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    def __init__(self, config):
+        """Load the signatures of already indexed documents from config['index_file'] (empty if missing)."""
+        self.config = config
+        self.path = config['index_file']
+        self.hasher = MinHasher(config['num_perm'], config['shingle_size'], config['seed'])
+        self.rows_per_band = config['num_perm'] // config['bands']
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        # Parallel lists by position; ids[position] is None once a document is re-added elsewhere
+        self.ids = []
+        self.clusters = []
+        self.signatures = []
+        self.text_hashes = []
+        self.positions = {}
+        self.by_text_hash = {}
+        self.buckets = {}
+
+    def _params(self):
+        return np.array([self.config['num_perm'], self.config['bands'], self.config['shingle_size'], self.config['seed']])
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                if not np.array_equal(data['params'], self._params()):
+                    print(f"⚠️  {self.path} was built with other DEDUP_* settings; run `python dedup.py` to rebuild it")
+                    return
+                for doc_id, cluster, text_hash, signature in zip(
+                    data['ids'].tolist(), data['clusters'].tolist(), data['text_hashes'].tolist(), data['signatures']
+                ):
+                    self._add(doc_id, cluster, text_hash, signature)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️  Ignoring unreadable dedup index {self.path}: {e}")
+
+    def save(self):
+        """Persist the signatures atomically, dropping replaced entries."""
+        if not self.path:
+            return
+        live = [position for position, doc_id in enumerate(self.ids) if doc_id is not None]
+        signatures = (np.stack([self.signatures[position] for position in live]) if live
+                      else np.empty((0, self.config['num_perm']), dtype=np.uint32))
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'wb') as f:
+            np.savez_compressed(
+                f,
+                params=self._params(),
+                ids=np.array([self.ids[position] for position in live], dtype=str),
+                clusters=np.array([self.clusters[position] for position in live], dtype=str),
+                text_hashes=np.array([self.text_hashes[position] for position in live], dtype=str),
+                signatures=signatures
+            )
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        """Forget every signature (e.g. after the index was emptied)."""
+        self._reset()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _band_keys(self, signature):
+        step = self.rows_per_band
+        return [(band, signature[band * step:(band + 1) * step].tobytes()) for band in range(self.config['bands'])]
+
+    def _add(self, doc_id, cluster, text_hash, signature):
+        previous = self.positions.get(doc_id)
+        if previous is not None:
+            self.ids[previous] = None
+        position = len(self.ids)
+        self.ids.append(doc_id)
+        self.clusters.append(cluster)
+        self.signatures.append(signature)
+        self.text_hashes.append(text_hash)
+        self.positions[doc_id] = position
+        # Documents without words have no text hash and are never matched
+        if not text_hash:
+            return
+        if not self._live(self.by_text_hash.get(text_hash), None):
+            self.by_text_hash[text_hash] = position
+        for key in self._band_keys(signature):
+            self.buckets.setdefault(key, []).append(position)
+
+    def _live(self, position, doc_id):
+        return position is not None and self.ids[position] not in (None, doc_id)
+
+    def _most_similar(self, doc_id, signature):
+        """Position and estimated Jaccard similarity of the closest live document sharing an LSH band."""
+        candidates = {
+            position
+            for key in self._band_keys(signature)
+            for position in self.buckets.get(key, ())
+            if self._live(position, doc_id)
+        }
+        if not candidates:
+            return None, 0.0
+        candidates = sorted(candidates)
+        similarity = (np.stack([self.signatures[position] for position in candidates]) == signature).mean(axis=1)
+        best = int(np.argmax(similarity))
+        return candidates[best], float(similarity[best])
+
+    def assign(self, documents):
+        """Set dup_cluster on each (doc_id, doc) in order; returns (documents to index, exact duplicates skipped).
+
+        Exact duplicates (same normalised title and content as another
+        document) are dropped when skip_exact is set, otherwise clustered.
+        """
+        texts = [dedup_text(doc) for _, doc in documents]
+        signatures, has_words = self.hasher.signatures(texts)
+
+        kept = []
+        skipped = 0
+        for (doc_id, doc), text, signature, words in zip(documents, texts, signatures, has_words):
+            normalised = ' '.join(TOKEN_PATTERN.findall(text.lower()))
+            text_hash = hashlib.sha1(normalised.encode('utf-8')).hexdigest() if words else ''
+
+            exact = self.by_text_hash.get(text_hash) if text_hash else None
+            if self._live(exact, doc_id):
+                if self.config['skip_exact']:
+                    skipped += 1
+                    continue
+                cluster = self.clusters[exact]
+            elif words:
+                position, similarity = self._most_similar(doc_id, signature)
+                cluster = self.clusters[position] if similarity >= self.config['threshold'] else doc_id
+            else:
+                # Nothing to compare on; every empty document is its own cluster
+                cluster = doc_id
+
+            doc[DUP_CLUSTER_FIELD] = cluster
+            self._add(doc_id, cluster, text_hash, signature)
+            kept.append((doc_id, doc))
+        return kept, skipped
+
+    def cluster_count(self):
+        return len({cluster for cluster, doc_id in zip(self.clusters, self.ids) if doc_id is not None})
+
+
+def _create_elasticsearch_client():
+    """Create Elasticsearch client from the same environment variables as the other scripts."""
+    from elasticsearch import Elasticsearch
+
+    connection_params = {}
+
+    if os.getenv('ELASTIC_CLOUD_ID'):
+        connection_params['cloud_id'] = os.getenv('ELASTIC_CLOUD_ID')
+    else:
+        connection_params['hosts'] = [
+            f"{os.getenv('ELASTIC_SCHEME', 'http')}://{os.getenv('ELASTIC_HOST', 'localhost')}:{os.getenv('ELASTIC_PORT', '9200')}"
+        ]
+
+    if os.getenv('ELASTIC_API_KEY'):
+        connection_params['api_key'] = os.getenv('ELASTIC_API_KEY')
+    elif os.getenv('ELASTIC_USERNAME') and os.getenv('ELASTIC_PASSWORD'):
+        connection_params['basic_auth'] = (os.getenv('ELASTIC_USERNAME'), os.getenv('ELASTIC_PASSWORD'))
+
+    if os.getenv('ELASTIC_USE_SSL', 'false').lower() == 'true':
+        connection_params['verify_certs'] = os.getenv('ELASTIC_VERIFY_CERTS', 'false').lower() == 'true'
+        if os.getenv('ELASTIC_CA_CERTS'):
+            connection_params['ca_certs'] = os.getenv('ELASTIC_CA_CERTS')
+
+    connection_params['request_timeout'] = 30
+
+    return Elasticsearch(**connection_params)
+
+
+def main():
+    """Rebuild the signature file from the index and backfill dup_cluster where it changed."""
+    from elasticsearch.helpers import scan, streaming_bulk
+
+    print("Enterprise Search - Near-Duplicate Index Rebuild")
+    print("=" * 50)
+
+    config = load_dedup_config()
+    es = _create_elasticsearch_client()
+    index_name = os.getenv('ELASTIC_INDEX', 'enterprise_documents')
+
+    # Oldest documents first, so each cluster is named after its original
+    hits = scan(
+        es, index=index_name, preserve_order=True, size=REBUILD_BATCH_SIZE,
+        query={"query": {"match_all": {}}, "sort": [{"timestamp": {"order": "asc", "missing": "_last"}}]},
+        _source=['title', 'content', DUP_CLUSTER_FIELD]
+    )
+
+    index = NearDuplicateIndex({**config, 'index_file': None, 'skip_exact': False})
+    totals = {'documents': 0, 'updated': 0, 'failed': 0}
+
+    def flush(batch):
+        # assign() is incremental, so only one batch of shingles and signatures is built at a time
+        previous = [doc.get(DUP_CLUSTER_FIELD) for _, doc in batch]
+        index.assign(batch)
+        updates = [
+            {'_op_type': 'update', '_index': index_name, '_id': doc_id, 'doc': {DUP_CLUSTER_FIELD: doc[DUP_CLUSTER_FIELD]}}
+            for (doc_id, doc), cluster in zip(batch, previous) if cluster != doc[DUP_CLUSTER_FIELD]
+        ]
+        for ok, _ in streaming_bulk(es, updates, chunk_size=500, raise_on_error=False):
+            totals['updated' if ok else 'failed'] += 1
+        totals['documents'] += len(batch)
+        print(f"   Processed {totals['documents']} documents, updated {totals['updated']}")
+
+    batch = []
+    for hit in hits:
+        batch.append((hit['_id'], hit['_source']))
+        if len(batch) >= REBUILD_BATCH_SIZE:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    index.path = config['index_file']
+    index.save()
+
+    print(f"✅ {totals['documents']} documents in {index.cluster_count()} clusters; "
+          f"updated dup_cluster on {totals['updated']}")
+    if totals['failed']:
+        print(f"❌ Failed to update {totals['failed']} documents")
+    print(f"📁 Signatures: {index.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Client-Side Embedders for Enterprise Search
+Produces document vectors for the quantised dense_vector mode (VECTOR_ENABLED),
+as an alternative to semantic_text fields that rely on inference hosted in
+Elasticsearch.
+
+Embedders are pluggable: EMBEDDER selects a built-in implementation ("hashing"
+or "openai") or names any class as "module:ClassName". The API embeds queries
+with the same class (api/services/embedder.py), so a custom embedder follows
+one contract on both sides: the constructor takes the dimensions plus the
+keyword options from embedder_options() and embed(texts) synchronously returns
+one vector per text.
+"""
+
+import abc
+import hashlib
+import importlib
+import math
+import os
+import re
+
+import httpx
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+# Bigrams add a little word-order signal to the hashed bag of words
+BIGRAM_WEIGHT = 0.5
+
+
+def load_embedder_config():
+    """Load embedder and dense_vector configuration from environment variables."""
+    return {
+        'vector_enabled': os.getenv('VECTOR_ENABLED', 'false').lower() == 'true',
+        'vector_field': os.getenv('VECTOR_FIELD', 'content_vector'),
+        'dimensions': int(os.getenv('VECTOR_DIMS', '384')),
+        'embedder': os.getenv('EMBEDDER', 'hashing'),
+        'model': os.getenv('EMBEDDER_MODEL', 'text-embedding-3-small'),
+        'endpoint': os.getenv('EMBEDDER_ENDPOINT', 'https://api.openai.com/v1/embeddings'),
+        'api_key': os.getenv('EMBEDDER_API_KEY') or os.getenv('OPENAI_API_KEY', ''),
+        'batch_size': int(os.getenv('EMBEDDER_BATCH_SIZE', '64')),
+        'max_chars': int(os.getenv('EMBEDDER_MAX_CHARS', '2000')),
+        'hashing_seed': os.getenv('EMBEDDER_HASHING_SEED', '0')
+    }
+
+
+def embedding_text(doc, max_chars=2000):
+    """The text a document's vector is computed from: title, summary, then content."""
+    parts = [doc.get('title', ''), doc.get('summary', ''), doc.get('content', '')]
+    return '\n'.join(part for part in parts if part)[:max_chars]
+
+
+def embedder_options(config):
+    """Keyword options every embedder constructor receives after the dimensions (same names as the API's)."""
+    return {
+        'model': config['model'],
+        'endpoint': config['endpoint'],
+        'api_key': config['api_key'],
+        'seed': config['hashing_seed']
+    }
+
+
+class Embedder(abc.ABC):
+    """Turns texts into fixed-size vectors; subclasses implement embed().
+
+    Constructors take the dimensions and keyword options (see embedder_options)
+    and ignore options they don't use.
+    """
+
+    def __init__(self, dimensions, **options):
+        self.dimensions = dimensions
+
+    @abc.abstractmethod
+    def embed(self, texts):
+        """Return one vector (a list of floats) per text."""
+
+
+class HashingEmbedder(Embedder):
+    """Deterministic feature-hashing embedder for offline tests and benchmarks.
+
+    Needs no model or network and gives identical vectors on every machine.
+    Retrieval quality is lexical rather than semantic, so use it for recall and
+    latency benchmarks, not relevance tuning.
+    """
+
+    def __init__(self, dimensions, seed='0', **options):
+        super().__init__(dimensions)
+        self.seed = seed
+
+    def embed(self, texts):
+        return [hashing_vector(text, self.dimensions, self.seed) for text in texts]
+
+
+class OpenAIEmbedder(Embedder):
+    """Embeddings from an OpenAI-compatible /v1/embeddings endpoint."""
+
+    def __init__(self, dimensions, model='', endpoint='', api_key='', **options):
+        super().__init__(dimensions)
+        self.model = model
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.client = httpx.Client(timeout=60)
+
+    def embed(self, texts):
+        response = self.client.post(
+            self.endpoint,
+            headers={"Authorization": f"Bearer {self.api_key}"},
+            json={"model": self.model, "input": texts, "dimensions": self.dimensions}
+        )
+        response.raise_for_status()
+        data = sorted(response.json()['data'], key=lambda item: item['index'])
+        return [item['embedding'] for item in data]
+
+
+EMBEDDERS = {
+    'hashing': HashingEmbedder,
+    'openai': OpenAIEmbedder
+}
+
+
+def hashing_vector(text, dimensions, seed='0'):
+    """Signed feature hashing of unigrams and bigrams, L2-normalised.
+
+    Must stay identical to the API's hashing_vector so query and document
+    vectors land in the same space (test_embedders.py compares them).
+    """
+    vector = [0.0] * dimensions
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    features = [(token, 1.0) for token in tokens]
+    features += [(f"{first} {second}", BIGRAM_WEIGHT) for first, second in zip(tokens, tokens[1:])]
+
+    for feature, weight in features:
+        digest = hashlib.blake2b(f"{seed}:{feature}".encode('utf-8'), digest_size=8).digest()
+        value = int.from_bytes(digest, 'little')
+        vector[value % dimensions] += weight if (value >> 63) & 1 else -weight
+
+    norm = math.sqrt(sum(component * component for component in vector))
+    if norm == 0:
+        # cosine similarity rejects zero vectors; give empty texts a fixed unit vector
+        vector[0] = 1.0
+        return vector
+    return [component / norm for component in vector]
+
+
+def load_embedder(config):
+    """Create the embedder named by config['embedder'] (a built-in name or "module:ClassName")."""
+    name = config['embedder']
+    if name in EMBEDDERS:
+        cls = EMBEDDERS[name]
+    else:
+        module_name, _, class_name = name.partition(':')
+        if not class_name:
+            raise ValueError(f"Unknown embedder '{name}'; use one of {', '.join(EMBEDDERS)} or module:ClassName")
+        cls = getattr(importlib.import_module(module_name), class_name)
+    return cls(config['dimensions'], **embedder_options(config))
+
+
+def embed_documents(embedder, documents, config):
+    """Add config['vector_field'] to each document in place, embedding in batches."""
+    batch_size = max(1, config['batch_size'])
+    for start in range(0, len(documents), batch_size):
+        batch = documents[start:start + batch_size]
+        vectors = embedder.embed([embedding_text(doc, config['max_chars']) for doc in batch])
+        for doc, vector in zip(batch, vectors):
+            doc[config['vector_field']] = vector
+    return len(documents)
+
+
+def vector_dims_problem(properties, config):
+    """Describe a mismatch between VECTOR_DIMS and the index's vector field, or return None."""
+    field = properties.get(config['vector_field'])
+    if field is None:
+        return f"Index mapping has no '{config['vector_field']}' field. Run setup_elastic.py with VECTOR_ENABLED=true."
+    if field.get('dims') != config['dimensions']:
+        return (f"VECTOR_DIMS is {config['dimensions']} but '{config['vector_field']}' is mapped with "
+                f"{field.get('dims')} dims. Use the dimensions the index was created with, or reindex.")
+    return None
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Document Enrichment for Enterprise Search
+Generates a compact abstract and key facts for each document with an LLM so the
+API can build summary prompts from them instead of raw content.
+Enrichment is keyed by a hash of the document text, so unchanged documents are
+never sent to the LLM twice.
+
+Usable as a library from gen_test_data.py (or any loader) and as a script that
+enriches documents already in the index.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+from dotenv import load_dotenv
+from elasticsearch import Elasticsearch
+from elasticsearch.helpers import bulk, scan
+
+# Load environment variables
+load_dotenv()
+
+HASHED_FIELDS = ('title', 'summary', 'content')
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+SYSTEM_PROMPT = """You condense enterprise documents (Confluence pages, Jira tickets, SharePoint files) for a search system.
+Respond with JSON only, in the form {"abstract": "...", "key_facts": ["...", "..."]}.
+- abstract: 2-3 sentences stating what the document is about and its outcome or status
+- key_facts: 3-5 short, self-contained facts (decisions, owners, dates, systems, figures)
+Do not invent details that are not in the document."""
+
+
+def load_enrichment_config():
+    """Load enrichment configuration from environment variables."""
+    return {
+        'enabled': os.getenv('ENRICH_ENABLED', 'false').lower() == 'true',
+        'api_key': os.getenv('OPENAI_API_KEY', ''),
+        'endpoint': os.getenv('OPENAI_ENDPOINT', 'https://api.openai.com/v1/chat/completions'),
+        'model': os.getenv('ENRICH_MODEL', os.getenv('OPENAI_MODEL', 'gpt-3.5-turbo')),
+        'concurrency': int(os.getenv('ENRICH_CONCURRENCY', '4')),
+        'max_content_chars': int(os.getenv('ENRICH_MAX_CONTENT_CHARS', '6000')),
+        'max_retries': int(os.getenv('ENRICH_MAX_RETRIES', '3')),
+        'cache_file': os.getenv('ENRICH_CACHE_FILE', '.enrichment_cache.json')
+    }
+
+
+def content_hash(doc):
+    """Stable hash of the fields the abstract is derived from."""
+    payload = json.dumps([doc.get(field, '') for field in HASHED_FIELDS], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class DocumentEnricher:
+    def __init__(self, config):
+        """Initialize the enricher with LLM settings and the local hash cache."""
+        self.config = config
+        self.client = httpx.Client(timeout=60)
+        self.cache = self._load_cache()
+        # Pipelines call enrich_documents from several threads at once
+        self._cache_lock = threading.Lock()
+
+    def _load_cache(self):
+        """Load previously generated enrichments keyed by content hash."""
+        cache_file = self.config['cache_file']
+        if not cache_file or not os.path.exists(cache_file):
+            return {}
+        try:
+            with open(cache_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable enrichment cache {cache_file}: {e}")
+            return {}
+
+    def save_cache(self):
+        """Persist the enrichment cache atomically so later runs skip unchanged documents."""
+        cache_file = self.config['cache_file']
+        if not cache_file:
+            return
+        temporary = f"{cache_file}.tmp"
+        with self._cache_lock:
+            with open(temporary, 'w') as f:
+                json.dump(self.cache, f)
+            os.replace(temporary, cache_file)
+
+    def enrich_documents(self, documents):
+        """Add abstract, key_facts and abstract_hash to documents in place.
+
+        Documents whose hash matches their stored abstract_hash are skipped, and
+        hashes already in the cache are filled without calling the LLM.
+        Returns a dict with generated, cached, skipped and failed counts.
+        """
+        stats = {'generated': 0, 'cached': 0, 'skipped': 0, 'failed': 0}
+        pending = {}
+
+        for doc in documents:
+            doc_hash = content_hash(doc)
+            cached = self.cache.get(doc_hash)
+            if doc.get('abstract_hash') == doc_hash and doc.get('abstract'):
+                stats['skipped'] += 1
+            elif cached is not None:
+                self._apply(doc, doc_hash, cached)
+                stats['cached'] += 1
+            else:
+                # Identical documents share one LLM call
+                pending.setdefault(doc_hash, []).append(doc)
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=self.config['concurrency']) as executor:
+                hashes = list(pending)
+                representatives = [pending[doc_hash][0] for doc_hash in hashes]
+                for doc_hash, enrichment in zip(hashes, executor.map(self._generate, representatives)):
+                    if enrichment is None:
+                        stats['failed'] += len(pending[doc_hash])
+                        continue
+                    with self._cache_lock:
+                        self.cache[doc_hash] = enrichment
+                    for doc in pending[doc_hash]:
+                        self._apply(doc, doc_hash, enrichment)
+                    stats['generated'] += len(pending[doc_hash])
+            self.save_cache()
+
+        return stats
+
+    def _apply(self, doc, doc_hash, enrichment):
+        doc['abstract'] = enrichment['abstract']
+        doc['key_facts'] = enrichment['key_facts']
+        doc['abstract_hash'] = doc_hash
+
+    def _generate(self, doc):
+        """Ask the LLM for an abstract and key facts; returns None on failure."""
+        content = (doc.get('content') or '')[:self.config['max_content_chars']]
+        user_prompt = f"Title: {doc.get('title', '')}\nSummary: {doc.get('summary', '')}\n\nContent:\n{content}"
+        payload = {
+            "model": self.config['model'],
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt}
+            ],
+            "max_tokens": 300,
+            "temperature": 0.2
+        }
+        headers = {
+            "Authorization": f"Bearer {self.config['api_key']}",
+            "Content-Type": "application/json"
+        }
+
+        for attempt in range(self.config['max_retries'] + 1):
+            try:
+                response = self.client.post(self.config['endpoint'], headers=headers, json=payload)
+            except httpx.HTTPError as e:
+                print(f"⚠️  Enrichment request failed for '{doc.get('title', '')}': {e}")
+                response = None
+
+            if response is not None and response.status_code not in RETRYABLE_STATUS_CODES:
+                if response.is_error:
+                    print(f"❌ Enrichment failed for '{doc.get('title', '')}': HTTP {response.status_code}")
+                    return None
+                return self._parse(response.json()['choices'][0]['message']['content'])
+
+            if attempt < self.config['max_retries']:
+                retry_after = response.headers.get('retry-after') if response is not None else None
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** attempt
+                time.sleep(delay)
+
+        print(f"❌ Enrichment gave up on '{doc.get('title', '')}' after {self.config['max_retries']} retries")
+        return None
+
+    def _parse(self, text):
+        """Parse the model's JSON reply, tolerating code fences and plain text."""
+        cleaned = text.strip()
+        if cleaned.startswith('```'):
+            cleaned = cleaned.strip('`')
+            if cleaned.startswith('json'):
+                cleaned = cleaned[4:]
+        try:
+            data = json.loads(cleaned)
+            abstract = str(data.get('abstract', '')).strip()
+            key_facts = [str(fact).strip() for fact in data.get('key_facts', []) if str(fact).strip()]
+        except (ValueError, AttributeError):
+            abstract, key_facts = text.strip(), []
+        return {'abstract': abstract, 'key_facts': key_facts[:5]}
+
+
+def _create_elasticsearch_client():
+    """Create Elasticsearch client from the same environment variables as the other scripts."""
+    connection_params = {}
+
+    if os.getenv('ELASTIC_CLOUD_ID'):
+        connection_params['cloud_id'] = os.getenv('ELASTIC_CLOUD_ID')
+    else:
+        connection_params['hosts'] = [
+            f"{os.getenv('ELASTIC_SCHEME', 'http')}://{os.getenv('ELASTIC_HOST', 'localhost')}:{os.getenv('ELASTIC_PORT', '9200')}"
+        ]
+
+    if os.getenv('ELASTIC_API_KEY'):
+        connection_params['api_key'] = os.getenv('ELASTIC_API_KEY')
+    elif os.getenv('ELASTIC_USERNAME') and os.getenv('ELASTIC_PASSWORD'):
+        connection_params['basic_auth'] = (os.getenv('ELASTIC_USERNAME'), os.getenv('ELASTIC_PASSWORD'))
+
+    if os.getenv('ELASTIC_USE_SSL', 'false').lower() == 'true':
+        connection_params['verify_certs'] = os.getenv('ELASTIC_VERIFY_CERTS', 'false').lower() == 'true'
+        if os.getenv('ELASTIC_CA_CERTS'):
+            connection_params['ca_certs'] = os.getenv('ELASTIC_CA_CERTS')
+
+    connection_params['request_timeout'] = 30
+
+    return Elasticsearch(**connection_params)
+
+
+def main():
+    """Enrich every document in the index whose content changed since its last abstract."""
+    print("🧾 Enterprise Search Document Enrichment")
+    print("=" * 45)
+
+    config = load_enrichment_config()
+    if not config['api_key']:
+        print("❌ OPENAI_API_KEY must be set to generate abstracts")
+        return
+
+    index_name = os.getenv('ELASTIC_INDEX', 'enterprise_documents')
+    es = _create_elasticsearch_client()
+    enricher = DocumentEnricher(config)
+    totals = {'generated': 0, 'cached': 0, 'skipped': 0, 'failed': 0}
+    batch = []
+
+    def flush(batch):
+        stats = enricher.enrich_documents([source for _, source in batch])
+        for key, value in stats.items():
+            totals[key] += value
+        actions = [
+            {
+                "_op_type": "update",
+                "_index": index_name,
+                "_id": doc_id,
+                "doc": {
+                    "abstract": source['abstract'],
+                    "key_facts": source['key_facts'],
+                    "abstract_hash": source['abstract_hash']
+                }
+            }
+            for doc_id, source in batch
+            # Only write documents that gained or changed an abstract
+            if source.get('abstract_hash') and source.get('_original_hash') != source['abstract_hash']
+        ]
+        if actions:
+            bulk(es, actions, chunk_size=100)
+        print(f"   Processed {sum(totals.values())} documents")
+
+    try:
+        for hit in scan(es, index=index_name, _source=list(HASHED_FIELDS) + ['abstract', 'abstract_hash'], size=200):
+            source = hit['_source']
+            source['_original_hash'] = source.get('abstract_hash')
+            batch.append((hit['_id'], source))
+            if len(batch) >= 100:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    except KeyboardInterrupt:
+        print("\n\n⏹️  Operation cancelled by user")
+    finally:
+        enricher.save_cache()
+
+    print(f"\n✅ Generated: {totals['generated']}, from cache: {totals['cached']}, "
+          f"unchanged: {totals['skipped']}, failed: {totals['failed']}")
+
+
+if __name__ == "__main__":
+    main()
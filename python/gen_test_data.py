@@ -12,8 +12,21 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 from elasticsearch import Elasticsearch
 from faker import Faker
-import uuid
 from dotenv import load_dotenv
+from passages import split_into_passages
+from enrichment import DocumentEnricher, load_enrichment_config
+from embedders import embed_documents, load_embedder, load_embedder_config, vector_dims_problem
+from percolate import SavedSearchPercolator
+from ingest_manifest import IngestManifest, bulk_upsert_actions
+from dedup import DUP_CLUSTER_FIELD, NearDuplicateIndex, load_dedup_config
+from semantic_fields import add_client_semantic_fields, semantic_field_names, semantic_query_fields, validate_mode
+from corpus_data import (
+    DEPARTMENTS, EMPLOYEES, ENTERPRISE_TOPICS, USER_IDS, RATING_QUERIES,
+    CONFLUENCE_DOC_TYPES, CONFLUENCE_SPACES, CONFLUENCE_PROJECTS, CONFLUENCE_CONTENT_TEMPLATES, CONFLUENCE_TAG_LEVELS,
+    JIRA_TICKET_TYPES, JIRA_PRIORITIES, JIRA_STATUSES, JIRA_PROJECT_KEYS, JIRA_PROJECTS, JIRA_TITLE_TEMPLATES,
+    SHAREPOINT_DOC_TYPES, SHAREPOINT_SITES, SHAREPOINT_EXTENSIONS, SHAREPOINT_CONTENT_TEMPLATES,
+    TEST_QUERIES, NEUTRAL_RATING_RANK, rating_rank
+)
 
 # Load environment variables
 load_dotenv()
@@ -21,6 +34,7 @@ load_dotenv()
 # Initialize Faker for generating realistic data
 fake = Faker()
 
+
 class TestDataGenerator:
     def __init__(self):
         """Initialize the test data generator."""
@@ -29,39 +43,12 @@ class TestDataGenerator:
         self.index_name = self.config['index']
         
         # Enterprise data definitions
-        self.departments = [
-            'Digital Banking', 'Consumer Banking', 'Institutional Banking',
-            'Technology & Operations', 'Risk Management', 'Human Resources',
-            'Corporate Banking', 'Investment Banking', 'Compliance',
-            'Marketing', 'Finance', 'Legal', 'Audit', 'Information Security',
-            'Business Intelligence', 'Operations', 'Engineering'
-        ]
-        
-        self.employees = [
-            'Sarah Chen', 'Michael Wong', 'Jennifer Park', 'Alex Kumar',
-            'Emma Thompson', 'David Lim', 'Rachel Tan', 'James Liu',
-            'Lisa Zhang', 'Robert Singh', 'Maria Garcia', 'Kevin Ng',
-            'Priya Sharma', 'Daniel Ho', 'Sophie Lee', 'Ryan Tay',
-            'Jennifer Tan', 'David Wong', 'Lisa Kumar', 'Alex Thompson',
-            'Mike Rodriguez'
-        ]
-        
-        self.enterprise_topics = [
-            'digital transformation', 'customer experience', 'risk assessment',
-            'regulatory compliance', 'mobile applications', 'cybersecurity',
-            'data analytics', 'artificial intelligence', 'blockchain',
-            'payment systems', 'cloud migration', 'API integration',
-            'fraud detection', 'customer onboarding', 'process automation',
-            'business intelligence', 'data governance', 'system architecture',
-            'database migration', 'security incident response', 'marketing analytics',
-            'integration platform', 'microservices', 'container orchestration'
-        ]
-
+        self.departments = DEPARTMENTS
+        self.employees = EMPLOYEES
+        self.enterprise_topics = ENTERPRISE_TOPICS
+        
         # User IDs that match the frontend users
-        self.user_ids = [
-            'sarah_chen', 'mike_rodriguez', 'jennifer_tan', 'david_wong',
-            'lisa_kumar', 'alex_thompson'
-        ]
+        self.user_ids = USER_IDS
 
     def _load_config(self):
         """Load configuration from environment variables."""
@@ -85,7 +72,20 @@ class TestDataGenerator:
             'debug': os.getenv('DEBUG', 'false').lower() == 'true',
             # Semantic search configuration
             'semantic_enabled': os.getenv('SEMANTIC_ENABLED', 'true').lower() == 'true',
-            'semantic_field_prefix': os.getenv('SEMANTIC_FIELD_PREFIX', 'semantic_')
+            'semantic_field_prefix': os.getenv('SEMANTIC_FIELD_PREFIX', 'semantic_'),
+            'semantic_field_mode': validate_mode(os.getenv('SEMANTIC_FIELD_MODE', 'client')),
+            # Passage indexing configuration
+            'passages_enabled': os.getenv('PASSAGES_ENABLED', 'true').lower() == 'true',
+            'passage_max_chars': int(os.getenv('PASSAGE_MAX_CHARS', '600')),
+            'passage_overlap_chars': int(os.getenv('PASSAGE_OVERLAP_CHARS', '100')),
+            # Ingest-time enrichment (abstract and key facts per document)
+            'enrich_enabled': os.getenv('ENRICH_ENABLED', 'false').lower() == 'true',
+            # Incremental re-ingestion (content hashes of documents already indexed)
+            'ingest_manifest_file': os.getenv('INGEST_MANIFEST_FILE', '.ingest_manifest.json'),
+            # Saved-search alerting (percolate new documents after insert)
+            'percolator_enabled': os.getenv('PERCOLATOR_ENABLED', 'true').lower() == 'true',
+            'percolator_index': os.getenv('PERCOLATOR_INDEX', f"{os.getenv('ELASTIC_INDEX', 'enterprise_documents')}_saved_searches"),
+            'alerts_index': os.getenv('ALERTS_INDEX', f"{os.getenv('ELASTIC_INDEX', 'enterprise_documents')}_search_alerts")
         }
         
         if config['debug']:
@@ -125,21 +125,31 @@ class TestDataGenerator:
         return Elasticsearch(**connection_params)
 
     def add_semantic_fields(self, doc):
-        """Add semantic_text fields to a document if semantic search is enabled."""
+        """Add semantic_text fields to a document if semantic search is enabled.
+
+        Only needed in the client field mode; with copy_to or combined the index
+        fills the semantic fields from title, content and summary.
+        """
         if not self.config['semantic_enabled']:
             return doc
-            
-        prefix = self.config['semantic_field_prefix']
         
-        # Add semantic fields that mirror the regular text fields
-        semantic_doc = doc.copy()
-        semantic_doc.update({
-            f"{prefix}title": doc.get('title', ''),
-            f"{prefix}content": doc.get('content', ''),
-            f"{prefix}summary": doc.get('summary', '')
-        })
+        return add_client_semantic_fields(
+            doc.copy(), self.config['semantic_field_prefix'], self.config['semantic_field_mode']
+        )
+
+    def add_passages(self, doc):
+        """Add nested passage chunks of the content if passage indexing is enabled."""
+        if not self.config['passages_enabled']:
+            return doc
+        
+        passage_doc = doc.copy()
+        passage_doc['passages'] = split_into_passages(
+            doc.get('content', ''),
+            max_chars=self.config['passage_max_chars'],
+            overlap_chars=self.config['passage_overlap_chars']
+        )
         
-        return semantic_doc
+        return passage_doc
 
     def validate_prerequisites(self):
         """Validate that Elasticsearch is ready and properly set up."""
@@ -153,21 +163,38 @@ class TestDataGenerator:
                 return False, f"Index '{self.index_name}' does not exist. Run elasticsearch_setup.py first."
             
             # Verify mapping has required fields
+            # Keyed by the concrete index behind the alias
             mapping = self.es.indices.get_mapping(index=self.index_name)
-            properties = mapping[self.index_name]['mappings']['properties']
+            properties = next(iter(mapping.body.values()))['mappings']['properties']
             required_fields = ['title', 'content', 'source', 'author', 'department', 'ratings', 'user_ratings']
             
             # Add semantic fields to validation if enabled
             if self.config['semantic_enabled']:
-                prefix = self.config['semantic_field_prefix']
-                semantic_required = [f"{prefix}title", f"{prefix}content", f"{prefix}summary"]
-                required_fields.extend(semantic_required)
+                semantic_required = semantic_field_names(
+                    self.config['semantic_field_prefix'], self.config['semantic_field_mode']
+                ).values()
+                required_fields.extend(dict.fromkeys(semantic_required))
+            
+            embedder_config = load_embedder_config()
+            if embedder_config['vector_enabled']:
+                required_fields.append(embedder_config['vector_field'])
+            
+            if self.config['passages_enabled']:
+                required_fields.append('passages')
+            
+            if load_dedup_config()['enabled']:
+                required_fields.append(DUP_CLUSTER_FIELD)
             
             missing_fields = [field for field in required_fields if field not in properties]
             
             if missing_fields:
                 return False, f"Index mapping is missing required fields: {missing_fields}. Run elasticsearch_setup.py to create proper mappings."
             
+            if embedder_config['vector_enabled']:
+                problem = vector_dims_problem(properties, embedder_config)
+                if problem:
+                    return False, problem
+            
             # Get current document count
             doc_count = self.es.count(index=self.index_name)['count']
             
@@ -178,8 +205,10 @@ class TestDataGenerator:
 
     def generate_ratings_data(self):
         """Generate realistic ratings data for a document."""
+        # Unrated documents still get a neutral rank so boosting treats them consistently
+        neutral = {"ratings": {"rank": NEUTRAL_RATING_RANK}}
         if not self.config['create_ratings'] or random.random() > 0.4:
-            return None
+            return neutral
         
         user_ratings = []
         num_ratings = random.randint(1, 5)
@@ -194,14 +223,11 @@ class TestDataGenerator:
                 "user_id": user_id,
                 "rating": rating_value,
                 "timestamp": fake.date_time_between(start_date='-3m', end_date='now').isoformat(),
-                "query": random.choice([
-                    "payment processing", "API integration", "security issues",
-                    "database migration", "customer data", "compliance documents"
-                ])
+                "query": random.choice(RATING_QUERIES)
             })
         
         if not user_ratings:
-            return None
+            return neutral
         
         positive_count = sum(1 for ur in user_ratings if ur['rating'] > 0)
         negative_count = sum(1 for ur in user_ratings if ur['rating'] < 0)
@@ -217,6 +243,7 @@ class TestDataGenerator:
                 "negative_count": negative_count,
                 "total_ratings": total_ratings,
                 "score": round(score, 2),
+                "rank": rating_rank(score),
                 "last_updated": max(ur['timestamp'] for ur in user_ratings)
             },
             "user_ratings": user_ratings
@@ -224,40 +251,19 @@ class TestDataGenerator:
 
     def generate_confluence_document(self):
         """Generate a realistic Confluence document."""
-        doc_types = [
-            'Requirements Document', 'Technical Specification', 'User Guide',
-            'Project Plan', 'Meeting Notes', 'Knowledge Base Article',
-            'Process Documentation', 'Architecture Overview', 'FAQ',
-            'Design Document', 'Implementation Guide', 'Best Practices'
-        ]
-        
-        spaces = ['TECH', 'PROD', 'HR', 'RISK', 'COMP', 'MKT', 'FIN', 'LEGAL', 'ENG', 'OPS', 'SEC', 'BI']
-        
-        doc_type = random.choice(doc_types)
-        space = random.choice(spaces)
+        doc_type = random.choice(CONFLUENCE_DOC_TYPES)
+        space = random.choice(CONFLUENCE_SPACES)
         topic = random.choice(self.enterprise_topics)
         author = random.choice(self.employees)
         department = random.choice(self.departments)
         
-        content_templates = [
-            f"This document outlines the {topic} implementation for our enterprise platform. "
-            f"The solution addresses customer needs for secure and efficient {topic} processing. "
-            f"Key components include authentication, validation, and real-time processing capabilities. "
-            f"Integration with core systems ensures seamless data flow and operational integrity.",
-            
-            f"Comprehensive guide to {topic} processes within enterprise operations. "
-            f"This documentation covers standard procedures, best practices, and compliance requirements. "
-            f"Includes step-by-step instructions and troubleshooting guidelines. "
-            f"Regular updates ensure alignment with evolving business needs."
-        ]
-        
-        content = random.choice(content_templates)
+        content = random.choice(CONFLUENCE_CONTENT_TEMPLATES).format(topic=topic)
         content += f" Last updated by {author} from {department} department. "
         content += f"Document status: {'Final' if random.random() > 0.3 else 'Draft'}. "
         
         tags = [topic.replace(' ', '_'), department.lower().replace(' ', '_')]
         if random.random() > 0.5:
-            tags.extend(['enterprise', 'documentation', random.choice(['urgent', 'standard', 'low_priority'])])
+            tags.extend(['enterprise', 'documentation', random.choice(CONFLUENCE_TAG_LEVELS)])
         
         doc = {
             'title': f"{doc_type}: {topic.title()} - {fake.catch_phrase()}",
@@ -271,7 +277,7 @@ class TestDataGenerator:
             'timestamp': fake.date_time_between(start_date='-1y', end_date='now').isoformat(),
             'tags': tags,
             'space': space,
-            'project': f"Project {random.choice(['Alpha', 'Beta', 'Gamma', 'Delta', 'Phoenix', 'Odyssey'])}"
+            'project': f"Project {random.choice(CONFLUENCE_PROJECTS)}"
         }
         
         ratings_data = self.generate_ratings_data()
@@ -281,43 +287,23 @@ class TestDataGenerator:
         # Add semantic fields if enabled
         doc = self.add_semantic_fields(doc)
         
+        # Split content into passages if enabled
+        doc = self.add_passages(doc)
+        
         return doc
 
     def generate_jira_ticket(self):
         """Generate a realistic Jira ticket."""
-        ticket_types = ['Bug', 'Task', 'Story', 'Epic', 'Improvement', 'Sub-task']
-        priorities = ['Critical', 'High', 'Medium', 'Low']
-        statuses = ['Open', 'In Progress', 'Code Review', 'Testing', 'Done', 'Closed', 'Blocked']
-        
-        ticket_type = random.choice(ticket_types)
-        priority = random.choice(priorities)
-        status = random.choice(statuses)
+        ticket_type = random.choice(JIRA_TICKET_TYPES)
+        priority = random.choice(JIRA_PRIORITIES)
+        status = random.choice(JIRA_STATUSES)
         topic = random.choice(self.enterprise_topics)
         author = random.choice(self.employees)
         department = random.choice(self.departments)
         
-        if ticket_type == 'Bug':
-            title_templates = [
-                f"Issue with {topic} functionality",
-                f"API timeout in {topic} service",
-                f"Data inconsistency in {topic} module",
-                f"Performance issue in {topic} component"
-            ]
-        elif ticket_type == 'Epic':
-            title_templates = [
-                f"Epic: Transform {topic} capabilities",
-                f"Epic: Modernize {topic} infrastructure",
-                f"Epic: Enhance {topic} user experience"
-            ]
-        else:
-            title_templates = [
-                f"Implement {topic} enhancement",
-                f"Upgrade {topic} infrastructure",
-                f"Design {topic} user interface",
-                f"Integrate {topic} with core systems"
-            ]
+        title_templates = JIRA_TITLE_TEMPLATES.get(ticket_type, JIRA_TITLE_TEMPLATES['default'])
         
-        title = random.choice(title_templates)
+        title = random.choice(title_templates).format(topic=topic)
         
         content = f"Task details for {topic} implementation. "
         content += f"Requirements include security compliance, performance optimization, and user experience. "
@@ -335,12 +321,12 @@ class TestDataGenerator:
             'content_type': 'ticket',
             'author': author,
             'department': department,
-            'url': f"https://company.atlassian.net/browse/{random.choice(['CORP', 'TECH', 'PROD', 'CORE'])}-{random.randint(1000, 9999)}",
+            'url': f"https://company.atlassian.net/browse/{random.choice(JIRA_PROJECT_KEYS)}-{random.randint(1000, 9999)}",
             'timestamp': fake.date_time_between(start_date='-6m', end_date='now').isoformat(),
             'tags': tags,
             'priority': priority,
             'status': status,
-            'project': f"Enterprise-{random.choice(['DIGITAL', 'CORE', 'MOBILE', 'API', 'CLOUD', 'SECURITY'])}"
+            'project': f"Enterprise-{random.choice(JIRA_PROJECTS)}"
         }
         
         ratings_data = self.generate_ratings_data()
@@ -350,42 +336,24 @@ class TestDataGenerator:
         # Add semantic fields if enabled
         doc = self.add_semantic_fields(doc)
         
+        # Split content into passages if enabled
+        doc = self.add_passages(doc)
+        
         return doc
 
     def generate_sharepoint_document(self):
         """Generate a realistic SharePoint document."""
-        doc_types = [
-            'Policy Document', 'Training Material', 'Procedure Manual',
-            'Report', 'Presentation', 'Spreadsheet', 'Form Template',
-            'Compliance Document', 'Audit Report', 'Guidelines'
-        ]
-        
-        sites = [
-            'HR-Portal', 'Risk-Management', 'Compliance', 'IT-Department',
-            'Corporate-Development', 'Operations', 'Finance', 'Legal-Documents'
-        ]
-        
-        doc_type = random.choice(doc_types)
-        site = random.choice(sites)
+        doc_type = random.choice(SHAREPOINT_DOC_TYPES)
+        site = random.choice(SHAREPOINT_SITES)
         topic = random.choice(self.enterprise_topics)
         author = random.choice(self.employees)
         department = random.choice(self.departments)
         
-        content_templates = [
-            f"Official company policy regarding {topic} management and implementation. "
-            f"This document establishes guidelines, procedures, and compliance requirements. "
-            f"All staff must adhere to these policies to ensure regulatory compliance.",
-            
-            f"Comprehensive {doc_type.lower()} covering {topic} best practices. "
-            f"Includes detailed procedures, examples, and reference materials. "
-            f"Designed for operational reference and training purposes."
-        ]
-        
-        content = random.choice(content_templates)
+        content = random.choice(SHAREPOINT_CONTENT_TEMPLATES).format(topic=topic, doc_type=doc_type.lower())
         content += f" Document owner: {author} ({department}). "
         content += f"Classification: {'Confidential' if random.random() > 0.7 else 'Internal Use'}. "
         
-        extension = random.choice(['.docx', '.xlsx', '.pptx', '.pdf'])
+        extension = random.choice(SHAREPOINT_EXTENSIONS)
         
         tags = [doc_type.lower().replace(' ', '_'), topic.replace(' ', '_'), 'sharepoint']
         if 'compliance' in doc_type.lower() or 'policy' in doc_type.lower():
@@ -413,6 +381,9 @@ class TestDataGenerator:
         # Add semantic fields if enabled
         doc = self.add_semantic_fields(doc)
         
+        # Split content into passages if enabled
+        doc = self.add_passages(doc)
+        
         return doc
 
     def clear_existing_data(self):
@@ -427,6 +398,10 @@ class TestDataGenerator:
             # Refresh index
             self.es.indices.refresh(index=self.index_name)
             
+            # Every document must be sent again on the next run
+            IngestManifest(self.config['ingest_manifest_file']).clear()
+            NearDuplicateIndex(load_dedup_config()).clear()
+            
             print("🗑️  Cleared all existing documents from index")
             return True
         except Exception as e:
@@ -462,27 +437,89 @@ class TestDataGenerator:
         # Shuffle documents
         random.shuffle(documents)
         
-        # Bulk insert
-        print(f"💾 Inserting {len(documents)} documents into Elasticsearch...")
-        
-        actions = []
-        for doc in documents:
-            action = {
-                "_index": self.index_name,
-                "_id": str(uuid.uuid4()),
-                "_source": doc
-            }
-            actions.append(action)
-        
-        from elasticsearch.helpers import bulk
-        success, failed = bulk(self.es, actions, chunk_size=100)
-        
-        print(f"✅ Successfully inserted: {success} documents")
+        # Skip documents whose content is unchanged since the last run, before any network call
+        manifest = IngestManifest(self.config['ingest_manifest_file'], self.config['semantic_field_prefix'])
+        changed, unchanged = manifest.select_changed(documents)
+        print(f"🔁 {len(changed)} new or changed documents, {unchanged} unchanged (skipped)")
+        
+        # Cluster near-duplicates (and optionally drop exact ones) before enrichment and inference
+        dedup_config = load_dedup_config()
+        dedup = NearDuplicateIndex(dedup_config) if dedup_config['enabled'] else None
+        if dedup and changed:
+            changed, skipped = dedup.assign(changed)
+            print(f"🪞 {dedup.cluster_count()} duplicate clusters across indexed documents, "
+                  f"{skipped} exact duplicates skipped")
+        if not changed:
+            return documents
+        
+        # Precompute abstracts so the API does not send raw content to the LLM
+        if self.config['enrich_enabled']:
+            print(f"🧾 Enriching {len(changed)} documents with abstracts and key facts...")
+            enricher = DocumentEnricher(load_enrichment_config())
+            stats = enricher.enrich_documents([doc for _, doc in changed])
+            print(f"   Generated: {stats['generated']}, from cache: {stats['cached']}, failed: {stats['failed']}")
+        
+        # Client-side embeddings for the dense_vector field
+        embedder_config = load_embedder_config()
+        if embedder_config['vector_enabled']:
+            print(f"🧮 Embedding {len(changed)} documents with the '{embedder_config['embedder']}' embedder...")
+            embed_documents(load_embedder(embedder_config), [doc for _, doc in changed], embedder_config)
+        
+        # Bulk upsert under stable ids so re-runs update documents in place
+        print(f"💾 Upserting {len(changed)} documents into Elasticsearch...")
+        
+        from elasticsearch.helpers import streaming_bulk
+        # Retry documents rejected with 429; use bulk_loader.py for large corpora
+        # Results arrive out of order when rejected documents are retried, so match them by id
+        pending = dict(changed)
+        success = 0
+        failed = []
+        indexed = []
+        for ok, item in streaming_bulk(
+            self.es, bulk_upsert_actions(self.index_name, changed),
+            chunk_size=100, max_retries=3, initial_backoff=2, raise_on_error=False
+        ):
+            result = item['update']
+            if ok:
+                success += 1
+                doc = pending[result['_id']]
+                manifest.mark_indexed(result['_id'], doc['content_hash'])
+                indexed.append((result['_id'], doc))
+            else:
+                failed.append(item)
+        # Only successfully indexed documents are recorded, so failures are retried next run
+        manifest.save()
+        if dedup:
+            dedup.save()
+        
+        print(f"✅ Successfully upserted: {success} documents")
         if failed:
-            print(f"❌ Failed to insert: {len(failed)} documents")
+            print(f"❌ Failed to upsert: {len(failed)} documents")
+        
+        # Match the new and changed documents against all saved searches in batches
+        if self.config['percolator_enabled']:
+            self.percolate_saved_searches(indexed)
         
         return documents
 
+    def percolate_saved_searches(self, documents):
+        """Record saved-search alerts for newly inserted documents."""
+        percolator = SavedSearchPercolator(
+            self.es, self.config['percolator_index'], self.config['alerts_index']
+        )
+        try:
+            if not percolator.is_available():
+                print(f"ℹ️  Percolator index '{self.config['percolator_index']}' not found - skipping saved-search alerts")
+                return 0
+            
+            print(f"🔔 Percolating {len(documents)} documents against saved searches...")
+            recorded = percolator.percolate(documents)
+            print(f"   Recorded {recorded} saved-search alerts")
+            return recorded
+        except Exception as e:
+            print(f"⚠️  Saved-search percolation failed: {e}")
+            return 0
+
     def get_data_statistics(self):
         """Get statistics about the generated data."""
         try:
@@ -506,7 +543,7 @@ class TestDataGenerator:
             if self.config['create_ratings']:
                 stats['with_ratings'] = self.es.count(
                     index=self.index_name,
-                    body={"query": {"exists": {"field": "ratings"}}}
+                    body={"query": {"exists": {"field": "ratings.total_ratings"}}}
                 )['count']
             
             return stats
@@ -517,10 +554,8 @@ class TestDataGenerator:
 
     def test_search_functionality(self):
         """Test basic search functionality."""
-        test_queries = ["payment", "security", "API"]
-        
         print("\n🧪 Testing search functionality:")
-        for query in test_queries:
+        for query in TEST_QUERIES:
             try:
                 # Test traditional search
                 response = self.es.search(
@@ -545,7 +580,9 @@ class TestDataGenerator:
                 # Test semantic search if enabled
                 if self.config['semantic_enabled']:
                     try:
-                        prefix = self.config['semantic_field_prefix']
+                        semantic_fields = semantic_query_fields(
+                            self.config['semantic_field_prefix'], self.config['semantic_field_mode']
+                        )
                         semantic_response = self.es.search(
                             index=self.index_name,
                             body={
@@ -554,16 +591,11 @@ class TestDataGenerator:
                                         "should": [
                                             {
                                                 "semantic": {
-                                                    "field": f"{prefix}content",
-                                                    "query": query
-                                                }
-                                            },
-                                            {
-                                                "semantic": {
-                                                    "field": f"{prefix}title",
+                                                    "field": field,
                                                     "query": query
                                                 }
                                             }
+                                            for field, _ in semantic_fields
                                         ]
                                     }
                                 },
@@ -0,0 +1,128 @@
+"""
+Index Profiles for Enterprise Search
+Settings and field options layered onto setup_elastic.get_index_mapping by
+INDEX_PROFILE; benchmark_profiles.py measures what each one buys:
+
+- baseline:     the original mapping (one shard, default field options)
+- small:        dev/test clusters and small corpora: one shard, no doc_values on
+                fields that are never sorted or aggregated
+- read-heavy:   query latency first: offsets for highlighting, eager global ordinals
+                on facet fields, segments sorted by timestamp and a slower refresh
+                so caches survive longer
+- ingest-heavy: indexing throughput first: more shards to spread bulk writes and
+                a 30s refresh, with nothing that adds per-document indexing work
+
+Keyword fields already have norms disabled by default, and the text fields keep
+theirs because BM25 length normalisation relies on them.
+"""
+
+import math
+
+INDEX_PROFILES = ('baseline', 'small', 'read-heavy', 'ingest-heavy')
+
+# How content is indexed for the highlighter: none re-analyses the stored text,
+# offsets add them to the postings (cheap), term_vectors store a per-document
+# index (fastest on long documents, roughly doubles the field's size on disk)
+HIGHLIGHT_INDEXING = ('none', 'offsets', 'term_vectors')
+
+# Fields the UI filters and facets on
+FACET_FIELDS = ('source', 'content_type', 'department', 'author', 'tags')
+
+# Keyword fields that are only read from _source or matched by term, never sorted or aggregated
+NO_DOC_VALUES_FIELDS = ('url', 'abstract_hash', 'content_hash')
+
+# More shards than this rarely helps a single index and costs cluster state and fan-out
+MAX_SHARDS = 16
+
+PROFILE_OPTIONS = {
+    'baseline': {
+        'docs_per_shard': None,
+        'refresh_interval': None,
+        'highlight': 'none',
+        'eager_facets': False,
+        'sort_by_timestamp': False,
+        'trim_doc_values': False
+    },
+    'small': {
+        'docs_per_shard': None,
+        'refresh_interval': '1s',
+        'highlight': 'none',
+        'eager_facets': False,
+        'sort_by_timestamp': False,
+        'trim_doc_values': True
+    },
+    'read-heavy': {
+        # Fewer, larger shards keep query fan-out low
+        'docs_per_shard': 5_000_000,
+        'refresh_interval': '5s',
+        'highlight': 'offsets',
+        'eager_facets': True,
+        'sort_by_timestamp': True,
+        'trim_doc_values': True
+    },
+    'ingest-heavy': {
+        # More shards spread bulk indexing across more threads and nodes
+        'docs_per_shard': 1_000_000,
+        'refresh_interval': '30s',
+        'highlight': 'none',
+        'eager_facets': False,
+        'sort_by_timestamp': False,
+        'trim_doc_values': True
+    }
+}
+
+
+def validate_profile(profile):
+    if profile not in INDEX_PROFILES:
+        raise ValueError(f"INDEX_PROFILE must be one of {', '.join(INDEX_PROFILES)}, got '{profile}'")
+    return profile
+
+
+def validate_highlight_indexing(highlight):
+    if highlight and highlight not in HIGHLIGHT_INDEXING:
+        raise ValueError(f"HIGHLIGHT_INDEXING must be one of {', '.join(HIGHLIGHT_INDEXING)}, got '{highlight}'")
+    return highlight
+
+
+def shard_count(profile, expected_docs):
+    """Primary shards for the expected corpus size under a profile."""
+    docs_per_shard = PROFILE_OPTIONS[profile]['docs_per_shard']
+    if not docs_per_shard:
+        return 1
+    return max(1, min(MAX_SHARDS, math.ceil(expected_docs / docs_per_shard)))
+
+
+def apply_index_profile(mapping, profile, expected_docs, highlight=None):
+    """Apply a profile to an index mapping in place and return it.
+
+    highlight overrides the profile's highlighting layout for content.
+    """
+    options = PROFILE_OPTIONS[profile]
+    properties = mapping['mappings']['properties']
+    index_settings = mapping['settings']['index']
+
+    index_settings['number_of_shards'] = shard_count(profile, expected_docs)
+    if options['refresh_interval']:
+        index_settings['refresh_interval'] = options['refresh_interval']
+
+    highlight = highlight or options['highlight']
+    if highlight == 'offsets':
+        properties['content']['index_options'] = 'offsets'
+    elif highlight == 'term_vectors':
+        properties['content']['term_vector'] = 'with_positions_offsets'
+
+    # Build global ordinals at refresh rather than on the first aggregation after it
+    if options['eager_facets']:
+        for field in FACET_FIELDS:
+            properties[field]['eager_global_ordinals'] = True
+
+    if options['trim_doc_values']:
+        for field in NO_DOC_VALUES_FIELDS:
+            properties[field]['doc_values'] = False
+
+    # Newest-first segments let date-sorted searches stop early
+    if options['sort_by_timestamp']:
+        index_settings['sort.field'] = 'timestamp'
+        index_settings['sort.order'] = 'desc'
+
+    return mapping
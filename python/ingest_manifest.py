@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Incremental Ingestion Manifest for Enterprise Search
+Gives documents stable ids derived from their source URL and tracks a hash of
+their source fields in a local manifest, so re-ingestion only sends documents
+that are new or changed. Unchanged documents are skipped before any network
+call, which keeps semantic_text inference proportional to churn.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+from elasticsearch.helpers import scan
+
+# Fields maintained by the API once a document exists; re-ingestion must not overwrite them
+API_OWNED_FIELDS = {'ratings', 'user_ratings'}
+
+# Fields added at ingest time or owned by the API; they never mark a document as changed
+DERIVED_FIELDS = API_OWNED_FIELDS | {
+    'content_hash', 'passages', 'abstract', 'key_facts', 'abstract_hash', 'dup_cluster', 'ingested_at'
+}
+
+
+def ingest_timestamp():
+    """The ingested_at value for documents written now (UTC)."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def document_id(doc):
+    """Stable id from the document's source identity (its URL)."""
+    identity = doc.get('url') or f"{doc.get('source', '')}:{doc.get('title', '')}"
+    return hashlib.sha1(identity.encode('utf-8')).hexdigest()
+
+
+def document_hash(doc, semantic_field_prefix='semantic_'):
+    """Hash of the source fields of a document, ignoring derived and API-owned fields."""
+    source_fields = {
+        field: value for field, value in doc.items()
+        if field not in DERIVED_FIELDS and not field.startswith(semantic_field_prefix)
+    }
+    payload = json.dumps(source_fields, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class IngestManifest:
+    def __init__(self, path, semantic_field_prefix='semantic_'):
+        """Load the manifest of document id -> content hash from path (empty if missing)."""
+        self.path = path
+        self.semantic_field_prefix = semantic_field_prefix
+        self.hashes = self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Ignoring unreadable ingest manifest {self.path}: {e}")
+            return {}
+
+    def save(self):
+        """Persist the manifest atomically so an interrupted run never leaves it half written."""
+        if not self.path:
+            return
+        temporary = f"{self.path}.tmp"
+        with open(temporary, 'w') as f:
+            json.dump(self.hashes, f)
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        self.hashes = {}
+        self.save()
+
+    def select_changed(self, documents):
+        """Split documents into changed ones and an unchanged count.
+
+        Each changed document gets its stable id and content_hash; returns
+        ([(document_id, document)], unchanged_count). When a batch holds the
+        same document twice the last copy wins.
+        """
+        changed = {}
+        unchanged = 0
+        for doc in documents:
+            doc_id = document_id(doc)
+            digest = document_hash(doc, self.semantic_field_prefix)
+            if self.hashes.get(doc_id) == digest:
+                unchanged += 1
+                continue
+            doc['content_hash'] = digest
+            changed[doc_id] = doc
+        return list(changed.items()), unchanged
+
+    def mark_indexed(self, doc_id, digest):
+        self.hashes[doc_id] = digest
+
+    def rebuild_from_index(self, es, index_name):
+        """Recreate the manifest from the content_hash stored on indexed documents."""
+        self.hashes = {
+            hit['_id']: hit['_source']['content_hash']
+            for hit in scan(
+                es, index=index_name, size=1000,
+                query={"query": {"exists": {"field": "content_hash"}}, "_source": ["content_hash"]}
+            )
+        }
+        self.save()
+        return len(self.hashes)
+
+
+def bulk_upsert_actions(index_name, changed):
+    """Bulk actions for changed documents.
+
+    New documents are inserted whole; existing ones get a partial update that
+    leaves API-owned ratings untouched. Both are stamped with ingested_at.
+    """
+    for doc_id, doc in changed:
+        ingested_at = ingest_timestamp()
+        yield {
+            "_op_type": "update",
+            "_index": index_name,
+            "_id": doc_id,
+            "doc": {
+                **{field: value for field, value in doc.items() if field not in API_OWNED_FIELDS},
+                'ingested_at': ingested_at
+            },
+            "upsert": {**doc, 'ingested_at': ingested_at}
+        }
+
+
+def main():
+    """Rebuild the local manifest from the index (e.g. on a new ingestion host)."""
+    from dotenv import load_dotenv
+    from gen_test_data import TestDataGenerator
+
+    load_dotenv()
+    print("Enterprise Search - Ingest Manifest Rebuild")
+    print("=" * 50)
+
+    generator = TestDataGenerator()
+    manifest = IngestManifest(generator.config['ingest_manifest_file'], generator.config['semantic_field_prefix'])
+    count = manifest.rebuild_from_index(generator.es, generator.index_name)
+    print(f"✅ Rebuilt {manifest.path} with {count} document hashes from '{generator.index_name}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Passage splitting for Enterprise Search ingestion
+Splits document content into overlapping, sentence-aligned passages that are
+indexed as nested objects so searches can return the best-matching passages
+"""
+
+import re
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+
+def split_into_passages(text, max_chars=600, overlap_chars=100):
+    """Split text into passages of at most max_chars, breaking on sentence boundaries.
+
+    Consecutive passages share up to overlap_chars of trailing sentences so that
+    statements spanning a boundary remain retrievable.
+    """
+    if not text:
+        return []
+
+    sentences = [s.strip() for s in SENTENCE_BOUNDARY.split(text) if s.strip()]
+    passages = []
+    current = []
+    current_len = 0
+    cursor = 0
+
+    for sentence in sentences:
+        # Locate the sentence in the original text to record character offsets
+        start = text.find(sentence, cursor)
+        if start == -1:
+            start = cursor
+        cursor = start + len(sentence)
+
+        # A single oversized sentence becomes its own (truncated) passage
+        if len(sentence) > max_chars:
+            if current:
+                passages.append({'text': ' '.join(s for s, _ in current), 'offset': current[0][1]})
+            passages.append({'text': sentence[:max_chars], 'offset': start})
+            current = []
+            current_len = 0
+            continue
+
+        if current and current_len + len(sentence) + 1 > max_chars:
+            passages.append({'text': ' '.join(s for s, _ in current), 'offset': current[0][1]})
+
+            # Carry trailing sentences forward as overlap
+            carried = []
+            carried_len = 0
+            for s, s_start in reversed(current):
+                if carried_len + len(s) > overlap_chars or carried_len + len(s) + len(sentence) + 2 > max_chars:
+                    break
+                carried.insert(0, (s, s_start))
+                carried_len += len(s) + 1
+            current = carried
+            current_len = carried_len
+
+        current.append((sentence, start))
+        current_len += len(sentence) + 1
+
+    if current:
+        passages.append({'text': ' '.join(s for s, _ in current), 'offset': current[0][1]})
+
+    for position, passage in enumerate(passages):
+        passage['position'] = position
+
+    return passages
@@ -0,0 +1,50 @@
+"""
+Semantic Field Layouts for Enterprise Search
+Shared by setup_elastic.py (mappings, search template) and the loaders so they
+agree on which semantic_text fields exist and who fills them:
+
+- client:   semantic_title/content/summary are sent with every document
+- copy_to:  the same three fields are filled from title/content/summary by copy_to,
+            so bulk requests carry the text once
+- combined: title, content and summary are all copied into one semantic_text field
+            (<prefix>text), so each document needs one inference request instead of three
+"""
+
+SEMANTIC_FIELD_MODES = ('client', 'copy_to', 'combined')
+
+SOURCE_FIELDS = ('title', 'content', 'summary')
+
+COMBINED_FIELD = 'text'
+
+# Relative boosts of the per-field semantic clauses; the combined field is weighted like the title
+FIELD_BOOSTS = {'title': 1.5, 'content': 1.0, 'summary': 1.2}
+COMBINED_BOOST = 1.5
+
+
+def validate_mode(mode):
+    if mode not in SEMANTIC_FIELD_MODES:
+        raise ValueError(f"SEMANTIC_FIELD_MODE must be one of {', '.join(SEMANTIC_FIELD_MODES)}, got '{mode}'")
+    return mode
+
+
+def semantic_field_names(prefix, mode):
+    """Map each source text field to the semantic_text field it feeds."""
+    if mode == 'combined':
+        return {field: f"{prefix}{COMBINED_FIELD}" for field in SOURCE_FIELDS}
+    return {field: f"{prefix}{field}" for field in SOURCE_FIELDS}
+
+
+def semantic_query_fields(prefix, mode):
+    """The semantic_text fields to query, with their relative boosts."""
+    if mode == 'combined':
+        return [(f"{prefix}{COMBINED_FIELD}", COMBINED_BOOST)]
+    return [(f"{prefix}{field}", FIELD_BOOSTS[field]) for field in SOURCE_FIELDS]
+
+
+def add_client_semantic_fields(doc, prefix, mode):
+    """Copy the text fields into their semantic fields when the client has to send them."""
+    if mode != 'client':
+        return doc
+    for field, semantic_field in semantic_field_names(prefix, mode).items():
+        doc[semantic_field] = doc.get(field, '')
+    return doc
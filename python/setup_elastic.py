@@ -4,10 +4,36 @@ Elasticsearch Setup Script for Enterprise Search
 Creates index mappings and search application configuration
 """
 
+import argparse
+import copy
+import hashlib
 import json
 import os
+import time
 from elasticsearch import Elasticsearch
 from dotenv import load_dotenv
+from semantic_fields import semantic_field_names, semantic_query_fields, validate_mode
+from index_profiles import INDEX_PROFILES, apply_index_profile, validate_highlight_indexing, validate_profile
+
+# Quantised HNSW variants (int8 ~4x, int4 ~8x, bbq ~32x less vector memory than float hnsw)
+VECTOR_INDEX_TYPES = ('hnsw', 'int8_hnsw', 'int4_hnsw', 'bbq_hnsw')
+
+
+def validate_vector_options(index_type, dims):
+    """Reject dense_vector settings Elasticsearch would refuse at index creation."""
+    if index_type not in VECTOR_INDEX_TYPES:
+        raise ValueError(f"VECTOR_INDEX_TYPE must be one of {', '.join(VECTOR_INDEX_TYPES)}, got '{index_type}'")
+    if index_type == 'int4_hnsw' and dims % 2:
+        raise ValueError(f"int4_hnsw needs an even VECTOR_DIMS, got {dims}")
+    if index_type == 'bbq_hnsw' and dims < 64:
+        raise ValueError(f"bbq_hnsw needs VECTOR_DIMS of at least 64, got {dims}")
+    return index_type
+
+
+def mapping_fingerprint(mapping):
+    """Stable short hash of an index mapping, as built by get_index_mapping or exported to JSON."""
+    canonical = json.dumps(mapping, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
 
 # Load environment variables
 load_dotenv()
@@ -36,12 +62,49 @@ class ElasticsearchSetup:
             'search_app_name': os.getenv('SEARCH_APP_NAME', 'enterprise-search'),
             'debug': os.getenv('DEBUG', 'false').lower() == 'true',
             'force_recreate': os.getenv('FORCE_RECREATE', 'false').lower() == 'true',
+            # Filesystem snapshot repository for fast environment bootstrap (a path.repo path on the nodes)
+            'snapshot_repository': os.getenv('SNAPSHOT_REPOSITORY', 'enterprise_search_snapshots'),
+            'snapshot_location': os.getenv('SNAPSHOT_LOCATION', '/usr/share/elasticsearch/snapshots'),
             # Semantic search configuration
             'semantic_enabled': os.getenv('SEMANTIC_ENABLED', 'true').lower() == 'true',
             'semantic_model': os.getenv('SEMANTIC_MODEL', '.multilingual-e5-small'),
             'semantic_field_prefix': os.getenv('SEMANTIC_FIELD_PREFIX', 'semantic_'),
+            # client (documents carry the semantic fields), copy_to or combined; see semantic_fields.py
+            'semantic_field_mode': validate_mode(os.getenv('SEMANTIC_FIELD_MODE', 'client')),
             'hybrid_weight': float(os.getenv('HYBRID_WEIGHT', '0.7')),
-            'deploy_model': os.getenv('DEPLOY_MODEL', 'true').lower() == 'true'
+            # Client-side embeddings in a quantised dense_vector field (see embedders.py)
+            'vector_enabled': os.getenv('VECTOR_ENABLED', 'false').lower() == 'true',
+            'vector_field': os.getenv('VECTOR_FIELD', 'content_vector'),
+            'vector_dims': int(os.getenv('VECTOR_DIMS', '384')),
+            'vector_similarity': os.getenv('VECTOR_SIMILARITY', 'cosine'),
+            'vector_index_type': validate_vector_options(
+                os.getenv('VECTOR_INDEX_TYPE', 'int8_hnsw'), int(os.getenv('VECTOR_DIMS', '384'))
+            ),
+            'vector_m': int(os.getenv('VECTOR_M', '16')),
+            'vector_ef_construction': int(os.getenv('VECTOR_EF_CONSTRUCTION', '100')),
+            # Settings and field options tuned for a workload (see index_profiles.py)
+            'index_profile': validate_profile(os.getenv('INDEX_PROFILE', 'baseline')),
+            'expected_doc_count': int(os.getenv('EXPECTED_DOC_COUNT', '100000')),
+            'highlight_indexing': validate_highlight_indexing(os.getenv('HIGHLIGHT_INDEXING', '')),
+            'deploy_model': os.getenv('DEPLOY_MODEL', 'true').lower() == 'true',
+            # Passage indexing configuration
+            'passages_enabled': os.getenv('PASSAGES_ENABLED', 'true').lower() == 'true',
+            'passages_per_hit': int(os.getenv('PASSAGES_PER_HIT', '3')),
+            # Saved-search alerting (percolator) configuration
+            'percolator_enabled': os.getenv('PERCOLATOR_ENABLED', 'true').lower() == 'true',
+            'percolator_index': os.getenv('PERCOLATOR_INDEX', f"{os.getenv('ELASTIC_INDEX', 'enterprise_documents')}_saved_searches"),
+            'alerts_index': os.getenv('ALERTS_INDEX', f"{os.getenv('ELASTIC_INDEX', 'enterprise_documents')}_search_alerts"),
+            # Append-only rating events written by the API ratings service
+            'rating_events_index': os.getenv('RATING_EVENTS_INDEX', f"{os.getenv('ELASTIC_INDEX', 'enterprise_documents')}_rating_events"),
+            # Search, click and LLM events written by the API analytics pipeline
+            'analytics_index': os.getenv('ANALYTICS_INDEX', f"{os.getenv('ELASTIC_INDEX', 'enterprise_documents')}_analytics"),
+            # Scoring boosts folded into the search application query (0 disables)
+            'rating_boost': float(os.getenv('RATING_BOOST', '1.0')),
+            'freshness_boost': float(os.getenv('FRESHNESS_BOOST', '1.0')),
+            'freshness_pivot': os.getenv('FRESHNESS_PIVOT', '30d'),
+            'department_boost': float(os.getenv('DEPARTMENT_BOOST', '1.1')),
+            # Return one result per near-duplicate cluster (dup_cluster, see dedup.py)
+            'collapse_duplicates': os.getenv('COLLAPSE_DUPLICATES', 'false').lower() == 'true'
         }
         
         if config['debug']:
@@ -108,8 +171,8 @@ class ElasticsearchSetup:
             print("4. Ensure network connectivity")
             return False
 
-    def get_index_mapping(self):
-        """Get the complete index mapping for enterprise search."""
+    def get_index_mapping(self, profile=None):
+        """Get the complete index mapping for enterprise search, tuned by INDEX_PROFILE (or profile)."""
         mapping = {
             "mappings": {
                 "properties": {
@@ -162,6 +225,10 @@ class ElasticsearchSetup:
                             "score": {
                                 "type": "float"
                             },
+                            # score + 1, so it stays positive; used for rank_feature boosting
+                            "rank": {
+                                "type": "rank_feature"
+                            },
                             "last_updated": {
                                 "type": "date"
                             }
@@ -200,6 +267,30 @@ class ElasticsearchSetup:
                     },
                     "site": {
                         "type": "keyword"
+                    },
+                    # Ingest-time enrichment (see enrichment.py)
+                    "abstract": {
+                        "type": "text",
+                        "analyzer": "standard"
+                    },
+                    "key_facts": {
+                        "type": "text",
+                        "analyzer": "standard"
+                    },
+                    "abstract_hash": {
+                        "type": "keyword"
+                    },
+                    # Hash of the source fields for incremental re-ingestion (see ingest_manifest.py)
+                    "content_hash": {
+                        "type": "keyword"
+                    },
+                    # Near-duplicate cluster id that searches collapse on (see dedup.py)
+                    "dup_cluster": {
+                        "type": "keyword"
+                    },
+                    # When the loader last wrote the document; saved search digests select new documents by it
+                    "ingested_at": {
+                        "type": "date"
                     }
                 }
             },
@@ -221,27 +312,58 @@ class ElasticsearchSetup:
         
         # Add semantic_text fields if semantic search is enabled
         if self.config['semantic_enabled']:
-            prefix = self.config['semantic_field_prefix']
-            model_id = self.config['semantic_model']
+            mode = self.config['semantic_field_mode']
+            field_names = semantic_field_names(self.config['semantic_field_prefix'], mode)
+            properties = mapping["mappings"]["properties"]
             
-            semantic_fields = {
-                f"{prefix}title": {
-                    "type": "semantic_text",
-                    "inference_id": model_id
-                },
-                f"{prefix}content": {
-                    "type": "semantic_text",
-                    "inference_id": model_id
-                },
-                f"{prefix}summary": {
+            for field, semantic_field in field_names.items():
+                properties[semantic_field] = {
                     "type": "semantic_text",
-                    "inference_id": model_id
+                    "inference_id": self.config['semantic_model']
+                }
+                # Fill the semantic fields server-side so documents carry their text once
+                if mode != 'client':
+                    properties[field]["copy_to"] = semantic_field
+        
+        # Add a dense_vector field for client-side embeddings, quantised to cut vector memory
+        if self.config['vector_enabled']:
+            mapping["mappings"]["properties"][self.config['vector_field']] = {
+                "type": "dense_vector",
+                "dims": self.config['vector_dims'],
+                "index": True,
+                "similarity": self.config['vector_similarity'],
+                "index_options": {
+                    "type": self.config['vector_index_type'],
+                    "m": self.config['vector_m'],
+                    "ef_construction": self.config['vector_ef_construction']
                 }
             }
-            
-            mapping["mappings"]["properties"].update(semantic_fields)
         
-        return mapping
+        # Add nested passages so searches can return the best-matching chunks
+        # (semantic_text is not supported inside nested objects, so passages are lexical)
+        if self.config['passages_enabled']:
+            mapping["mappings"]["properties"]["passages"] = {
+                "type": "nested",
+                "properties": {
+                    "text": {
+                        "type": "text",
+                        "analyzer": "standard"
+                    },
+                    "offset": {
+                        "type": "integer"
+                    },
+                    "position": {
+                        "type": "integer"
+                    }
+                }
+            }
+        
+        return apply_index_profile(
+            mapping,
+            profile or self.config['index_profile'],
+            self.config['expected_doc_count'],
+            self.config['highlight_indexing']
+        )
 
     def deploy_semantic_model(self):
         """Deploy the E5 semantic model for semantic_text functionality."""
@@ -298,22 +420,45 @@ class ElasticsearchSetup:
             print(f"   You can disable semantic search by setting SEMANTIC_ENABLED=false")
             return False
 
+    def _with_index_meta(self, mapping):
+        """Record what an index is built from in its mapping's _meta, for snapshots to carry.
+
+        The fingerprint is taken before _meta, aliases or temporary settings are
+        added, so it matches get_index_mapping() and the exported mapping file.
+        """
+        mapping['mappings']['_meta'] = {
+            # Covers the semantic_text inference endpoint and dense_vector settings too
+            'mapping_fingerprint': mapping_fingerprint(mapping),
+            'embedder': os.getenv('EMBEDDER', 'hashing') if self.config['vector_enabled'] else None
+        }
+        return mapping
+
     def create_index(self):
-        """Create the Elasticsearch index with complete mappings."""
-        mapping = self.get_index_mapping()
+        """Create the first versioned index behind the ELASTIC_INDEX alias.
+
+        Documents live in {index}_v{N} and everything reads and writes through
+        the alias, so later mapping changes can ship with `reindex` (a blue/green
+        copy and alias swap) instead of deleting the live index.
+        """
+        mapping = self._with_index_meta(self.get_index_mapping())
         
         # Check if index exists
         if self.es.indices.exists(index=self.index_name):
             if self.config['force_recreate']:
                 print(f"🗑️  Force recreate enabled - deleting existing index: {self.index_name}")
-                self.es.indices.delete(index=self.index_name)
+                print("   Search is unavailable until data is reloaded; use `python setup_elastic.py reindex`")
+                print("   to apply mapping changes without downtime")
+                for index in self._backing_indices():
+                    self.es.indices.delete(index=index)
             else:
                 print(f"ℹ️  Index '{self.index_name}' already exists")
                 
                 # Check if we should update mapping
                 try:
                     current_mapping = self.es.indices.get_mapping(index=self.index_name)
-                    print(f"✅ Index mapping exists. Use FORCE_RECREATE=true to recreate.")
+                    print(f"✅ Index mapping exists. Use `python setup_elastic.py reindex` to apply mapping changes.")
+                    if not self.es.indices.exists_alias(name=self.index_name):
+                        print(f"   '{self.index_name}' is a concrete index; reindex once to move it behind an alias")
                     return True
                 except Exception as e:
                     print(f"⚠️  Could not retrieve current mapping: {e}")
@@ -321,21 +466,539 @@ class ElasticsearchSetup:
         
         # Create new index
         try:
-            self.es.indices.create(index=self.index_name, body=mapping)
-            print(f"✅ Created index: {self.index_name} with complete mappings")
+            index_name = self._next_index_version()
+            mapping['aliases'] = {self.index_name: {"is_write_index": True}}
+            self.es.indices.create(index=index_name, body=mapping)
+            print(f"✅ Created index: {index_name} (alias '{self.index_name}') with complete mappings")
             
             # Verify the index was created
-            index_info = self.es.indices.get(index=self.index_name)
-            field_count = len(index_info[self.index_name]['mappings']['properties'])
-            print(f"   Index created with {field_count} mapped fields")
+            index_info = self.es.indices.get(index=index_name)
+            field_count = len(index_info[index_name]['mappings']['properties'])
+            print(f"   Index created with {field_count} mapped fields, profile '{self.config['index_profile']}' "
+                  f"({mapping['settings']['index']['number_of_shards']} shards)")
             
             return True
         except Exception as e:
             print(f"❌ Failed to create index: {e}")
             return False
 
-    def get_search_application_config(self):
-        """Get the search application configuration."""
+    def _backing_indices(self):
+        """The concrete indices behind ELASTIC_INDEX: the alias targets, or a legacy concrete index."""
+        if self.es.indices.exists_alias(name=self.index_name):
+            return sorted(self.es.indices.get_alias(name=self.index_name).body)
+        return [self.index_name]
+
+    def _index_versions(self):
+        """Map version number to index name for the existing {index}_v{N} indices."""
+        existing = self.es.indices.get(index=f"{self.index_name}_v*", allow_no_indices=True, expand_wildcards='all')
+        versions = {}
+        for name in existing.body:
+            suffix = name[len(self.index_name) + 2:]
+            if suffix.isdigit():
+                versions[int(suffix)] = name
+        return versions
+
+    def _next_index_version(self):
+        return f"{self.index_name}_v{max(self._index_versions(), default=0) + 1}"
+
+    def reindex(self, slices='auto', requests_per_second=-1, keep_old=1, poll_seconds=5):
+        """Blue/green reindex: copy the live data into a new versioned index and swap the alias.
+
+        1. create {index}_v{N+1} with the current mapping (no replicas or refresh while copying)
+        2. copy with a sliced, throttled _reindex task
+        3. check the document counts match
+        4. move the alias in one atomic _aliases request
+
+        Searches keep hitting the old index until the swap. Writes to the old
+        index are blocked during the copy, so none are lost and the counts are
+        comparable.
+        """
+        if not self.es.indices.exists(index=self.index_name):
+            print(f"❌ Index '{self.index_name}' does not exist; run the setup first")
+            return False
+        
+        sources = self._backing_indices()
+        target = self._next_index_version()
+        
+        mapping = self._with_index_meta(self.get_index_mapping())
+        final_settings = {
+            'index.number_of_replicas': mapping['settings']['index'].get('number_of_replicas', 1),
+            'index.refresh_interval': mapping['settings']['index'].get('refresh_interval')
+        }
+        mapping['settings']['index'].update({'number_of_replicas': 0, 'refresh_interval': '-1'})
+        
+        print(f"📄 Creating {target} with the current mapping...")
+        self.es.indices.create(index=target, body=mapping)
+        
+        task_id = None
+        try:
+            self.es.indices.put_settings(index=sources, settings={'index.blocks.write': True})
+            print(f"🔒 Blocked writes to {', '.join(sources)} for the copy")
+            
+            print(f"📦 Copying {', '.join(sources)} -> {target} (slices={slices}, "
+                  f"requests_per_second={'unlimited' if requests_per_second < 0 else requests_per_second})")
+            task = self.es.reindex(
+                source={'index': sources, 'size': 1000},
+                dest={'index': target},
+                slices=slices,
+                requests_per_second=requests_per_second,
+                wait_for_completion=False
+            )
+            task_id = task['task']
+            response = self._wait_for_reindex(task_id, poll_seconds)
+            task_id = None
+            
+            failures = response.get('failures') or []
+            if failures:
+                raise RuntimeError(f"{len(failures)} document(s) failed to copy, first: {failures[0]}")
+            
+            self.es.indices.put_settings(index=target, settings=final_settings)
+            self.es.indices.refresh(index=target)
+            
+            source_count = self.es.count(index=sources)['count']
+            target_count = self.es.count(index=target)['count']
+            if source_count != target_count:
+                raise RuntimeError(f"document counts differ: {source_count} in source, {target_count} in {target}")
+            print(f"✅ Copied {target_count} documents; counts match")
+            
+            self._swap_alias(target)
+            
+        except (Exception, KeyboardInterrupt) as e:
+            if task_id:
+                self.es.tasks.cancel(task_id=task_id)
+            print(f"❌ Reindex failed: {e or 'cancelled'}")
+            print(f"   Rolling back: deleting {target}; '{self.index_name}' still serves the old data")
+            self.es.indices.delete(index=target, ignore_unavailable=True)
+            self.es.indices.put_settings(index=sources, settings={'index.blocks.write': None})
+            if isinstance(e, KeyboardInterrupt):
+                raise
+            return False
+        
+        self._retire_old_versions(target, keep_old)
+        self._repoint_search_application(target)
+        return True
+
+    def _swap_alias(self, target):
+        """Point the ELASTIC_INDEX alias at target in one atomic _aliases request."""
+        actions = [{'add': {'index': target, 'alias': self.index_name, 'is_write_index': True}}]
+        if self.es.indices.exists_alias(name=self.index_name):
+            actions.extend({'remove': {'index': index, 'alias': self.index_name}} for index in self._backing_indices())
+        elif self.es.indices.exists(index=self.index_name):
+            # The alias takes over the concrete index's name in the same atomic request,
+            # which deletes that index, so keep a copy of it for rollback first
+            self._clone_legacy_index()
+            actions.append({'remove_index': {'index': self.index_name}})
+        self.es.indices.update_aliases(actions=actions)
+        print(f"🔀 Alias '{self.index_name}' now points to {target}")
+
+    def _clone_legacy_index(self):
+        """Clone a concrete (pre-alias) ELASTIC_INDEX to {index}_v0, write-blocked, as its rollback copy.
+
+        A clone hard-links the segments, so it is quick and takes little extra disk.
+        """
+        rollback = f"{self.index_name}_v0"
+        # Left over from an earlier attempt whose swap failed; the original is still authoritative
+        self.es.indices.delete(index=rollback, ignore_unavailable=True)
+        self.es.indices.put_settings(index=self.index_name, settings={'index.blocks.write': True})
+        self.es.indices.clone(index=self.index_name, target=rollback, wait_for_active_shards=1)
+        print(f"📎 Cloned {self.index_name} to {rollback}; the alias swap deletes the original")
+
+    def _repoint_search_application(self, target):
+        """Search applications hold concrete index names, so point an existing app at target."""
+        try:
+            self.es.search_application.get(name=self.config['search_app_name'])
+            self.es.search_application.put(
+                name=self.config['search_app_name'],
+                body=self.get_search_application_config(collapse=self._collapse_allowed())
+            )
+            print(f"✅ Search Application '{self.config['search_app_name']}' now uses {target}")
+        except Exception:
+            pass
+
+    def _wait_for_reindex(self, task_id, poll_seconds):
+        """Poll a background _reindex task, printing progress, and return its response."""
+        while True:
+            task = self.es.tasks.get(task_id=task_id)
+            status = task['task']['status']
+            copied = status.get('created', 0) + status.get('updated', 0)
+            total = status.get('total', 0)
+            if task.get('completed'):
+                if task.get('error'):
+                    raise RuntimeError(f"reindex task failed: {task['error']}")
+                return task['response']
+            percent = (copied / total * 100) if total else 0
+            print(f"   {copied}/{total} documents ({percent:.0f}%)")
+            time.sleep(poll_seconds)
+
+    def _retire_old_versions(self, current, keep_old):
+        """Delete versioned indices older than the newest keep_old ones before current.
+
+        The kept versions are a rollback point: swap the alias back to one of
+        them (clearing index.blocks.write after a reindex) to undo the change.
+        """
+        versions = sorted(
+            (number, name) for number, name in self._index_versions().items() if name != current
+        )
+        retired = versions[:max(0, len(versions) - keep_old)]
+        for _, name in retired:
+            self.es.indices.delete(index=name)
+            print(f"🗑️  Deleted old index: {name}")
+        for _, name in versions[len(retired):]:
+            print(f"ℹ️  Kept {name} for rollback")
+
+    def _ensure_snapshot_repository(self):
+        """Register the shared-filesystem snapshot repository (idempotent).
+
+        SNAPSHOT_LOCATION is a path on the Elasticsearch nodes, not this host,
+        and must be listed in their path.repo setting.
+        """
+        self.es.snapshot.create_repository(
+            name=self.config['snapshot_repository'],
+            repository={'type': 'fs', 'settings': {'location': self.config['snapshot_location'], 'compress': True}}
+        )
+
+    def _snapshot_metadata(self, source_index, doc_count):
+        """What restore checks before trusting a snapshot (snapshot metadata is capped at 1 KB).
+
+        The fingerprint and embedder come from the index's own _meta, so they
+        describe the index being snapshotted, whatever this environment is set to.
+        """
+        meta = self.es.indices.get_mapping(index=source_index)[source_index]['mappings'].get('_meta') or {}
+        if 'mapping_fingerprint' not in meta:
+            print(f"⚠️  {source_index} has no mapping fingerprint in its _meta (created before it was recorded); "
+                  "restoring this snapshot will need --force")
+        return {
+            'index_alias': self.index_name,
+            'source_index': source_index,
+            'doc_count': doc_count,
+            'mapping_fingerprint': meta.get('mapping_fingerprint'),
+            'embedder': meta.get('embedder')
+        }
+
+    def create_snapshot(self, name=None):
+        """Snapshot the loaded index, inferred embeddings included, to the filesystem repository."""
+        if not self.es.indices.exists(index=self.index_name):
+            print(f"❌ Index '{self.index_name}' does not exist; nothing to snapshot")
+            return False
+        
+        sources = self._backing_indices()
+        if len(sources) != 1:
+            print(f"❌ '{self.index_name}' points to {len(sources)} indices; expected one")
+            return False
+        
+        self._ensure_snapshot_repository()
+        name = name or f"{self.index_name}-{time.strftime('%Y%m%d-%H%M%S', time.gmtime())}".lower()
+        self.es.indices.refresh(index=sources)
+        doc_count = self.es.count(index=sources)['count']
+        
+        print(f"📸 Snapshotting {sources[0]} ({doc_count} documents) to "
+              f"{self.config['snapshot_repository']}/{name}...")
+        response = self.es.options(request_timeout=3600).snapshot.create(
+            repository=self.config['snapshot_repository'],
+            snapshot=name,
+            indices=sources,
+            include_global_state=False,
+            metadata=self._snapshot_metadata(sources[0], doc_count),
+            wait_for_completion=True
+        )
+        snapshot = response['snapshot']
+        if snapshot['state'] != 'SUCCESS':
+            print(f"❌ Snapshot finished in state {snapshot['state']}: {snapshot.get('failures')}")
+            return False
+        
+        print(f"✅ Snapshot '{name}' created in {snapshot['duration_in_millis'] / 1000:.1f}s "
+              f"({snapshot['shards']['successful']} shards)")
+        return True
+
+    def _find_snapshot(self, name=None):
+        """The named snapshot, or the newest successful one taken of this index."""
+        repository = self.config['snapshot_repository']
+        if name:
+            return self.es.snapshot.get(repository=repository, snapshot=name)['snapshots'][0]
+        snapshots = self.es.snapshot.get(
+            repository=repository, snapshot='*', sort='start_time', order='desc'
+        )['snapshots']
+        for snapshot in snapshots:
+            if snapshot['state'] == 'SUCCESS' and (snapshot.get('metadata') or {}).get('index_alias') == self.index_name:
+                return snapshot
+        return None
+
+    def _check_snapshot(self, snapshot, mapping_file=None):
+        """Compare a snapshot's metadata with the mapping and embedder this environment expects."""
+        metadata = snapshot.get('metadata') or {}
+        if mapping_file:
+            with open(mapping_file) as f:
+                expected = mapping_fingerprint(json.load(f))
+            source = mapping_file
+        else:
+            expected = mapping_fingerprint(self.get_index_mapping())
+            source = "the current configuration"
+        
+        problems = []
+        if metadata.get('mapping_fingerprint') != expected:
+            problems.append(f"mapping fingerprint {metadata.get('mapping_fingerprint')} does not match "
+                            f"{expected} from {source}")
+        if self.config['vector_enabled'] and metadata.get('embedder') != os.getenv('EMBEDDER', 'hashing'):
+            problems.append(f"vectors were made with embedder '{metadata.get('embedder')}', "
+                            f"EMBEDDER is '{os.getenv('EMBEDDER', 'hashing')}'")
+        
+        print(f"   Snapshot: {snapshot['snapshot']} (Elasticsearch {snapshot['version']}, "
+              f"{metadata.get('doc_count', '?')} documents, taken {snapshot['start_time']})")
+        for problem in problems:
+            print(f"⚠️  {problem}")
+        return not problems
+
+    def restore_snapshot(self, name=None, mapping_file=None, force=False, keep_old=1):
+        """Restore a snapshot as the next index version and swap the alias to it.
+
+        Replaces regenerating and re-inferring the corpus when bringing up test
+        and benchmark clusters. The snapshot must have been taken with the same
+        mapping (compared by fingerprint) unless force is set.
+        """
+        self._ensure_snapshot_repository()
+        snapshot = self._find_snapshot(name)
+        if snapshot is None:
+            print(f"❌ No snapshot of '{self.index_name}' in repository '{self.config['snapshot_repository']}'")
+            return False
+        
+        if not self._check_snapshot(snapshot, mapping_file):
+            if not force:
+                print("   Refusing to restore; use --force to restore anyway, then "
+                      "`python setup_elastic.py reindex` to apply the current mapping")
+                return False
+            print("   Restoring anyway (--force)")
+        
+        metadata = snapshot.get('metadata') or {}
+        source_index = metadata.get('source_index') or snapshot['indices'][0]
+        target = self._next_index_version()
+        
+        print(f"📦 Restoring {source_index} from '{snapshot['snapshot']}' as {target}...")
+        started = time.time()
+        self.es.options(request_timeout=3600).snapshot.restore(
+            repository=self.config['snapshot_repository'],
+            snapshot=snapshot['snapshot'],
+            indices=source_index,
+            include_aliases=False,
+            include_global_state=False,
+            rename_pattern='(.+)',
+            rename_replacement=target,
+            wait_for_completion=True
+        )
+        
+        restored = self.es.count(index=target)['count']
+        expected = metadata.get('doc_count')
+        if expected is not None and restored != expected:
+            print(f"❌ Restored {restored} documents, snapshot recorded {expected}; deleting {target}")
+            self.es.indices.delete(index=target)
+            return False
+        print(f"✅ Restored {restored} documents in {time.time() - started:.1f}s")
+        
+        self._swap_alias(target)
+        self._retire_old_versions(target, keep_old)
+        self._repoint_search_application(target)
+        return True
+
+    def get_percolator_mapping(self):
+        """Get the mapping for the saved-search percolator index."""
+        # Percolated documents are parsed with this mapping, so it mirrors the
+        # document fields that saved-search queries reference
+        document_fields = self.get_index_mapping()["mappings"]["properties"]
+        properties = {
+            field: copy.deepcopy(document_fields[field])
+            for field in ["title", "content", "summary", "source", "author", "department",
+                          "content_type", "tags", "timestamp", "priority", "status", "project"]
+        }
+        # The semantic fields copy_to targets are not mapped here
+        for definition in properties.values():
+            definition.pop("copy_to", None)
+        properties.update({
+            "query": {
+                "type": "percolator"
+            },
+            "saved_search_id": {
+                "type": "keyword"
+            },
+            "saved_search_name": {
+                "type": "keyword"
+            },
+            "user_id": {
+                "type": "keyword"
+            }
+        })
+        
+        return {
+            "mappings": {
+                "properties": properties
+            },
+            "settings": {
+                "index": {
+                    "number_of_shards": 1,
+                    "number_of_replicas": 0,
+                    # Saved queries may reference optional fields (e.g. name, description)
+                    "percolator.map_unmapped_fields_as_text": True
+                }
+            }
+        }
+
+    def get_alerts_mapping(self):
+        """Get the mapping for recorded saved-search matches."""
+        return {
+            "mappings": {
+                "properties": {
+                    "saved_search_id": {
+                        "type": "keyword"
+                    },
+                    "saved_search_name": {
+                        "type": "keyword"
+                    },
+                    "user_id": {
+                        "type": "keyword"
+                    },
+                    "document_id": {
+                        "type": "keyword"
+                    },
+                    "document_title": {
+                        "type": "text"
+                    },
+                    "matched_at": {
+                        "type": "date"
+                    },
+                    "notified": {
+                        "type": "boolean"
+                    }
+                }
+            },
+            "settings": {
+                "index": {
+                    "number_of_shards": 1,
+                    "number_of_replicas": 0
+                }
+            }
+        }
+
+    def create_percolator_indices(self):
+        """Create the saved-search percolator and alerts indices."""
+        if not self.config['percolator_enabled']:
+            print("ℹ️  Saved-search alerting disabled")
+            return True
+        
+        percolator_created = self._create_auxiliary_index(self.config['percolator_index'], self.get_percolator_mapping())
+        alerts_created = self._create_auxiliary_index(self.config['alerts_index'], self.get_alerts_mapping())
+        return percolator_created and alerts_created
+
+    def get_rating_events_mapping(self):
+        """Get the mapping for the append-only rating events index."""
+        return {
+            "mappings": {
+                "properties": {
+                    "event_id": {
+                        "type": "keyword"
+                    },
+                    "document_id": {
+                        "type": "keyword"
+                    },
+                    "user_id": {
+                        "type": "keyword"
+                    },
+                    "user_department": {
+                        "type": "keyword"
+                    },
+                    "rating": {
+                        "type": "byte"
+                    },
+                    "query": {
+                        "type": "text",
+                        "index": False
+                    },
+                    "timestamp": {
+                        "type": "date"
+                    },
+                    "ingested_at": {
+                        "type": "date"
+                    }
+                }
+            },
+            "settings": {
+                "index": {
+                    "number_of_shards": 1,
+                    "number_of_replicas": 0
+                }
+            }
+        }
+
+    def create_rating_events_index(self):
+        """Create the index the API appends rating events to."""
+        return self._create_auxiliary_index(self.config['rating_events_index'], self.get_rating_events_mapping())
+
+    def get_analytics_mapping(self):
+        """Get the mapping for the search/click/LLM analytics events index."""
+        return {
+            "mappings": {
+                "properties": {
+                    "event_id": {"type": "keyword"},
+                    "event_type": {"type": "keyword"},
+                    "timestamp": {"type": "date"},
+                    "sample_rate": {"type": "float"},
+                    "user_id": {"type": "keyword"},
+                    "user_department": {"type": "keyword"},
+                    "user_role": {"type": "keyword"},
+                    # Searches and clicks
+                    "search_id": {"type": "keyword"},
+                    "query": {
+                        "type": "text",
+                        "fields": {
+                            "keyword": {"type": "keyword", "ignore_above": 256}
+                        }
+                    },
+                    "filters": {"type": "object", "enabled": False},
+                    "total": {"type": "integer"},
+                    "took_ms": {"type": "integer"},
+                    "result_ids": {"type": "keyword"},
+                    "document_id": {"type": "keyword"},
+                    "position": {"type": "integer"},
+                    # LLM calls
+                    "route": {"type": "keyword"},
+                    "lane": {"type": "keyword"},
+                    "upstream": {"type": "keyword"},
+                    "model": {"type": "keyword"},
+                    "latency_ms": {"type": "float"},
+                    "estimated_tokens": {"type": "integer"},
+                    "success": {"type": "boolean"}
+                }
+            },
+            "settings": {
+                "index": {
+                    "number_of_shards": 1,
+                    "number_of_replicas": 0
+                }
+            }
+        }
+
+    def create_analytics_index(self):
+        """Create the index the API analytics pipeline writes events to."""
+        return self._create_auxiliary_index(self.config['analytics_index'], self.get_analytics_mapping())
+
+    def _create_auxiliary_index(self, index_name, mapping):
+        """Create a supporting index, honouring FORCE_RECREATE."""
+        try:
+            if self.es.indices.exists(index=index_name):
+                if not self.config['force_recreate']:
+                    print(f"ℹ️  Index '{index_name}' already exists")
+                    return True
+                print(f"🗑️  Force recreate enabled - deleting existing index: {index_name}")
+                self.es.indices.delete(index=index_name)
+            
+            self.es.indices.create(index=index_name, body=mapping)
+            print(f"✅ Created index: {index_name}")
+            return True
+        except Exception as e:
+            print(f"❌ Failed to create index '{index_name}': {e}")
+            return False
+
+    def get_search_application_config(self, collapse=None):
+        """Get the search application configuration; collapse defaults to COLLAPSE_DUPLICATES."""
+        if collapse is None:
+            collapse = self.config['collapse_duplicates']
         # Build query clauses
         should_clauses = []
         highlight_fields = {
@@ -346,39 +1009,21 @@ class ElasticsearchSetup:
         
         # Add semantic search clauses if enabled
         if self.config['semantic_enabled']:
-            prefix = self.config['semantic_field_prefix']
             semantic_weight = self.config['hybrid_weight']
+            semantic_fields = semantic_query_fields(
+                self.config['semantic_field_prefix'], self.config['semantic_field_mode']
+            )
             
-            should_clauses.extend([
-                {
-                    "semantic": {
-                        "field": f"{prefix}title",
-                        "query": "{{query_string}}",
-                        "boost": semantic_weight * 1.5
-                    }
-                },
-                {
-                    "semantic": {
-                        "field": f"{prefix}content",
-                        "query": "{{query_string}}",
-                        "boost": semantic_weight
-                    }
-                },
-                {
+            for field, boost in semantic_fields:
+                should_clauses.append({
                     "semantic": {
-                        "field": f"{prefix}summary",
+                        "field": field,
                         "query": "{{query_string}}",
-                        "boost": semantic_weight * 1.2
+                        "boost": semantic_weight * boost
                     }
-                }
-            ])
-            
-            # Add semantic fields to highlighting
-            highlight_fields.update({
-                f"{prefix}title": {},
-                f"{prefix}content": {},
-                f"{prefix}summary": {}
-            })
+                })
+                # Add semantic fields to highlighting
+                highlight_fields[field] = {}
         
         # Add traditional lexical search
         lexical_weight = 1.0 - (self.config['hybrid_weight'] if self.config['semantic_enabled'] else 0.0)
@@ -392,29 +1037,72 @@ class ElasticsearchSetup:
             }
         })
         
+        # Match passages and return the best ones as inner hits
+        if self.config['passages_enabled']:
+            should_clauses.append({
+                "nested": {
+                    "path": "passages",
+                    "query": {
+                        "match": {
+                            "passages.text": "{{query_string}}"
+                        }
+                    },
+                    "score_mode": "max",
+                    "boost": lexical_weight,
+                    "inner_hits": {
+                        "size": self.config['passages_per_hit'],
+                        "_source": ["passages.text", "passages.offset"]
+                    }
+                }
+            })
+        
+        # Ratings, freshness and department only add to the score of matching
+        # documents instead of sorting, so top-k early termination still applies
+        boost_clauses = [
+            {
+                "term": {
+                    "department": {
+                        "value": "{{user_department}}",
+                        "boost": self.config['department_boost']
+                    }
+                }
+            }
+        ]
+        if self.config['rating_boost'] > 0:
+            boost_clauses.append({
+                "rank_feature": {
+                    "field": "ratings.rank",
+                    "saturation": {"pivot": 1.0},
+                    "boost": self.config['rating_boost']
+                }
+            })
+        if self.config['freshness_boost'] > 0:
+            boost_clauses.append({
+                "distance_feature": {
+                    "field": "timestamp",
+                    "origin": "now",
+                    "pivot": self.config['freshness_pivot'],
+                    "boost": self.config['freshness_boost']
+                }
+            })
+        
         config = {
-            "indices": [self.index_name],
+            # Concrete indices; reindex re-points the app after swapping the alias
+            "indices": self._backing_indices(),
             "template": {
                 "script": {
                     "source": {
                         "query": {
                             "bool": {
-                                "should": should_clauses,
-                                "minimum_should_match": 1,
-                                "filter": [
-                                    # Add department boost as filter
+                                "must": [
                                     {
                                         "bool": {
-                                            "should": [
-                                                {
-                                                    "term": {
-                                                        "department": "{{user_department}}"
-                                                    }
-                                                }
-                                            ]
+                                            "should": should_clauses,
+                                            "minimum_should_match": 1
                                         }
                                     }
-                                ]
+                                ],
+                                "should": boost_clauses
                             }
                         },
                         "highlight": {
@@ -422,17 +1110,6 @@ class ElasticsearchSetup:
                             "pre_tags": ["<mark>"],
                             "post_tags": ["</mark>"]
                         },
-                        "sort": [
-                            {
-                                "_score": {"order": "desc"}
-                            },
-                            {
-                                "ratings.score": {
-                                    "order": "desc",
-                                    "missing": "_last"
-                                }
-                            }
-                        ],
                         "size": "{{size}}",
                         "from": "{{from}}"
                     }
@@ -440,12 +1117,29 @@ class ElasticsearchSetup:
             }
         }
         
+        if collapse:
+            config["template"]["script"]["source"]["collapse"] = {"field": "dup_cluster"}
+        
         return config
 
+    def _collapse_allowed(self):
+        """Whether COLLAPSE_DUPLICATES can be applied: every document must already have a dup_cluster."""
+        if not self.config['collapse_duplicates']:
+            return False
+        # Collapse would put every document without a cluster id into one result
+        missing = self.es.count(
+            index=self.index_name,
+            query={"bool": {"must_not": [{"exists": {"field": "dup_cluster"}}]}}
+        )['count']
+        if missing:
+            print(f"⚠️  {missing} documents have no dup_cluster, so the Search Application won't collapse duplicates")
+            print("   Run `python dedup.py` to backfill them, then `reindex` or recreate the Search Application")
+            return False
+        return True
+
     def create_search_application(self):
         """Create an Elasticsearch Search Application for the enterprise search."""
         app_name = self.config['search_app_name']
-        search_app_config = self.get_search_application_config()
         
         try:
             # Check if search application already exists
@@ -463,6 +1157,7 @@ class ElasticsearchSetup:
                 print(f"🔍 Creating new Search Application '{app_name}'...")
             
             # Create the search application
+            search_app_config = self.get_search_application_config(collapse=self._collapse_allowed())
             response = self.es.search_application.put(name=app_name, body=search_app_config)
             print(f"✅ Search Application '{app_name}' created successfully")
             
@@ -510,6 +1205,18 @@ class ElasticsearchSetup:
         except Exception as e:
             print(f"❌ Failed to export mapping: {e}")
 
+    def export_profiles_to_files(self, prefix="elasticsearch_mapping"):
+        """Export the mapping as each index profile would build it, for review and benchmarking."""
+        for profile in INDEX_PROFILES:
+            filename = f"{prefix}.{profile}.json"
+            try:
+                with open(filename, 'w') as f:
+                    json.dump(self.get_index_mapping(profile), f, indent=2)
+            except Exception as e:
+                print(f"❌ Failed to export {profile} profile: {e}")
+                return
+        print(f"✅ Index profiles exported to {prefix}.<profile>.json ({', '.join(INDEX_PROFILES)})")
+
     def export_search_app_to_file(self, filename="search_application.json"):
         """Export the search application configuration to a JSON file."""
         config = self.get_search_application_config()
@@ -544,16 +1251,24 @@ class ElasticsearchSetup:
         
         # Check mapping
         try:
+            # Keyed by the concrete index behind the alias
             mapping = self.es.indices.get_mapping(index=self.index_name)
-            properties = mapping[self.index_name]['mappings']['properties']
+            properties = next(iter(mapping.body.values()))['mappings']['properties']
             
             required_fields = ['title', 'content', 'ratings', 'user_ratings']
             
             # Add semantic fields to validation if enabled
             if self.config['semantic_enabled']:
-                prefix = self.config['semantic_field_prefix']
-                semantic_required = [f"{prefix}title", f"{prefix}content", f"{prefix}summary"]
-                required_fields.extend(semantic_required)
+                semantic_required = semantic_field_names(
+                    self.config['semantic_field_prefix'], self.config['semantic_field_mode']
+                ).values()
+                required_fields.extend(dict.fromkeys(semantic_required))
+            
+            if self.config['vector_enabled']:
+                required_fields.append(self.config['vector_field'])
+            
+            if self.config['passages_enabled']:
+                required_fields.append('passages')
             
             missing_fields = [field for field in required_fields if field not in properties]
             
@@ -605,13 +1320,151 @@ class ElasticsearchSetup:
         
         return validation_results
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Set up Elasticsearch for enterprise search")
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('setup', help="Create the index, supporting indices and search application (default)")
+    reindex = subparsers.add_parser(
+        'reindex', help="Apply the current mapping with a zero-downtime copy into a new index and alias swap"
+    )
+    reindex.add_argument('--slices', type=lambda value: value if value == 'auto' else int(value), default='auto',
+                         help="Parallel _reindex slices, or 'auto' for one per shard (default: auto)")
+    reindex.add_argument('--requests-per-second', type=float,
+                         default=float(os.getenv('REINDEX_REQUESTS_PER_SECOND', '-1')),
+                         help="Throttle in documents per second across all slices, -1 for none "
+                              "(default: REINDEX_REQUESTS_PER_SECOND or -1)")
+    reindex.add_argument('--keep-old', type=int, default=1,
+                         help="Previous index versions to keep for rollback (default: 1)")
+    reindex.add_argument('--poll-seconds', type=float, default=5.0, help="Progress report interval (default: 5)")
+    snapshot = subparsers.add_parser(
+        'snapshot', help="Snapshot the loaded index, embeddings included, to the SNAPSHOT_LOCATION repository"
+    )
+    snapshot.add_argument('--name', help="Snapshot name (default: <index>-<UTC timestamp>)")
+    restore = subparsers.add_parser(
+        'restore', help="Bootstrap an environment from a snapshot instead of regenerating the data"
+    )
+    restore.add_argument('--snapshot', help="Snapshot to restore (default: the newest one of ELASTIC_INDEX)")
+    restore.add_argument('--mapping-file',
+                         help="Check the snapshot against this exported mapping (default: the current configuration)")
+    restore.add_argument('--force', action='store_true', help="Restore even if the mapping or embedder differs")
+    restore.add_argument('--keep-old', type=int, default=1,
+                         help="Previous index versions to keep for rollback (default: 1)")
+    args = parser.parse_args()
+    args.command = args.command or 'setup'
+    return args
+
+
+def run_reindex(setup, args):
+    """Blue/green reindex of ELASTIC_INDEX with the mapping from the current configuration."""
+    print("Enterprise Search - Zero-Downtime Reindex")
+    print("=" * 50)
+    
+    if not setup.test_connection():
+        return False
+    
+    try:
+        started = time.time()
+        if not setup.reindex(
+            slices=args.slices,
+            requests_per_second=args.requests_per_second,
+            keep_old=args.keep_old,
+            poll_seconds=args.poll_seconds
+        ):
+            return False
+        print(f"\n✅ Reindex completed in {time.time() - started:.1f}s")
+        setup.validate_setup()
+        return True
+    
+    except KeyboardInterrupt:
+        print(f"\n\n⏹️  Reindex cancelled by user")
+        return False
+    
+    except Exception as e:
+        print(f"❌ Reindex failed: {e}")
+        if setup.config['debug']:
+            import traceback
+            traceback.print_exc()
+        return False
+
+
+def run_snapshot(setup, args):
+    """Snapshot ELASTIC_INDEX so other environments can restore it instead of reloading."""
+    print("Enterprise Search - Index Snapshot")
+    print("=" * 50)
+    
+    if not setup.test_connection():
+        return False
+    
+    try:
+        return setup.create_snapshot(args.name)
+    except Exception as e:
+        print(f"❌ Snapshot failed: {e}")
+        print(f"   Check that SNAPSHOT_LOCATION ({setup.config['snapshot_location']}) is listed in path.repo")
+        print("   in elasticsearch.yml on every node")
+        return False
+
+
+def run_restore(setup, args):
+    """Bring up a loaded environment from a snapshot: model, documents, then the supporting resources."""
+    print("Enterprise Search - Restore From Snapshot")
+    print("=" * 50)
+    
+    if not setup.test_connection():
+        return False
+    
+    try:
+        # The restored embeddings are reused, but queries still need the inference endpoint
+        print("\n🤖 Setting up semantic search model...")
+        setup.deploy_semantic_model()
+        
+        print("\n📦 Restoring documents...")
+        if not setup.restore_snapshot(args.snapshot, args.mapping_file, args.force, args.keep_old):
+            return False
+        
+        print("\n👍 Setting up rating events index...")
+        setup.create_rating_events_index()
+        print("\n📊 Setting up search analytics index...")
+        setup.create_analytics_index()
+        print("\n🔔 Setting up saved-search alerting...")
+        setup.create_percolator_indices()
+        print("\n🔍 Setting up search application...")
+        setup.create_search_application()
+        
+        setup.validate_setup()
+        print("\n✅ Environment restored")
+        print("   Run `python ingest_manifest.py` on ingestion hosts so re-runs skip the restored documents")
+        return True
+    
+    except KeyboardInterrupt:
+        print(f"\n\n⏹️  Restore cancelled by user")
+        return False
+    
+    except Exception as e:
+        print(f"❌ Restore failed: {e}")
+        if setup.config['debug']:
+            import traceback
+            traceback.print_exc()
+        return False
+
+
+COMMANDS = {
+    'reindex': run_reindex,
+    'snapshot': run_snapshot,
+    'restore': run_restore
+}
+
+
 def main():
     """Main function to set up Elasticsearch for enterprise search."""
+    args = parse_args()
+    setup = ElasticsearchSetup()
+    
+    if args.command in COMMANDS:
+        return COMMANDS[args.command](setup, args)
+    
     print("Enterprise Search - Elasticsearch Setup")
     print("=" * 50)
     
-    setup = ElasticsearchSetup()
-    
     try:
         # Test connection
         if not setup.test_connection():
@@ -638,11 +1491,21 @@ def main():
         print("\n📄 Setting up index mappings...")
         index_created = setup.create_index()
         
+        print("\n👍 Setting up rating events index...")
+        setup.create_rating_events_index()
+        
+        print("\n📊 Setting up search analytics index...")
+        setup.create_analytics_index()
+        
+        print("\n🔔 Setting up saved-search alerting...")
+        setup.create_percolator_indices()
+        
         print("\n🔍 Setting up search application...")
         search_app_created = setup.create_search_application()
         
         print("\n📁 Exporting configurations...")
         setup.export_mapping_to_file()
+        setup.export_profiles_to_files()
         setup.export_search_app_to_file()
         
         # Validate setup
@@ -668,6 +1531,18 @@ def main():
             print(f"   REACT_APP_SEMANTIC_FIELD_PREFIX={setup.config['semantic_field_prefix']}")
             print(f"   REACT_APP_HYBRID_WEIGHT={setup.config['hybrid_weight']}")
         
+        # The API compiles queries for the index layout, so it must match
+        if setup.config['semantic_enabled'] or setup.config['vector_enabled'] or setup.config['collapse_duplicates']:
+            print("\n   # API (api/.env)")
+        if setup.config['semantic_enabled']:
+            print(f"   ELASTICSEARCH_SEMANTIC_FIELD_MODE={setup.config['semantic_field_mode']}")
+        if setup.config['vector_enabled']:
+            print("   ELASTICSEARCH_VECTOR_ENABLED=true")
+            print(f"   ELASTICSEARCH_VECTOR_FIELD={setup.config['vector_field']}")
+            print(f"   EMBEDDER_DIMS={setup.config['vector_dims']}")
+        if setup.config['collapse_duplicates']:
+            print("   ELASTICSEARCH_COLLAPSE_DUPLICATES=true")
+        
         print("3. Start your React development server")
         
         return True
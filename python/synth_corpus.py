@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Benchmark Corpus Synthesiser for Enterprise Search
+Writes seeded, sharded NDJSON corpora in _bulk format (an action line followed
+by the document) for capacity testing at 10k to 10M documents.
+
+Random choices for a whole shard are drawn in vectorised NumPy batches and all
+free text comes from fragment pools generated once up front, so Faker never
+runs per document. Each shard has its own seed derived from the corpus seed,
+which makes shards independent of one another and of the number of worker
+processes: the same seed and options reproduce every file byte for byte.
+Near-duplicate clusters (dup_cluster) are assigned within each shard for the
+same reason; `python dedup.py` after loading clusters across shards.
+"""
+
+import argparse
+import gzip
+import hashlib
+import itertools
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+
+import numpy as np
+import faker
+from faker import Faker
+from dotenv import load_dotenv
+
+from corpus_data import (
+    DEPARTMENTS, EMPLOYEES, ENTERPRISE_TOPICS, USER_IDS, RATING_QUERIES,
+    CONFLUENCE_DOC_TYPES, CONFLUENCE_SPACES, CONFLUENCE_PROJECTS, CONFLUENCE_CONTENT_TEMPLATES, CONFLUENCE_TAG_LEVELS,
+    JIRA_TICKET_TYPES, JIRA_PRIORITIES, JIRA_STATUSES, JIRA_PROJECT_KEYS, JIRA_PROJECTS, JIRA_TITLE_TEMPLATES,
+    SHAREPOINT_DOC_TYPES, SHAREPOINT_SITES, SHAREPOINT_EXTENSIONS, SHAREPOINT_CONTENT_TEMPLATES,
+    rating_rank
+)
+from passages import split_into_passages
+from ingest_manifest import document_id, document_hash
+from semantic_fields import add_client_semantic_fields, validate_mode
+from embedders import embed_documents, load_embedder, load_embedder_config
+from dedup import NearDuplicateIndex, load_dedup_config
+
+load_dotenv()
+
+PRESETS = {
+    '10k': 10_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000
+}
+
+# Same source mix as the gen_test_data defaults (30 / 25 / 20)
+SOURCES = ['confluence', 'jira', 'sharepoint']
+SOURCE_WEIGHTS = np.array([30, 25, 20]) / 75
+# Document age windows per source, in days
+SOURCE_AGE_DAYS = np.array([365, 182, 730])
+# Free-text fragment length per source, matching the fake.text() sizes
+SOURCE_TEXT_CHARS = [500, 300, 400]
+
+# Larger pools repeat text less often but take longer to build
+TEXT_POOL_SIZE = 4096
+PHRASE_POOL_SIZE = 2048
+
+# Rating mix matches generate_ratings_data
+RATED_FRACTION = 0.4
+MAX_RATINGS_PER_DOC = 5
+VOTE_VALUES = np.array([1, -1, 0])
+VOTE_WEIGHTS = np.array([0.6, 0.2, 0.2])
+RATING_AGE_DAYS = 90
+
+# Documents serialised per write call
+WRITE_BATCH = 1000
+
+# Set in each worker process by _init_worker
+_pools = None
+
+
+def build_fragment_pools(seed):
+    """Generate the text pools every shard draws from; deterministic for a given seed and Faker version."""
+    fake = Faker()
+    fake.seed_instance(seed)
+    return {
+        'text': {
+            chars: [fake.text(max_nb_chars=chars) for _ in range(TEXT_POOL_SIZE)]
+            for chars in sorted(set(SOURCE_TEXT_CHARS))
+        },
+        'phrases': [fake.catch_phrase() for _ in range(PHRASE_POOL_SIZE)]
+    }
+
+
+def _init_worker(pools):
+    global _pools
+    _pools = pools
+
+
+def _pick(values, fraction):
+    """Map a uniform draw in [0, 1) onto a list element."""
+    return values[int(fraction * len(values))]
+
+
+class ShardSynthesiser:
+    def __init__(self, options, pools):
+        """Initialize with the corpus options and the shared fragment pools."""
+        self.options = options
+        self.pools = pools
+        self.embedder = load_embedder(options['embedder_config']) if options['vectors_enabled'] else None
+        self.anchor = datetime.fromisoformat(options['anchor_date'])
+
+    def generate(self, shard_index, start, count):
+        """Yield (document_id, document) for one shard, with dup_cluster ids and vectors when enabled."""
+        documents = self._generate_documents(shard_index, start, count)
+        # A fresh index per shard keeps clusters independent of the other shards and of --workers
+        dedup = (NearDuplicateIndex({**self.options['dedup_config'], 'index_file': None, 'skip_exact': False})
+                 if self.options['dedup_enabled'] else None)
+        if self.embedder is None and dedup is None:
+            yield from documents
+            return
+
+        embedder_config = self.options['embedder_config']
+        batch_size = embedder_config['batch_size'] if self.embedder else WRITE_BATCH
+        while True:
+            batch = list(itertools.islice(documents, max(1, batch_size)))
+            if not batch:
+                return
+            if dedup:
+                dedup.assign(batch)
+            if self.embedder:
+                embed_documents(self.embedder, [doc for _, doc in batch], embedder_config)
+            yield from batch
+
+    def _generate_documents(self, shard_index, start, count):
+        seed_sequence = np.random.SeedSequence(self.options['seed'], spawn_key=(shard_index,))
+        rng = np.random.default_rng(seed_sequence)
+
+        # One vectorised draw per attribute for the whole shard
+        sources = rng.choice(len(SOURCES), size=count, p=SOURCE_WEIGHTS)
+        topics = rng.integers(len(ENTERPRISE_TOPICS), size=count)
+        authors = rng.integers(len(EMPLOYEES), size=count)
+        departments = rng.integers(len(DEPARTMENTS), size=count)
+        texts = rng.integers(TEXT_POOL_SIZE, size=count)
+        phrases = rng.integers(PHRASE_POOL_SIZE, size=count)
+        ages = (rng.random(count) * SOURCE_AGE_DAYS[sources] * 86400).astype(np.int64)
+        # Per-source categorical choices (type, template, status...) share one uniform matrix
+        picks = rng.random((count, 7))
+
+        rated = rng.random(count) < RATED_FRACTION
+        rating_counts = rng.integers(1, MAX_RATINGS_PER_DOC + 1, size=count)
+        rating_users = rng.integers(len(USER_IDS), size=(count, MAX_RATINGS_PER_DOC))
+        rating_values = VOTE_VALUES[rng.choice(len(VOTE_VALUES), size=(count, MAX_RATINGS_PER_DOC), p=VOTE_WEIGHTS)]
+        rating_ages = (rng.random((count, MAX_RATINGS_PER_DOC)) * RATING_AGE_DAYS * 86400).astype(np.int64)
+        rating_queries = rng.integers(len(RATING_QUERIES), size=(count, MAX_RATINGS_PER_DOC))
+
+        builders = (self._confluence, self._jira, self._sharepoint)
+        for offset in range(count):
+            position = start + offset
+            source = sources[offset]
+            topic = ENTERPRISE_TOPICS[topics[offset]]
+            author = EMPLOYEES[authors[offset]]
+            department = DEPARTMENTS[departments[offset]]
+            text = self.pools['text'][SOURCE_TEXT_CHARS[source]][texts[offset]]
+
+            doc = builders[source](position, topic, author, department, text, phrases[offset], picks[offset])
+            doc['timestamp'] = (self.anchor - timedelta(seconds=int(ages[offset]))).isoformat()
+
+            if rated[offset]:
+                doc.update(self._ratings(
+                    rating_counts[offset], rating_users[offset], rating_values[offset],
+                    rating_ages[offset], rating_queries[offset]
+                ))
+            else:
+                doc['ratings'] = {'rank': rating_rank(0.0)}
+
+            if self.options['semantic_enabled']:
+                add_client_semantic_fields(doc, self.options['semantic_field_prefix'], self.options['semantic_field_mode'])
+
+            if self.options['passages_enabled']:
+                doc['passages'] = split_into_passages(
+                    doc['content'],
+                    max_chars=self.options['passage_max_chars'],
+                    overlap_chars=self.options['passage_overlap_chars']
+                )
+
+            # Stable ids and content hashes let later incremental runs skip these documents
+            doc['content_hash'] = document_hash(doc, self.options['semantic_field_prefix'])
+            yield document_id(doc), doc
+
+    def _confluence(self, position, topic, author, department, text, phrase, picks):
+        doc_type = _pick(CONFLUENCE_DOC_TYPES, picks[0])
+        space = _pick(CONFLUENCE_SPACES, picks[1])
+        content = _pick(CONFLUENCE_CONTENT_TEMPLATES, picks[2]).format(topic=topic)
+        content += f" Last updated by {author} from {department} department. "
+        content += f"Document status: {'Final' if picks[3] > 0.3 else 'Draft'}. "
+
+        tags = [topic.replace(' ', '_'), department.lower().replace(' ', '_')]
+        if picks[4] > 0.5:
+            tags.extend(['enterprise', 'documentation', _pick(CONFLUENCE_TAG_LEVELS, picks[5])])
+
+        return {
+            'title': f"{doc_type}: {topic.title()} - {self.pools['phrases'][phrase]}",
+            'content': content + " " + text,
+            'summary': content[:200] + "...",
+            'source': 'confluence',
+            'content_type': 'document',
+            'author': author,
+            'department': department,
+            # Positions keep synthetic URLs unique across the corpus
+            'url': f"https://company.atlassian.net/wiki/spaces/{space}/pages/{1000000 + position}",
+            'tags': tags,
+            'space': space,
+            'project': f"Project {_pick(CONFLUENCE_PROJECTS, picks[6])}"
+        }
+
+    def _jira(self, position, topic, author, department, text, phrase, picks):
+        ticket_type = _pick(JIRA_TICKET_TYPES, picks[0])
+        priority = _pick(JIRA_PRIORITIES, picks[1])
+        status = _pick(JIRA_STATUSES, picks[2])
+        title_templates = JIRA_TITLE_TEMPLATES.get(ticket_type, JIRA_TITLE_TEMPLATES['default'])
+
+        content = f"Task details for {topic} implementation. "
+        content += "Requirements include security compliance, performance optimization, and user experience. "
+        content += f"Assigned to {author} ({department}). Priority: {priority}. Status: {status}. "
+
+        tags = [ticket_type.lower(), priority.lower(), topic.replace(' ', '_')]
+        if priority in ['Critical', 'High']:
+            tags.append('urgent')
+
+        return {
+            'title': _pick(title_templates, picks[3]).format(topic=topic),
+            'content': content + " " + text,
+            'summary': content[:150] + "...",
+            'source': 'jira',
+            'content_type': 'ticket',
+            'author': author,
+            'department': department,
+            'url': f"https://company.atlassian.net/browse/{_pick(JIRA_PROJECT_KEYS, picks[4])}-{position + 1}",
+            'tags': tags,
+            'priority': priority,
+            'status': status,
+            'project': f"Enterprise-{_pick(JIRA_PROJECTS, picks[5])}"
+        }
+
+    def _sharepoint(self, position, topic, author, department, text, phrase, picks):
+        doc_type = _pick(SHAREPOINT_DOC_TYPES, picks[0])
+        site = _pick(SHAREPOINT_SITES, picks[1])
+        content = _pick(SHAREPOINT_CONTENT_TEMPLATES, picks[2]).format(topic=topic, doc_type=doc_type.lower())
+        content += f" Document owner: {author} ({department}). "
+        content += f"Classification: {'Confidential' if picks[3] > 0.7 else 'Internal Use'}. "
+        extension = _pick(SHAREPOINT_EXTENSIONS, picks[4])
+
+        tags = [doc_type.lower().replace(' ', '_'), topic.replace(' ', '_'), 'sharepoint']
+        if 'compliance' in doc_type.lower() or 'policy' in doc_type.lower():
+            tags.extend(['regulatory', 'mandatory'])
+
+        return {
+            'title': f"{doc_type}: {topic.title()} Guidelines",
+            'content': content + " " + text,
+            'summary': content[:180] + "...",
+            'source': 'sharepoint',
+            'content_type': 'document',
+            'author': author,
+            'department': department,
+            'url': f"https://company.sharepoint.com/sites/{site}/Documents/{topic.replace(' ', '_')}_{position}{extension}",
+            'tags': tags,
+            'site': site,
+            'project': f"Initiative-{2023 + int(picks[5] * 2)}"
+        }
+
+    def _ratings(self, count, users, values, ages, queries):
+        user_ratings = []
+        seen = set()
+        for slot in range(count):
+            user_id = USER_IDS[users[slot]]
+            if user_id in seen:
+                continue
+            seen.add(user_id)
+            user_ratings.append({
+                "user_id": user_id,
+                "rating": int(values[slot]),
+                "timestamp": (self.anchor - timedelta(seconds=int(ages[slot]))).isoformat(),
+                "query": RATING_QUERIES[queries[slot]]
+            })
+
+        positive_count = sum(1 for ur in user_ratings if ur['rating'] > 0)
+        negative_count = sum(1 for ur in user_ratings if ur['rating'] < 0)
+        total_ratings = positive_count + negative_count
+        score = (positive_count - negative_count) / total_ratings if total_ratings else 0.0
+        return {
+            "ratings": {
+                "positive_count": positive_count,
+                "negative_count": negative_count,
+                "total_ratings": total_ratings,
+                "score": round(score, 2),
+                "rank": rating_rank(score),
+                "last_updated": max(ur['timestamp'] for ur in user_ratings)
+            },
+            "user_ratings": user_ratings
+        }
+
+
+def write_shard(task):
+    """Write one shard file and return its manifest entry."""
+    shard_index, start, count, options = task
+    suffix = '.ndjson.gz' if options['gzip'] else '.ndjson'
+    filename = f"{options['prefix']}-{shard_index:05d}{suffix}"
+    path = os.path.join(options['output_dir'], filename)
+
+    synthesiser = ShardSynthesiser(options, _pools)
+    with open(path, 'wb') as raw:
+        # mtime=0 and no embedded filename keep compressed output reproducible
+        out = gzip.GzipFile(filename='', mode='wb', fileobj=raw, mtime=0) if options['gzip'] else raw
+        lines = []
+        for doc_id, doc in synthesiser.generate(shard_index, start, count):
+            lines.append(json.dumps({"index": {"_id": doc_id}}, separators=(',', ':')))
+            lines.append(json.dumps(doc, ensure_ascii=False, separators=(',', ':')))
+            if len(lines) >= WRITE_BATCH * 2:
+                out.write(('\n'.join(lines) + '\n').encode('utf-8'))
+                lines = []
+        if lines:
+            out.write(('\n'.join(lines) + '\n').encode('utf-8'))
+        if out is not raw:
+            out.close()
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as written:
+        for block in iter(lambda: written.read(1 << 20), b''):
+            digest.update(block)
+
+    return {
+        "file": filename,
+        "shard": shard_index,
+        "first_position": start,
+        "documents": count,
+        "bytes": os.path.getsize(path),
+        "sha256": digest.hexdigest()
+    }
+
+
+def synthesise(options):
+    """Build the corpus described by options; returns the manifest."""
+    os.makedirs(options['output_dir'], exist_ok=True)
+    total = options['documents']
+    shard_size = options['shard_size']
+    tasks = [
+        (shard_index, start, min(shard_size, total - start), options)
+        for shard_index, start in enumerate(range(0, total, shard_size))
+    ]
+
+    print(f"🧱 Building fragment pools (seed {options['seed']})...")
+    pools = build_fragment_pools(options['seed'])
+
+    print(f"🏭 Writing {total:,} documents to {len(tasks)} shards with {options['workers']} workers...")
+    started = time.monotonic()
+    shards = []
+    with Pool(options['workers'], initializer=_init_worker, initargs=(pools,)) as pool:
+        for entry in pool.imap_unordered(write_shard, tasks):
+            shards.append(entry)
+            written = sum(shard['documents'] for shard in shards)
+            rate = written / max(time.monotonic() - started, 1e-9)
+            print(f"   Shard {entry['shard']:05d} done - {written:,}/{total:,} documents ({rate:,.0f} docs/s)")
+
+    shards.sort(key=lambda shard: shard['shard'])
+    manifest = {
+        "seed": options['seed'],
+        "documents": total,
+        "shard_size": shard_size,
+        "anchor_date": options['anchor_date'],
+        "semantic_enabled": options['semantic_enabled'],
+        "semantic_field_mode": options['semantic_field_mode'],
+        "embedder": options['embedder_config']['embedder'] if options['vectors_enabled'] else None,
+        "passages_enabled": options['passages_enabled'],
+        "dedup_enabled": options['dedup_enabled'],
+        # Fragment pools depend on the Faker version, so reproductions should match it
+        "faker_version": faker.VERSION,
+        "numpy_version": np.__version__,
+        "shards": shards
+    }
+    manifest_path = os.path.join(options['output_dir'], f"{options['prefix']}-manifest.json")
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    elapsed = time.monotonic() - started
+    print(f"✅ Wrote {total:,} documents in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} docs/s)")
+    print(f"📁 Manifest: {manifest_path}")
+    return manifest
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate a seeded, sharded benchmark corpus in _bulk NDJSON format")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument('--preset', choices=sorted(PRESETS), default='10k', help="Corpus size preset (default: 10k)")
+    size.add_argument('--docs', type=int, help="Exact number of documents (overrides --preset)")
+    parser.add_argument('--seed', type=int, default=int(os.getenv('SYNTH_SEED', '42')), help="Corpus seed (default: 42)")
+    parser.add_argument('--output-dir', default=os.getenv('SYNTH_OUTPUT_DIR', 'corpus'), help="Output directory (default: corpus)")
+    parser.add_argument('--shard-size', type=int, default=int(os.getenv('SYNTH_SHARD_SIZE', '100000')), help="Documents per shard file")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count)")
+    parser.add_argument('--gzip', action='store_true', help="Write gzip-compressed shards")
+    parser.add_argument('--anchor-date', default='2025-01-01T00:00:00', help="Timestamps are generated backwards from this date")
+    parser.add_argument('--semantic', action=argparse.BooleanOptionalAction,
+                        default=os.getenv('SEMANTIC_ENABLED', 'true').lower() == 'true',
+                        help="Include semantic_* copies of title/content/summary when SEMANTIC_FIELD_MODE=client (default: SEMANTIC_ENABLED)")
+    parser.add_argument('--passages', action=argparse.BooleanOptionalAction,
+                        default=os.getenv('PASSAGES_ENABLED', 'true').lower() == 'true',
+                        help="Include nested passages (default: PASSAGES_ENABLED)")
+    parser.add_argument('--dedup', action=argparse.BooleanOptionalAction,
+                        default=os.getenv('DEDUP_ENABLED', 'true').lower() == 'true',
+                        help="Assign near-duplicate dup_cluster ids within each shard (default: DEDUP_ENABLED)")
+    parser.add_argument('--vectors', action=argparse.BooleanOptionalAction,
+                        default=os.getenv('VECTOR_ENABLED', 'false').lower() == 'true',
+                        help="Include client-side embeddings from EMBEDDER (default: VECTOR_ENABLED); "
+                             "only the hashing embedder is reproducible")
+    return parser.parse_args()
+
+
+def main():
+    """Main function to synthesise a benchmark corpus."""
+    args = parse_args()
+    documents = args.docs if args.docs is not None else PRESETS[args.preset]
+
+    print("Enterprise Search - Benchmark Corpus Synthesiser")
+    print("=" * 50)
+
+    options = {
+        'documents': documents,
+        'seed': args.seed,
+        'output_dir': args.output_dir,
+        'prefix': f"corpus-{args.seed}",
+        'shard_size': args.shard_size,
+        'workers': max(1, args.workers),
+        'gzip': args.gzip,
+        'anchor_date': args.anchor_date,
+        'semantic_enabled': args.semantic,
+        'semantic_field_prefix': os.getenv('SEMANTIC_FIELD_PREFIX', 'semantic_'),
+        'semantic_field_mode': validate_mode(os.getenv('SEMANTIC_FIELD_MODE', 'client')),
+        'passages_enabled': args.passages,
+        'passage_max_chars': int(os.getenv('PASSAGE_MAX_CHARS', '600')),
+        'passage_overlap_chars': int(os.getenv('PASSAGE_OVERLAP_CHARS', '100')),
+        'vectors_enabled': args.vectors,
+        'embedder_config': load_embedder_config(),
+        'dedup_enabled': args.dedup,
+        'dedup_config': load_dedup_config()
+    }
+    synthesise(options)
+
+    suffix = '.ndjson.gz' if args.gzip else '.ndjson'
+    encoding = "-H 'Content-Encoding: gzip' " if args.gzip else ""
+    print("\n💡 Load the corpus with bulk_loader.py, or a single shard with the _bulk API, e.g.:")
+    print(f"   python bulk_loader.py {args.output_dir}")
+    print(f"   curl -H 'Content-Type: application/x-ndjson' {encoding}-XPOST "
+          f"'localhost:9200/<index>/_bulk' --data-binary @{args.output_dir}/{options['prefix']}-00000{suffix}")
+
+
+if __name__ == "__main__":
+    main()
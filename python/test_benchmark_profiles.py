@@ -0,0 +1,16 @@
+"""
+The profile benchmark must build its corpus with the options ShardSynthesiser expects
+"""
+import argparse
+
+from benchmark_profiles import ProfileBenchmark
+
+
+def test_build_corpus():
+    # The client is created lazily, so no cluster is needed to build the corpus
+    args = argparse.Namespace(docs=50, expected_docs=None, seed=3, semantic=False)
+    corpus = ProfileBenchmark(args).build_corpus()
+
+    assert len(corpus) == 50
+    assert len({doc_id for doc_id, _ in corpus}) == 50
+    assert all(doc['title'] and doc['content_hash'] for _, doc in corpus)
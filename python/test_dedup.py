@@ -0,0 +1,90 @@
+"""
+MinHash estimates must track true Jaccard similarity and cluster near-duplicates stably
+"""
+import numpy as np
+
+from dedup import DUP_CLUSTER_FIELD, MinHasher, NearDuplicateIndex, load_dedup_config, shingle_hashes
+
+WORDS = [f"word{number}" for number in range(400)]
+
+
+def dedup_config(**overrides):
+    config = load_dedup_config()
+    config.update({'threshold': 0.8, 'num_perm': 128, 'bands': 16, 'shingle_size': 5, 'seed': 1,
+                   'skip_exact': False, 'index_file': None})
+    config.update(overrides)
+    return config
+
+
+def true_jaccard(a, b, shingle_size=5):
+    a, b = set(shingle_hashes(a, shingle_size).tolist()), set(shingle_hashes(b, shingle_size).tolist())
+    return len(a & b) / len(a | b)
+
+
+def test_minhash_estimates_jaccard():
+    rng = np.random.default_rng(3)
+    base = ' '.join(WORDS)
+    hasher = MinHasher(num_perm=256)
+    for changed in (2, 10, 40, 120):
+        words = list(WORDS)
+        for position in rng.choice(len(words), size=changed, replace=False):
+            words[position] = f"other{position}"
+        variant = ' '.join(words)
+
+        signatures, _ = hasher.signatures([base, variant])
+        estimate = (signatures[0] == signatures[1]).mean()
+        # Standard error of the estimate is at most 0.5 / sqrt(num_perm) ~ 0.03
+        assert abs(estimate - true_jaccard(base, variant)) < 0.1
+
+
+def test_near_duplicates_join_the_earliest_cluster():
+    index = NearDuplicateIndex(dedup_config())
+    original = {'title': 'Onboarding guide', 'content': ' '.join(WORDS)}
+    # One word changed out of 400 leaves a true Jaccard of about 0.98
+    near = {'title': 'Onboarding guide', 'content': ' '.join(WORDS[:200] + ['changed'] + WORDS[201:])}
+    distinct = {'title': 'Expense policy', 'content': ' '.join(reversed(WORDS))}
+    empty = {'title': '', 'content': ''}
+    assert true_jaccard(' '.join(WORDS), near['content']) > 0.95
+
+    kept, skipped = index.assign([('a', original), ('b', near), ('c', distinct), ('d', empty), ('e', dict(empty))])
+
+    assert skipped == 0 and len(kept) == 5
+    assert [doc[DUP_CLUSTER_FIELD] for _, doc in kept] == ['a', 'a', 'c', 'd', 'e']
+    assert index.cluster_count() == 4
+
+
+def test_exact_duplicates_are_skipped_or_clustered():
+    document = {'title': 'VPN setup', 'content': 'Install the client, then sign in with SSO.'}
+    # Case and punctuation are normalised away
+    copy = {'title': 'vpn setup', 'content': 'Install the client then sign in with SSO'}
+
+    kept, skipped = NearDuplicateIndex(dedup_config(skip_exact=True)).assign([('a', dict(document)), ('b', dict(copy))])
+    assert [doc_id for doc_id, _ in kept] == ['a'] and skipped == 1
+
+    kept, skipped = NearDuplicateIndex(dedup_config()).assign([('a', dict(document)), ('b', dict(copy))])
+    assert [doc[DUP_CLUSTER_FIELD] for _, doc in kept] == ['a', 'a'] and skipped == 0
+
+
+def test_reassigning_a_document_keeps_its_cluster():
+    index = NearDuplicateIndex(dedup_config())
+    document = {'title': 'Release notes', 'content': ' '.join(WORDS)}
+    index.assign([('a', dict(document)), ('b', dict(document))])
+
+    # An updated copy of a document is not its own duplicate
+    kept, _ = index.assign([('a', dict(document))])
+    assert kept[0][1][DUP_CLUSTER_FIELD] == 'a'
+    assert index.cluster_count() == 1
+
+
+def test_signatures_survive_a_save_and_load(tmp_path):
+    path = str(tmp_path / 'signatures.npz')
+    index = NearDuplicateIndex(dedup_config(index_file=path))
+    index.assign([('a', {'title': 'Security review', 'content': ' '.join(WORDS)})])
+    index.save()
+
+    reloaded = NearDuplicateIndex(dedup_config(index_file=path))
+    kept, _ = reloaded.assign([('b', {'title': 'Security review', 'content': ' '.join(WORDS[:-1])})])
+    assert kept[0][1][DUP_CLUSTER_FIELD] == 'a'
+
+    # Signatures built with other settings are ignored rather than misread
+    assert NearDuplicateIndex(dedup_config(index_file=path, seed=2)).cluster_count() == 0
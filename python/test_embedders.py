@@ -0,0 +1,60 @@
+"""
+Ingest and API embedders must put documents and queries in the same vector space
+"""
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'api'))
+
+import embedders
+from services import embedder as api_embedder
+from services.cache import TTLCache
+
+TEXTS = [
+    "Quarterly security review for the payments platform",
+    "",
+    "Release notes: v2.3 adds SSO, v2.4 fixes SSO!",
+    "Ünïcode café résumé 2024"
+]
+
+
+class RecordingEmbedder:
+    """A custom embedder written once against the shared contract"""
+
+    def __init__(self, dimensions, **options):
+        self.dimensions = dimensions
+        self.options = options
+
+    def embed(self, texts):
+        return [[float(len(text))] * self.dimensions for text in texts]
+
+
+def test_hashing_vectors_match_between_ingest_and_api():
+    for seed in ('0', '7'):
+        for dims in (8, 384):
+            for text in TEXTS:
+                assert embedders.hashing_vector(text, dims, seed) == api_embedder.hashing_vector(text, dims, seed)
+
+
+def test_custom_embedder_loads_on_both_sides():
+    config = embedders.load_embedder_config()
+    config['embedder'] = 'test_embedders:RecordingEmbedder'
+    ingest = embedders.load_embedder(config)
+    api = api_embedder.create_embedder('test_embedders:RecordingEmbedder')
+
+    assert ingest.options.keys() == api.options.keys()
+    query = asyncio.run(api_embedder.QueryEmbedder(api, TTLCache(max_size=10, ttl_seconds=60)).embed_query("abc"))
+    assert query == [3.0] * api.dimensions
+
+    docs = [{'title': 'abc'}]
+    embedders.embed_documents(ingest, docs, config)
+    assert docs[0][config['vector_field']] == [3.0] * config['dimensions']
+
+
+def test_vector_dims_problem():
+    config = embedders.load_embedder_config()
+    properties = {config['vector_field']: {'type': 'dense_vector', 'dims': config['dimensions']}}
+    assert embedders.vector_dims_problem(properties, config) is None
+    properties[config['vector_field']]['dims'] = config['dimensions'] * 2
+    assert 'VECTOR_DIMS' in embedders.vector_dims_problem(properties, config)
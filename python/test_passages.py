@@ -0,0 +1,50 @@
+"""
+Passage splitting: sizes, overlap and offsets into the original text
+"""
+from passages import split_into_passages
+
+TEXT = " ".join(
+    f"Sentence number {index} describes step {index} of the rollout plan." for index in range(40)
+)
+
+
+def test_empty_text_has_no_passages():
+    assert split_into_passages("") == []
+    assert split_into_passages(None) == []
+
+
+def test_short_text_is_one_passage():
+    assert split_into_passages("One sentence. Two sentences.") == [
+        {'text': "One sentence. Two sentences.", 'offset': 0, 'position': 0}
+    ]
+
+
+def test_passages_respect_max_chars_and_positions():
+    passages = split_into_passages(TEXT, max_chars=300, overlap_chars=80)
+    assert len(passages) > 1
+    assert all(len(passage['text']) <= 300 for passage in passages)
+    assert [passage['position'] for passage in passages] == list(range(len(passages)))
+
+
+def test_offsets_point_at_the_passage_start():
+    text = "Intro line.\n\n  " + TEXT
+    for passage in split_into_passages(text, max_chars=300, overlap_chars=80):
+        first_sentence = passage['text'].split('. ')[0]
+        assert text[passage['offset']:].startswith(first_sentence)
+
+
+def test_consecutive_passages_overlap():
+    passages = split_into_passages(TEXT, max_chars=300, overlap_chars=80)
+    for previous, following in zip(passages, passages[1:]):
+        last_sentence = previous['text'].rsplit('. ', 1)[-1]
+        assert following['text'].startswith(last_sentence)
+        assert following['offset'] < previous['offset'] + len(previous['text'])
+
+
+def test_oversized_sentence_is_truncated_at_its_offset():
+    long_sentence = "word " * 200
+    text = "Short first sentence. " + long_sentence.strip() + "."
+    passages = split_into_passages(text, max_chars=100, overlap_chars=20)
+    assert passages[0]['text'] == "Short first sentence."
+    assert passages[1]['offset'] == text.index("word")
+    assert len(passages[1]['text']) == 100
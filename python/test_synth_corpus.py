@@ -0,0 +1,73 @@
+"""
+Synthetic corpora must be reproducible byte for byte from the seed and options
+"""
+import json
+
+import pytest
+
+from dedup import load_dedup_config
+from embedders import load_embedder_config
+from synth_corpus import synthesise
+
+
+def corpus_options(output_dir, workers, seed=7):
+    return {
+        'documents': 600,
+        'seed': seed,
+        'output_dir': str(output_dir),
+        'prefix': f"corpus-{seed}",
+        'shard_size': 200,
+        'workers': workers,
+        'gzip': False,
+        'anchor_date': '2025-01-01T00:00:00',
+        'semantic_enabled': True,
+        'semantic_field_prefix': 'semantic_',
+        'semantic_field_mode': 'client',
+        'passages_enabled': True,
+        'passage_max_chars': 600,
+        'passage_overlap_chars': 100,
+        'vectors_enabled': False,
+        'embedder_config': load_embedder_config(),
+        'dedup_enabled': True,
+        'dedup_config': load_dedup_config()
+    }
+
+
+def shard_hashes(manifest):
+    return [(shard['shard'], shard['documents'], shard['sha256']) for shard in manifest['shards']]
+
+
+@pytest.fixture(scope='module')
+def single_worker_corpus(tmp_path_factory):
+    output_dir = tmp_path_factory.mktemp('single')
+    return output_dir, synthesise(corpus_options(output_dir, workers=1))
+
+
+def test_shards_are_identical_across_worker_counts(tmp_path, single_worker_corpus):
+    single_dir, single = single_worker_corpus
+    parallel = synthesise(corpus_options(tmp_path, workers=3))
+
+    assert len(single['shards']) == 3
+    assert shard_hashes(single) == shard_hashes(parallel)
+    for shard in single['shards']:
+        with open(single_dir / shard['file'], 'rb') as a, open(tmp_path / shard['file'], 'rb') as b:
+            assert a.read() == b.read()
+
+
+def test_shards_are_bulk_action_document_pairs(single_worker_corpus):
+    output_dir, manifest = single_worker_corpus
+    with open(output_dir / manifest['shards'][0]['file']) as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 2 * manifest['shards'][0]['documents']
+    action, document = json.loads(lines[0]), json.loads(lines[1])
+    assert action['index']['_id'] and document['title'] and document['content_hash']
+
+
+def test_every_document_has_a_cluster_from_its_own_shard(single_worker_corpus):
+    output_dir, manifest = single_worker_corpus
+    for shard in manifest['shards']:
+        with open(output_dir / shard['file']) as f:
+            lines = f.read().splitlines()
+        ids = {json.loads(action)['index']['_id'] for action in lines[0::2]}
+        clusters = {json.loads(document)['dup_cluster'] for document in lines[1::2]}
+        assert clusters <= ids
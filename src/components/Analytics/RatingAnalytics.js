@@ -39,6 +39,10 @@ const RatingAnalytics = () => {
   };
 
   const loadSearchRatings = async () => {
+    if (config.api.useApiLayer) {
+      return loadSearchRatingsFromApi();
+    }
+
     try {
       const response = await fetch(
         `${config.elasticsearch.endpoint}/${config.elasticsearch.index}/_search`,
@@ -68,6 +72,33 @@ const RatingAnalytics = () => {
     return [];
   };
 
+  // The API serves per-source totals from precomputed rollups
+  const loadSearchRatingsFromApi = async () => {
+    try {
+      const token = localStorage.getItem('auth_token');
+      const response = await fetch(`${config.api.baseUrl}/analytics/ratings?dimension=source`, {
+        headers: {
+          ...(token && { 'Authorization': `Bearer ${token}` })
+        }
+      });
+
+      if (response.ok) {
+        const data = await response.json();
+        return data.rows.map(row => ({
+          source: row.key,
+          ratings: {
+            positive_count: row.positive_count,
+            negative_count: row.negative_count,
+            total_ratings: row.total_ratings
+          }
+        }));
+      }
+    } catch (error) {
+      console.error('Error loading rating analytics:', error);
+    }
+    return [];
+  };
+
   const loadSummaryRatings = () => {
     try {
       const ratings = JSON.parse(localStorage.getItem('summary_ratings') || '[]');
@@ -3,6 +3,7 @@ import React from 'react';
 import { CheckSquare, Square, User, Calendar, ExternalLink } from 'lucide-react';
 import SourceIcon from '../Common/SourceIcon';
 import RatingButtons from '../Common/RatingButtons';
+import { config } from '../../config';
 
 const ResultCard = ({ result, isSelected, onToggleSelection }) => {
   const getSourceColor = (source) => {
@@ -14,6 +15,27 @@ const ResultCard = ({ result, isSelected, onToggleSelection }) => {
     }
   };
 
+  // Fire-and-forget click analytics; never delays opening the document
+  const handleOpenDocument = () => {
+    if (!config.api.useApiLayer || !result.searchId) {
+      return;
+    }
+    const token = localStorage.getItem('auth_token');
+    fetch(`${config.api.baseUrl}/analytics/clicks`, {
+      method: 'POST',
+      keepalive: true,
+      headers: {
+        'Content-Type': 'application/json',
+        ...(token && { 'Authorization': `Bearer ${token}` })
+      },
+      body: JSON.stringify({
+        search_id: result.searchId,
+        document_id: result.id,
+        position: result.position
+      })
+    }).catch(error => console.error('Error recording click:', error));
+  };
+
   const handleRatingSubmitted = (rating, ratingResult) => {
     console.log(`Document ${result.id} rated as: ${rating}`, ratingResult);
     // Could trigger a refresh or update local state
@@ -71,6 +93,7 @@ const ResultCard = ({ result, isSelected, onToggleSelection }) => {
                   href={result.url} 
                   target="_blank" 
                   rel="noopener noreferrer" 
+                  onClick={handleOpenDocument}
                   className="text-red-600 hover:underline"
                 >
                   Open document
@@ -1,6 +1,13 @@
 import { config } from '../config';
 import { useAuth } from './useAuth';
 
+// Results returned by the search API carry a searchId and are resolved server-side
+// by id; demo and mock results aren't in the index, so they are posted in full
+const splitDocuments = (documents) => ({
+  posted: documents.filter(doc => !doc.searchId),
+  ids: documents.filter(doc => doc.searchId).map(doc => doc.id)
+});
+
 export const useApiLLM = () => {
   const { getAuthHeaders, isAuthenticated, user } = useAuth();
 
@@ -9,6 +16,7 @@ export const useApiLLM = () => {
       return generateFallbackSummary(query, searchResults);
     }
 
+    const { posted, ids } = splitDocuments(searchResults);
     try {
       const response = await fetch(`${config.api.baseUrl}/llm/summary`, {
         method: 'POST',
@@ -18,7 +26,8 @@ export const useApiLLM = () => {
         },
         body: JSON.stringify({
           query,
-          search_results: searchResults
+          search_results: posted,
+          document_ids: ids
         })
       });
 
@@ -39,6 +48,7 @@ export const useApiLLM = () => {
       return generateFallbackComprehensiveSummary(selectedDocuments);
     }
 
+    const { posted, ids } = splitDocuments(selectedDocuments);
     try {
       const response = await fetch(`${config.api.baseUrl}/llm/comprehensive-summary`, {
         method: 'POST',
@@ -47,7 +57,8 @@ export const useApiLLM = () => {
           ...getAuthHeaders()
         },
         body: JSON.stringify({
-          selected_documents: selectedDocuments
+          selected_documents: posted,
+          document_ids: ids
         })
       });
 
@@ -69,6 +80,7 @@ export const useApiLLM = () => {
       return generateFallbackChatResponse(userMessage, searchContext, currentUser);
     }
 
+    const { posted, ids } = splitDocuments(searchContext);
     try {
       const response = await fetch(`${config.api.baseUrl}/llm/chat`, {
         method: 'POST',
@@ -78,7 +90,8 @@ export const useApiLLM = () => {
         },
         body: JSON.stringify({
           message: userMessage,
-          search_context: searchContext,
+          search_context: posted,
+          document_ids: ids,
           conversation_history: conversationHistory
         })
       });
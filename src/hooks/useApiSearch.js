@@ -97,7 +97,12 @@ export const useApiSearch = () => {
       console.log('API search successful:', data);
       
       setConnectionStatus('connected');
-      return data.results;
+      // Clicks are reported against the search they came from
+      return data.results.map((result, position) => ({
+        ...result,
+        searchId: data.search_id,
+        position
+      }));
       
     } catch (error) {
       console.error('API search error:', error);
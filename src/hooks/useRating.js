@@ -13,7 +13,31 @@ export const useRating = () => {
       // Rating values: 1 = thumbs up, 0 = neutral, -1 = thumbs down
       const ratingValue = rating === 'up' ? 1 : rating === 'down' ? -1 : 0;
       
-      // Update the document in Elasticsearch with the rating
+      if (config.api.useApiLayer) {
+        // The API records a rating event and rolls up ratings.* in batches
+        const token = localStorage.getItem('auth_token');
+        const response = await fetch(`${config.api.baseUrl}/ratings`, {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/json',
+            ...(token && { 'Authorization': `Bearer ${token}` })
+          },
+          body: JSON.stringify({
+            document_id: documentId,
+            rating: ratingValue,
+            query: searchQuery
+          })
+        });
+
+        if (!response.ok) {
+          throw new Error(`Failed to submit rating: ${response.status}`);
+        }
+
+        const result = await response.json();
+        return { success: true, result };
+      }
+      
+      // Legacy direct mode: update the document in Elasticsearch with the rating
       const updateBody = {
         script: {
           source: `
@@ -50,6 +74,8 @@ export const useRating = () => {
             ctx._source.ratings.total_ratings = positive + negative;
             ctx._source.ratings.score = positive + negative > 0 ? 
               (positive - negative) / (positive + negative) : 0;
+            // rank_feature used for boosting must stay positive
+            ctx._source.ratings.rank = Math.max(1.0 + ctx._source.ratings.score, 0.01);
             ctx._source.ratings.last_updated = params.timestamp;
           `,
           params: {